@@ -0,0 +1,146 @@
+from typing import Dict
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.answer_keys import get_answer_key
+from app.core.attempts import answer_buffer, attempt_answers, attempt_seed, get_attempt_info, start_attempt
+from app.core.database import get_db
+from app.core.question_pools import attempt_paper, paper_questions
+from app.core.security import UserPrincipal, get_current_user
+from app.models.attempt import Attempt as AttemptModel
+from app.models.exam import Exam as ExamModel
+from app.schemas.attempt import Attempt, AttemptCreate, AttemptAnswersUpdate
+from app.schemas.exam import ExamForStudent
+
+router = APIRouter()
+
+
+def _attempt_response(attempt: AttemptModel, answers: Dict[int, int]) -> Attempt:
+    return Attempt(
+        id=attempt.id,
+        exam_id=attempt.exam_id,
+        started_at=attempt.started_at,
+        submitted_at=attempt.submitted_at,
+        answers=answers
+    )
+
+
+@router.post("/", response_model=Attempt)
+def start_or_resume_attempt(
+    attempt_data: AttemptCreate,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Start an attempt at an exam, or resume the open one with its saved answers"""
+    answer_key = get_answer_key(db, attempt_data.exam_id)
+    if answer_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
+    
+    attempt = start_attempt(db, current_user.id, answer_key)
+    
+    return _attempt_response(attempt, attempt_answers(db, attempt.id))
+
+
+@router.get("/{attempt_id}", response_model=Attempt)
+def get_attempt(
+    attempt_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Get an attempt with its saved answers"""
+    attempt = db.get(AttemptModel, attempt_id)
+    
+    if not attempt or attempt.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attempt not found"
+        )
+    
+    return _attempt_response(attempt, attempt_answers(db, attempt.id))
+
+
+@router.get("/{attempt_id}/exam", response_model=ExamForStudent)
+def get_attempt_exam(
+    attempt_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Get the paper of an attempt: its drawn questions with options in the order shown"""
+    attempt = db.get(AttemptModel, attempt_id)
+    
+    if not attempt or attempt.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attempt not found"
+        )
+    
+    exam = db.get(ExamModel, attempt.exam_id)
+    answer_key = get_answer_key(db, attempt.exam_id)
+    
+    if not exam or not answer_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
+    
+    paper = attempt_paper(answer_key, attempt_seed(attempt.id, attempt.seed), attempt.paper)
+    
+    return ExamForStudent(
+        id=exam.id,
+        title=exam.title,
+        duration_minutes=exam.duration_minutes,
+        pool_size=exam.pool_size,
+        pool_tags=exam.pool_tags,
+        shuffle_options=exam.shuffle_options,
+        created_at=exam.created_at,
+        questions=paper_questions(answer_key, paper)
+    )
+
+
+@router.patch("/{attempt_id}/answers", status_code=status.HTTP_202_ACCEPTED)
+def save_attempt_answers(
+    attempt_id: int,
+    update_data: AttemptAnswersUpdate,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Autosave answers of an open attempt; they are written to the database in batches"""
+    info = get_attempt_info(db, attempt_id)
+    
+    if not info or info.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Attempt not found"
+        )
+    
+    if info.submitted:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Attempt already submitted"
+        )
+    
+    answer_key = get_answer_key(db, info.exam_id)
+    questions = answer_key.questions if answer_key else {}
+    unknown = [answer.question_id for answer in update_data.answers if answer.question_id not in questions]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Questions not in this exam: {unknown}"
+        )
+    
+    out_of_range = [
+        answer.question_id for answer in update_data.answers
+        if not 0 <= answer.selected_answer < len(questions[answer.question_id].options)
+    ]
+    if out_of_range:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Answers out of range for questions: {out_of_range}"
+        )
+    
+    answer_buffer.add(attempt_id, {answer.question_id: answer.selected_answer for answer in update_data.answers})
+    
+    return None
@@ -1,32 +1,28 @@
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.security import (
-    verify_password, 
-    get_password_hash, 
+    verify_password_offloaded,
+    get_password_hash_offloaded,
     create_access_token,
-    get_current_user
+    get_current_user,
+    UserPrincipal
 )
 from app.models.user import User as UserModel
 from app.schemas.user import UserCreate, UserLogin, Token, User
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 
-@router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
-    """Register a new user"""
-    # Check if user already exists
-    existing_user = db.query(UserModel).filter(UserModel.email == user_data.email).first()
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered"
-        )
-    
-    # Create new user
-    hashed_password = get_password_hash(user_data.password)
+def _user_by_email(db: Session, email: str) -> Optional[UserModel]:
+    return db.query(UserModel).filter(UserModel.email == email).first()
+
+
+def _create_user(db: Session, user_data: UserCreate, hashed_password: str) -> UserModel:
     db_user = UserModel(
         email=user_data.email,
         full_name=user_data.full_name,
@@ -40,13 +36,32 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
     return db_user
 
 
+# Login and register are async so that waiting for the password pool does not
+# hold a threadpool thread; their queries still run in the threadpool
+@router.post("/register", response_model=User, status_code=status.HTTP_201_CREATED)
+async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+    """Register a new user"""
+    # Check if user already exists
+    existing_user = await run_in_threadpool(_user_by_email, db, user_data.email)
+    if existing_user:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
+    
+    # Create new user
+    hashed_password = await get_password_hash_offloaded(user_data.password)
+    
+    return await run_in_threadpool(_create_user, db, user_data, hashed_password)
+
+
 @router.post("/login", response_model=Token)
-def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: Session = Depends(get_db)):
     """Login user and return JWT token"""
     # Find user
-    user = db.query(UserModel).filter(UserModel.email == user_data.email).first()
+    user = await run_in_threadpool(_user_by_email, db, user_data.email)
     
-    if not user or not verify_password(user_data.password, user.hashed_password):
+    if not user or not await verify_password_offloaded(user_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -66,6 +81,6 @@ def login(user_data: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=User)
-def get_me(current_user: UserModel = Depends(get_current_user)):
+def get_me(current_user: UserPrincipal = Depends(get_current_user)):
     """Get current user information"""
     return current_user
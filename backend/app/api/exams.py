@@ -1,38 +1,211 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.security import get_current_user, get_current_admin_user
-from app.models.user import User as UserModel
+from app.core.answer_keys import bump_exam_version, exam_version, exam_version_async, invalidate_answer_key
+from app.core.attempts import delete_exam_attempts
+from app.core.database import get_db, get_async_db
+from app.core.exam_payloads import (
+    build_exam_payload,
+    exam_payload_response,
+    get_exam_payload,
+    invalidate_exam_payload,
+    payload_generation,
+    store_exam_payload
+)
+from app.core.exam_stats import clear_exam_stats, get_exam_statistics, rebuild_exam_stats
+from app.core.idempotency import delete_submission_keys
+from app.core.item_analysis import analyze_exam
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from app.core.question_pools import paper_length
+from app.core.result_answers import backfill_result_answers, delete_answers
+from app.core.security import UserPrincipal, get_current_user, get_current_admin_user
+from app.core.submission_queue import delete_exam_submissions
 from app.models.exam import Exam as ExamModel
 from app.models.question import Question as QuestionModel
+from app.models.result import Result as ResultModel
 from app.schemas.exam import (
     Exam, ExamCreate, ExamUpdate, ExamList, ExamForStudent,
-    QuestionForStudent
+    Question, QuestionForStudent, QuestionPatch, QuestionUpdate, ExamStatistics,
+    ItemAnalysis
 )
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+MIN_QUESTION_OPTIONS = 2
+
+# Async variants of the hot endpoints, mounted ahead of `router` when
+# settings.ASYNC_DATABASE is enabled
+async_router = APIRouter(default_response_class=ORJSONResponse)
+
+
+def _invalidate_exam_caches(exam_id: int) -> None:
+    """Drop every cached view of an exam after it changes"""
+    invalidate_answer_key(exam_id)
+    invalidate_exam_payload(exam_id)
+
+
+def _question_content_key(text: str) -> str:
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+def _sync_questions(db: Session, exam: ExamModel, questions_data: List[QuestionUpdate]) -> None:
+    """Apply a full question list to an exam, touching only the rows that changed
+
+    Incoming questions are matched to existing ones by id, then the rest by a
+    hash of their text, so unchanged questions keep their ids and past results
+    stay linked to them. Unmatched existing questions are deleted.
+    """
+    existing = {q.id: q for q in exam.questions}
+    by_content = {}
+    for q in sorted(existing.values(), key=lambda x: x.question_order):
+        by_content.setdefault(_question_content_key(q.question), []).append(q)
+    
+    matched_ids = set()
+    
+    def take(question: Optional[QuestionModel]) -> Optional[QuestionModel]:
+        if question is None or question.id in matched_ids:
+            return None
+        matched_ids.add(question.id)
+        return question
+    
+    # Ids first, so a question matched by content cannot take a row another one asked for by id
+    matches = [
+        take(existing.get(question_data.id)) if question_data.id is not None else None
+        for question_data in questions_data
+    ]
+    for idx, question_data in enumerate(questions_data):
+        if matches[idx] is None:
+            candidates = by_content.get(_question_content_key(question_data.question), [])
+            while candidates and matches[idx] is None:
+                matches[idx] = take(candidates.pop(0))
+    
+    for idx, (question_data, db_question) in enumerate(zip(questions_data, matches)):
+        values = {
+            "question": question_data.question,
+            "options": question_data.options,
+            "correct_answer": question_data.correct_answer,
+            "explanation": question_data.explanation,
+            "question_order": idx + 1,
+            "tag": question_data.tag,
+        }
+        
+        if db_question is None:
+            db.add(QuestionModel(exam_id=exam.id, **values))
+            continue
+        
+        for field, value in values.items():
+            if getattr(db_question, field) != value:
+                setattr(db_question, field, value)
+    
+    # Orphaned questions are deleted on flush
+    for question_id in set(existing) - matched_ids:
+        exam.questions.remove(existing[question_id])
+
+
+def _exam_for_student(exam: ExamModel, questions: List[QuestionModel]) -> ExamForStudent:
+    """Build the exam view without correct answers from its ordered questions
+
+    Randomized exams are listed without questions: each attempt gets its own
+    paper from GET /api/attempts/{id}/exam.
+    """
+    if exam.randomized:
+        questions = []
+    
+    questions_for_student = [
+        QuestionForStudent(
+            id=q.id,
+            question=q.question,
+            options=q.options
+        )
+        for q in questions
+    ]
+    
+    return ExamForStudent(
+        id=exam.id,
+        title=exam.title,
+        duration_minutes=exam.duration_minutes,
+        pool_size=exam.pool_size,
+        pool_tags=exam.pool_tags,
+        shuffle_options=exam.shuffle_options,
+        created_at=exam.created_at,
+        questions=questions_for_student
+    )
 
 
 @router.get("/", response_model=List[ExamList])
 def get_exams(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get all exams (list view)"""
-    exams = db.query(ExamModel).offset(skip).limit(limit).all()
+    # Count questions in SQL instead of loading them
+    question_count = db.query(func.count(QuestionModel.id)).filter(
+        QuestionModel.exam_id == ExamModel.id
+    ).correlate(ExamModel).scalar_subquery()
+    
+    query = db.query(
+        ExamModel.id,
+        ExamModel.title,
+        ExamModel.duration_minutes,
+        ExamModel.pool_size,
+        ExamModel.pool_tags,
+        ExamModel.shuffle_options,
+        ExamModel.created_at,
+        question_count.label("question_count")
+    ).order_by(ExamModel.id)
+    
+    if cursor is None:
+        query = query.offset(skip)
+    else:
+        try:
+            cursor_id = int(decode_cursor(cursor)["id"])
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        query = query.filter(ExamModel.id > cursor_id)
+    
+    exams = query.limit(limit).all()
+    
+    if exams and len(exams) == limit:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({"id": exams[-1].id})
+    
+    # Randomized exams report the length of their papers, not of their bank
+    tag_counts = {}
+    tagged_ids = [exam.id for exam in exams if exam.pool_tags]
+    if tagged_ids:
+        for exam_id, tag, count in db.execute(
+            select(QuestionModel.exam_id, QuestionModel.tag, func.count(QuestionModel.id))
+            .where(QuestionModel.exam_id.in_(tagged_ids))
+            .group_by(QuestionModel.exam_id, QuestionModel.tag)
+        ):
+            tag_counts.setdefault(exam_id, {})[tag] = count
     
     result = []
     for exam in exams:
+        randomized = bool(exam.pool_size or exam.pool_tags)
         exam_dict = {
             "id": exam.id,
             "title": exam.title,
             "duration_minutes": exam.duration_minutes,
+            "pool_size": exam.pool_size,
+            "pool_tags": exam.pool_tags,
+            "shuffle_options": exam.shuffle_options,
             "created_at": exam.created_at,
-            "question_count": len(exam.questions)
+            "question_count": paper_length(
+                exam.question_count, exam.pool_size, exam.pool_tags, tag_counts.get(exam.id, {})
+            ),
+            "bank_size": exam.question_count if randomized else None
         }
         result.append(exam_dict)
     
@@ -42,42 +215,43 @@ def get_exams(
 @router.get("/{exam_id}", response_model=ExamForStudent)
 def get_exam(
     exam_id: int,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get a specific exam (without correct answers for students)"""
-    exam = db.query(ExamModel).filter(ExamModel.id == exam_id).first()
+    version = exam_version(db, exam_id)
     
-    if not exam:
+    if version is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Exam not found"
         )
     
-    # Return exam without correct answers
-    questions_for_student = [
-        QuestionForStudent(
-            id=q.id,
-            question=q.question,
-            options=q.options
-        )
-        for q in sorted(exam.questions, key=lambda x: x.question_order)
-    ]
+    payload = get_exam_payload(exam_id, version)
     
-    return ExamForStudent(
-        id=exam.id,
-        title=exam.title,
-        duration_minutes=exam.duration_minutes,
-        created_at=exam.created_at,
-        questions=questions_for_student
-    )
+    if payload is None:
+        generation = payload_generation(exam_id)
+        exam = db.query(ExamModel).filter(ExamModel.id == exam_id).first()
+        
+        if not exam:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Exam not found"
+            )
+        
+        questions = sorted(exam.questions, key=lambda x: x.question_order)
+        payload = build_exam_payload(_exam_for_student(exam, questions))
+        store_exam_payload(exam_id, payload, generation, exam.version)
+    
+    return exam_payload_response(request, payload)
 
 
 @router.get("/{exam_id}/full", response_model=Exam)
 def get_exam_full(
     exam_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_admin_user)
+    current_user: UserPrincipal = Depends(get_current_admin_user)
 ):
     """Get a specific exam with all details including correct answers (admin only)"""
     exam = db.query(ExamModel).filter(ExamModel.id == exam_id).first()
@@ -91,17 +265,72 @@ def get_exam_full(
     return exam
 
 
+@router.get("/{exam_id}/stats", response_model=ExamStatistics)
+def get_exam_stats(
+    exam_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_admin_user)
+):
+    """Get aggregated results of an exam (admin only)"""
+    if db.get(ExamModel, exam_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
+    
+    return get_exam_statistics(db, exam_id)
+
+
+@router.post("/{exam_id}/stats/rebuild", response_model=ExamStatistics)
+def rebuild_exam_stats_endpoint(
+    exam_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_admin_user)
+):
+    """Recompute the aggregated results of an exam from its stored results (admin only)"""
+    if db.get(ExamModel, exam_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
+    
+    backfill_result_answers(db, exam_id)
+    rebuild_exam_stats(db, exam_id)
+    db.commit()
+    
+    return get_exam_statistics(db, exam_id)
+
+
+@router.get("/{exam_id}/item-analysis", response_model=ItemAnalysis)
+def get_item_analysis(
+    exam_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_admin_user)
+):
+    """Get difficulty, discrimination, point-biserial and distractor frequencies per question (admin only)"""
+    if db.get(ExamModel, exam_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
+    
+    return analyze_exam(db, exam_id)
+
+
 @router.post("/", response_model=Exam, status_code=status.HTTP_201_CREATED)
 def create_exam(
     exam_data: ExamCreate,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_admin_user)
+    current_user: UserPrincipal = Depends(get_current_admin_user)
 ):
     """Create a new exam (admin only)"""
     # Create exam
     db_exam = ExamModel(
         title=exam_data.title,
-        duration_minutes=exam_data.duration_minutes
+        duration_minutes=exam_data.duration_minutes,
+        pool_size=exam_data.pool_size,
+        pool_tags=exam_data.pool_tags,
+        shuffle_options=exam_data.shuffle_options
     )
     
     db.add(db_exam)
@@ -115,12 +344,14 @@ def create_exam(
             options=question_data.options,
             correct_answer=question_data.correct_answer,
             explanation=question_data.explanation,
-            question_order=idx + 1
+            question_order=idx + 1,
+            tag=question_data.tag
         )
         db.add(db_question)
     
     db.commit()
     db.refresh(db_exam)
+    _invalidate_exam_caches(db_exam.id)
     
     return db_exam
 
@@ -130,7 +361,7 @@ def update_exam(
     exam_id: int,
     exam_data: ExamUpdate,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_admin_user)
+    current_user: UserPrincipal = Depends(get_current_admin_user)
 ):
     """Update an exam (admin only)"""
     exam = db.query(ExamModel).filter(ExamModel.id == exam_id).first()
@@ -146,35 +377,83 @@ def update_exam(
         exam.title = exam_data.title
     if exam_data.duration_minutes is not None:
         exam.duration_minutes = exam_data.duration_minutes
+    if exam_data.shuffle_options is not None:
+        exam.shuffle_options = exam_data.shuffle_options
+    # Pools are turned off by sending them as null
+    for field in ("pool_size", "pool_tags"):
+        if field in exam_data.model_fields_set:
+            setattr(exam, field, getattr(exam_data, field))
     
     # Update questions if provided
     if exam_data.questions is not None:
-        # Delete existing questions
-        db.query(QuestionModel).filter(QuestionModel.exam_id == exam_id).delete()
-        
-        # Create new questions
-        for idx, question_data in enumerate(exam_data.questions):
-            db_question = QuestionModel(
-                exam_id=exam.id,
-                question=question_data.question,
-                options=question_data.options,
-                correct_answer=question_data.correct_answer,
-                explanation=question_data.explanation,
-                question_order=idx + 1
-            )
-            db.add(db_question)
+        _sync_questions(db, exam, exam_data.questions)
     
+    bump_exam_version(db, exam.id)
     db.commit()
     db.refresh(exam)
+    _invalidate_exam_caches(exam.id)
     
     return exam
 
 
+@router.patch("/{exam_id}/questions/{question_id}", response_model=Question)
+def update_question(
+    exam_id: int,
+    question_id: int,
+    question_data: QuestionPatch,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_admin_user)
+):
+    """Update a single question of an exam (admin only)"""
+    question = db.query(QuestionModel).filter(
+        QuestionModel.id == question_id,
+        QuestionModel.exam_id == exam_id
+    ).first()
+    
+    if not question:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Question not found"
+        )
+    
+    # Fields left out are unchanged; an explicit null clears the tag
+    changes = question_data.model_dump(exclude_unset=True)
+    null_fields = [field for field, value in changes.items() if value is None and field != "tag"]
+    if null_fields:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Fields cannot be null: {null_fields}"
+        )
+    
+    options = changes.get("options", question.options)
+    correct_answer = changes.get("correct_answer", question.correct_answer)
+    if len(options) < MIN_QUESTION_OPTIONS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Questions need at least {MIN_QUESTION_OPTIONS} options"
+        )
+    if not 0 <= correct_answer < len(options):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"correct_answer must be an option index between 0 and {len(options) - 1}"
+        )
+    
+    for field, value in changes.items():
+        setattr(question, field, value)
+    
+    bump_exam_version(db, exam_id)
+    db.commit()
+    db.refresh(question)
+    _invalidate_exam_caches(exam_id)
+    
+    return question
+
+
 @router.delete("/{exam_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_exam(
     exam_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_admin_user)
+    current_user: UserPrincipal = Depends(get_current_admin_user)
 ):
     """Delete an exam (admin only)"""
     exam = db.query(ExamModel).filter(ExamModel.id == exam_id).first()
@@ -185,7 +464,53 @@ def delete_exam(
             detail="Exam not found"
         )
     
+    clear_exam_stats(db, exam_id)
+    exam_result_ids = select(ResultModel.id).where(ResultModel.exam_id == exam_id)
+    delete_answers(db, exam_result_ids)
+    delete_submission_keys(db, exam_result_ids)
+    delete_exam_attempts(db, exam_id)
+    delete_exam_submissions(db, exam_id)
     db.delete(exam)
     db.commit()
+    _invalidate_exam_caches(exam_id)
     
     return None
+
+
+@async_router.get("/{exam_id}", response_model=ExamForStudent)
+async def get_exam_async(
+    exam_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Get a specific exam (without correct answers for students)"""
+    version = await exam_version_async(db, exam_id)
+    
+    if version is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
+    
+    payload = get_exam_payload(exam_id, version)
+    
+    if payload is None:
+        generation = payload_generation(exam_id)
+        exam = await db.get(ExamModel, exam_id)
+        
+        if not exam:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Exam not found"
+            )
+        
+        questions = (await db.execute(
+            select(QuestionModel)
+            .where(QuestionModel.exam_id == exam_id)
+            .order_by(QuestionModel.question_order)
+        )).scalars().all()
+        payload = build_exam_payload(_exam_for_student(exam, questions))
+        store_exam_payload(exam_id, payload, generation, exam.version)
+    
+    return exam_payload_response(request, payload)
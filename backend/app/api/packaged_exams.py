@@ -0,0 +1,85 @@
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from app.core.exam_package import ExamPackage, get_exam_package
+from app.core.exam_payloads import exam_payload_response
+from app.core.grading import build_result
+from app.core.security import UserPrincipal, get_current_user
+from app.schemas.exam import ExamForStudent, ExamList
+from app.schemas.result import GradedSubmission, PackagedSubmission
+
+router = APIRouter()
+
+
+def _exam_package() -> ExamPackage:
+    package = get_exam_package()
+    
+    if package is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No exam package is configured"
+        )
+    
+    return package
+
+
+@router.get("/", response_model=List[ExamList])
+def get_packaged_exams(
+    package: ExamPackage = Depends(_exam_package),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Get all exams of the exam package (list view)"""
+    return package.exam_list()
+
+
+@router.get("/{exam_id}", response_model=ExamForStudent)
+def get_packaged_exam(
+    exam_id: int,
+    request: Request,
+    package: ExamPackage = Depends(_exam_package),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Get an exam of the exam package (without correct answers)"""
+    payload = package.exam_payload(exam_id)
+    
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
+    
+    return exam_payload_response(request, payload)
+
+
+@router.post("/{exam_id}/grade", response_model=GradedSubmission)
+def grade_packaged_exam(
+    exam_id: int,
+    submission: PackagedSubmission,
+    package: ExamPackage = Depends(_exam_package),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Grade answers to an exam of the exam package without storing a result"""
+    answer_key = package.answer_key(exam_id)
+    
+    if answer_key is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
+    
+    if answer_key.randomized:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Randomized exams cannot be graded from a package"
+        )
+    
+    result, _, details = build_result(current_user.id, answer_key, submission.answers)
+    
+    return GradedSubmission(
+        exam_id=exam_id,
+        exam_title=answer_key.title,
+        score=result.score,
+        correct_answers=result.correct_answers,
+        total_questions=result.total_questions,
+        details=details
+    )
@@ -0,0 +1,44 @@
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.near_duplicates import near_duplicate_report
+from app.core.question_search import search_questions
+from app.core.security import UserPrincipal, get_current_admin_user
+from app.schemas.exam import DuplicateReport, QuestionSearchHit
+
+router = APIRouter()
+
+
+@router.get("/search", response_model=List[QuestionSearchHit])
+def search_question_bank(
+    q: str,
+    exam_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_admin_user)
+):
+    """Full-text search over the text, options and explanation of every question, best matches first (admin only)"""
+    return search_questions(db, q, exam_id=exam_id, skip=skip, limit=min(limit, 100))
+
+
+@router.get("/duplicates", response_model=DuplicateReport)
+def near_duplicate_questions(
+    threshold: Optional[float] = None,
+    exam_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_admin_user)
+):
+    """Groups of near-duplicate questions in the bank, or only those involving an exam (admin only)"""
+    if threshold is None:
+        threshold = settings.DUPLICATE_THRESHOLD
+    if not 0 < threshold <= 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="threshold must be between 0 and 1"
+        )
+    
+    return near_duplicate_report(db, threshold, exam_id=exam_id)
@@ -1,229 +1,490 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Iterator, List, Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import exists, func, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.core.security import get_current_user, get_current_admin_user
+from app.core.answer_keys import AnswerKey, get_answer_key, get_answer_key_async
+from app.core.attempts import close_attempt, close_attempt_async
+from app.core.database import SessionLocal, get_db, get_async_db
+from app.core.grading import answers_out_of_range, attempt_submission, build_result
+from app.core.exam_stats import record_result, record_result_async, remove_result
+from app.core.idempotency import (
+    IDEMPOTENCY_KEY_HEADER,
+    cache_replay,
+    check_fingerprint,
+    delete_submission_keys,
+    get_cached_replay,
+    request_fingerprint,
+    validate_idempotency_key
+)
+from app.core.pagination import NEXT_CURSOR_HEADER, encode_cursor, decode_cursor
+from app.core.result_answers import (
+    delete_answers, load_answers, load_answers_async, save_answers, save_answers_async
+)
+from app.core.security import UserPrincipal, get_current_user, get_current_admin_user
 from app.models.user import User as UserModel
 from app.models.exam import Exam as ExamModel
-from app.models.question import Question as QuestionModel
 from app.models.result import Result as ResultModel
+from app.models.result_answer import ResultAnswer as ResultAnswerModel
+from app.models.submission_key import SubmissionKey as SubmissionKeyModel
 from app.schemas.result import (
     Result, ResultCreate, ResultWithDetails, ResultDetailed, ResultDetail
 )
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Async variants of the hot endpoints, mounted ahead of `router` when
+# settings.ASYNC_DATABASE is enabled
+async_router = APIRouter(default_response_class=ORJSONResponse)
+
+# Rows fetched per round trip by the streaming export
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = [
+    "id", "user_id", "user_email", "user_name", "exam_id", "exam_title",
+    "score", "correct_answers", "total_questions", "created_at"
+]
+
+
+def _apply_results_page(query, skip: int, limit: int, cursor: Optional[str]):
+    """Order results newest first and page them by cursor, or by offset if no cursor"""
+    query = query.order_by(ResultModel.created_at.desc(), ResultModel.id.desc())
+    
+    if cursor is None:
+        return query.offset(skip).limit(limit)
+    
+    values = decode_cursor(cursor)
+    try:
+        cursor_id = int(values["id"])
+        cursor_created_at = datetime.fromisoformat(values["created_at"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    
+    # Compare against the stored timestamp of the cursor row so the boundary
+    # matches the database representation exactly, falling back to the
+    # encoded one if that row has been deleted since
+    anchor_created_at = func.coalesce(
+        select(ResultModel.created_at).where(ResultModel.id == cursor_id).scalar_subquery(),
+        cursor_created_at
+    )
+    
+    return query.filter(
+        tuple_(ResultModel.created_at, ResultModel.id) < tuple_(anchor_created_at, cursor_id)
+    ).limit(limit)
+
+
+def _filter_results(query, exam_id: Optional[int], question_id: Optional[int], is_correct: Optional[bool]):
+    """Filter results by exam and by how a question was answered, in the database"""
+    if exam_id is not None:
+        query = query.filter(ResultModel.exam_id == exam_id)
+    
+    if question_id is not None or is_correct is not None:
+        answered = exists().where(ResultAnswerModel.result_id == ResultModel.id)
+        if question_id is not None:
+            answered = answered.where(ResultAnswerModel.question_id == question_id)
+        if is_correct is not None:
+            answered = answered.where(ResultAnswerModel.is_correct == is_correct)
+        query = query.filter(answered)
+    
+    return query
+
+
+def _set_results_next_cursor(response: Response, results: List[ResultModel], limit: int):
+    """Expose the cursor of the next page when the current page is full"""
+    if results and len(results) == limit:
+        last = results[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor({
+            "created_at": last.created_at.isoformat(),
+            "id": last.id
+        })
+
+
+def _review_details(answer_key: Optional[AnswerKey], answers: List[dict]) -> List[ResultDetail]:
+    """Build the review details of stored answers"""
+    questions = answer_key.questions if answer_key else {}
+    
+    details = []
+    for answer in answers:
+        question = questions.get(answer["question_id"])
+        
+        if question:
+            details.append(ResultDetail(
+                question_id=question.id,
+                question=question.question,
+                options=question.options,
+                user_answer=answer["selected_answer"],
+                correct_answer=question.correct_answer,
+                is_correct=answer["is_correct"],
+                explanation=question.explanation
+            ))
+    
+    return details
+
+
+def _result_detailed(
+    result: ResultModel,
+    answers: List[dict],
+    exam_title: str,
+    details: List[ResultDetail]
+) -> ResultDetailed:
+    return ResultDetailed(
+        id=result.id,
+        user_id=result.user_id,
+        exam_id=result.exam_id,
+        answers=answers,
+        score=result.score,
+        correct_answers=result.correct_answers,
+        total_questions=result.total_questions,
+        created_at=result.created_at,
+        exam_title=exam_title,
+        details=details
+    )
+
+
+def _result_with_details(
+    result: ResultModel,
+    answers: List[dict],
+    user_email: Optional[str],
+    user_name: Optional[str],
+    exam_title: Optional[str]
+) -> ResultWithDetails:
+    return ResultWithDetails(
+        id=result.id,
+        user_id=result.user_id,
+        exam_id=result.exam_id,
+        answers=answers,
+        score=result.score,
+        correct_answers=result.correct_answers,
+        total_questions=result.total_questions,
+        created_at=result.created_at,
+        user_email=user_email or "Unknown",
+        user_name=user_name or user_email or "Unknown",
+        exam_title=exam_title or "Unknown"
+    )
+
+
+def _check_result_access(result: Optional[ResultModel], current_user: UserPrincipal) -> None:
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Result not found"
+        )
+    
+    # Check if user owns this result or is admin
+    if result.user_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this result"
+        )
+
+
+def _replay_submission(
+    db: Session,
+    user_id: int,
+    idempotency_key: str,
+    fingerprint: str
+) -> Optional[ResultDetailed]:
+    """Rebuild the response of an already stored submission, or None if there is none"""
+    submission = db.get(SubmissionKeyModel, (user_id, idempotency_key))
+    if submission is None:
+        return None
+    check_fingerprint(submission.request_hash, fingerprint)
+    
+    result = db.get(ResultModel, submission.result_id)
+    if result is None:
+        return None
+    
+    answer_key = get_answer_key(db, result.exam_id)
+    answers = load_answers(db, [result])[result.id]
+    replay = _result_detailed(
+        result, answers, answer_key.title if answer_key else "Unknown", _review_details(answer_key, answers)
+    )
+    cache_replay(user_id, idempotency_key, fingerprint, replay)
+    
+    return replay
+
+
+async def _replay_submission_async(
+    db: AsyncSession,
+    user_id: int,
+    idempotency_key: str,
+    fingerprint: str
+) -> Optional[ResultDetailed]:
+    """Async variant of _replay_submission"""
+    submission = await db.get(SubmissionKeyModel, (user_id, idempotency_key))
+    if submission is None:
+        return None
+    check_fingerprint(submission.request_hash, fingerprint)
+    
+    result = await db.get(ResultModel, submission.result_id)
+    if result is None:
+        return None
+    
+    answer_key = await get_answer_key_async(db, result.exam_id)
+    answers = (await load_answers_async(db, [result]))[result.id]
+    replay = _result_detailed(
+        result, answers, answer_key.title if answer_key else "Unknown", _review_details(answer_key, answers)
+    )
+    cache_replay(user_id, idempotency_key, fingerprint, replay)
+    
+    return replay
 
 
 @router.post("/", response_model=ResultDetailed, status_code=status.HTTP_201_CREATED)
 def submit_exam(
     result_data: ResultCreate,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
-    """Submit exam answers and get results"""
-    # Get exam with questions
-    exam = db.query(ExamModel).filter(ExamModel.id == result_data.exam_id).first()
+    """Submit exam answers and get results; retries with the same Idempotency-Key get the original response"""
+    if idempotency_key is not None:
+        validate_idempotency_key(idempotency_key)
+        fingerprint = request_fingerprint(result_data)
+        replay = get_cached_replay(current_user.id, idempotency_key, fingerprint)
+        if replay is None:
+            replay = _replay_submission(db, current_user.id, idempotency_key, fingerprint)
+        if replay is not None:
+            return replay
+    
+    # Get the compiled answer key of the exam
+    answer_key = get_answer_key(db, result_data.exam_id)
     
-    if not exam:
+    if not answer_key:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Exam not found"
         )
     
-    # Get all questions
-    questions = sorted(exam.questions, key=lambda x: x.question_order)
-    
-    # Calculate score
-    correct_count = 0
-    answers_list = []
-    details = []
+    out_of_range = answers_out_of_range(answer_key, result_data.answers)
+    if out_of_range:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Answers out of range for questions: {out_of_range}"
+        )
     
-    for answer in result_data.answers:
-        # Find the question
-        question = next((q for q in questions if q.id == answer.question_id), None)
-        
-        if not question:
-            continue
-        
-        is_correct = question.correct_answer == answer.selected_answer
-        if is_correct:
-            correct_count += 1
-        
-        answers_list.append({
-            "question_id": answer.question_id,
-            "selected_answer": answer.selected_answer,
-            "is_correct": is_correct
-        })
-        
-        details.append(ResultDetail(
-            question_id=question.id,
-            question=question.question,
-            options=question.options,
-            user_answer=answer.selected_answer,
-            correct_answer=question.correct_answer,
-            is_correct=is_correct,
-            explanation=question.explanation
-        ))
+    submitted_answers = result_data.answers
+    seed = paper = None
+    if result_data.attempt_id is not None:
+        seed, stored_paper, saved = close_attempt(db, result_data.attempt_id, current_user.id, result_data.exam_id)
+        answer_key, submitted_answers, paper = attempt_submission(
+            answer_key, seed, stored_paper, saved, result_data.answers
+        )
+    elif answer_key.randomized:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Randomized exams must be submitted with their attempt_id"
+        )
     
-    total_questions = len(questions)
-    score = (correct_count / total_questions * 100) if total_questions > 0 else 0
-    
-    # Save result
-    db_result = ResultModel(
-        user_id=current_user.id,
-        exam_id=exam.id,
-        answers=answers_list,
-        score=score,
-        correct_answers=correct_count,
-        total_questions=total_questions
-    )
+    db_result, answers, details = build_result(current_user.id, answer_key, submitted_answers, seed, paper)
     
+    # Save result and its answers
     db.add(db_result)
-    db.commit()
+    db.flush()
+    save_answers(db, db_result.id, answers)
+    record_result(db, db_result, answers)
+    
+    if idempotency_key is not None:
+        db.add(SubmissionKeyModel(
+            user_id=current_user.id,
+            key=idempotency_key,
+            result_id=db_result.id,
+            request_hash=fingerprint
+        ))
+    
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key was stored first
+        db.rollback()
+        replay = _replay_submission(db, current_user.id, idempotency_key, fingerprint) if idempotency_key else None
+        if replay is None:
+            raise
+        return replay
     db.refresh(db_result)
     
-    return ResultDetailed(
-        id=db_result.id,
-        user_id=db_result.user_id,
-        exam_id=db_result.exam_id,
-        answers=db_result.answers,
-        score=db_result.score,
-        correct_answers=db_result.correct_answers,
-        total_questions=db_result.total_questions,
-        created_at=db_result.created_at,
-        exam_title=exam.title,
-        details=details
-    )
+    response = _result_detailed(db_result, answers, answer_key.title, details)
+    if idempotency_key is not None:
+        cache_replay(current_user.id, idempotency_key, fingerprint, response)
+    
+    return response
 
 
 @router.get("/my", response_model=List[ResultWithDetails])
 def get_my_results(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get current user's exam results"""
-    results = db.query(ResultModel).filter(
+    query = db.query(ResultModel, ExamModel.title).outerjoin(
+        ExamModel, ExamModel.id == ResultModel.exam_id
+    ).filter(
         ResultModel.user_id == current_user.id
-    ).order_by(ResultModel.created_at.desc()).offset(skip).limit(limit).all()
-    
-    results_with_details = []
-    for result in results:
-        exam = db.query(ExamModel).filter(ExamModel.id == result.exam_id).first()
-        results_with_details.append(ResultWithDetails(
-            id=result.id,
-            user_id=result.user_id,
-            exam_id=result.exam_id,
-            answers=result.answers,
-            score=result.score,
-            correct_answers=result.correct_answers,
-            total_questions=result.total_questions,
-            created_at=result.created_at,
-            user_email=current_user.email,
-            user_name=current_user.full_name or current_user.email,
-            exam_title=exam.title if exam else "Unknown"
-        ))
+    )
+    rows = _apply_results_page(query, skip, limit, cursor).all()
+    results = [result for result, _ in rows]
+    _set_results_next_cursor(response, results, limit)
+    answers = load_answers(db, results)
+    
+    return [
+        _result_with_details(result, answers[result.id], current_user.email, current_user.full_name, exam_title)
+        for result, exam_title in rows
+    ]
+
+
+def _export_lines(
+    export_format: str,
+    exam_id: Optional[int],
+    question_id: Optional[int],
+    is_correct: Optional[bool]
+) -> Iterator[bytes]:
+    """Encode results batch by batch from a server-side cursor
     
-    return results_with_details
+    Runs with its own session: the request's session is closed before a
+    streaming body is sent.
+    """
+    db = SessionLocal()
+    
+    try:
+        # Plain columns rather than ORM entities: nothing is tracked by the session
+        statement = select(
+            ResultModel.id,
+            ResultModel.user_id,
+            UserModel.email,
+            UserModel.full_name,
+            ResultModel.exam_id,
+            ExamModel.title,
+            ResultModel.score,
+            ResultModel.correct_answers,
+            ResultModel.total_questions,
+            ResultModel.created_at,
+            ResultModel.answers
+        ).outerjoin(
+            UserModel, UserModel.id == ResultModel.user_id
+        ).outerjoin(
+            ExamModel, ExamModel.id == ResultModel.exam_id
+        )
+        statement = _filter_results(statement, exam_id, question_id, is_correct).order_by(ResultModel.id)
+        rows = db.execute(statement.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        
+        if export_format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(EXPORT_COLUMNS)
+            yield buffer.getvalue().encode("utf-8")
+        
+        for batch in rows.partitions():
+            answers = load_answers(db, batch) if export_format == "ndjson" else None
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            
+            for row in batch:
+                values = [
+                    row.id, row.user_id, row.email, row.full_name or row.email,
+                    row.exam_id, row.title, row.score, row.correct_answers,
+                    row.total_questions, row.created_at.isoformat() if row.created_at else None
+                ]
+                if export_format == "csv":
+                    writer.writerow(values)
+                else:
+                    record = dict(zip(EXPORT_COLUMNS, values), answers=answers[row.id])
+                    buffer.write(json.dumps(record) + "\n")
+            
+            yield buffer.getvalue().encode("utf-8")
+    
+    finally:
+        db.close()
+
+
+# Served from a sync session in the threadpool in both database modes
+@router.get("/export")
+@async_router.get("/export")
+def export_results(
+    format: Literal["csv", "ndjson"] = "csv",
+    exam_id: Optional[int] = None,
+    question_id: Optional[int] = None,
+    is_correct: Optional[bool] = None,
+    current_user: UserPrincipal = Depends(get_current_admin_user)
+):
+    """Stream all exam results as CSV or NDJSON (admin only)"""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    
+    return StreamingResponse(
+        _export_lines(format, exam_id, question_id, is_correct),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="results.{format}"'}
+    )
 
 
 @router.get("/{result_id}", response_model=ResultDetailed)
 def get_result_detail(
     result_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user)
+    current_user: UserPrincipal = Depends(get_current_user)
 ):
     """Get detailed result for a specific exam submission"""
     result = db.query(ResultModel).filter(ResultModel.id == result_id).first()
+    _check_result_access(result, current_user)
     
-    if not result:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Result not found"
-        )
+    # Get exam questions from the cached answer key
+    answer_key = get_answer_key(db, result.exam_id)
+    answers = load_answers(db, [result])[result.id]
+    details = _review_details(answer_key, answers)
     
-    # Check if user owns this result or is admin
-    if result.user_id != current_user.id and not current_user.is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to view this result"
-        )
-    
-    # Get exam and questions
-    exam = db.query(ExamModel).filter(ExamModel.id == result.exam_id).first()
-    
-    details = []
-    for answer in result.answers:
-        question = db.query(QuestionModel).filter(
-            QuestionModel.id == answer["question_id"]
-        ).first()
-        
-        if question:
-            details.append(ResultDetail(
-                question_id=question.id,
-                question=question.question,
-                options=question.options,
-                user_answer=answer["selected_answer"],
-                correct_answer=question.correct_answer,
-                is_correct=answer["is_correct"],
-                explanation=question.explanation
-            ))
-    
-    return ResultDetailed(
-        id=result.id,
-        user_id=result.user_id,
-        exam_id=result.exam_id,
-        answers=result.answers,
-        score=result.score,
-        correct_answers=result.correct_answers,
-        total_questions=result.total_questions,
-        created_at=result.created_at,
-        exam_title=exam.title if exam else "Unknown",
-        details=details
-    )
+    return _result_detailed(result, answers, answer_key.title if answer_key else "Unknown", details)
 
 
 @router.get("/", response_model=List[ResultWithDetails])
 def get_all_results(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    exam_id: Optional[int] = None,
+    question_id: Optional[int] = None,
+    is_correct: Optional[bool] = None,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_admin_user)
+    current_user: UserPrincipal = Depends(get_current_admin_user)
 ):
-    """Get all exam results (admin only)"""
-    results = db.query(ResultModel).order_by(
-        ResultModel.created_at.desc()
-    ).offset(skip).limit(limit).all()
-    
-    results_with_details = []
-    for result in results:
-        user = db.query(UserModel).filter(UserModel.id == result.user_id).first()
-        exam = db.query(ExamModel).filter(ExamModel.id == result.exam_id).first()
-        
-        results_with_details.append(ResultWithDetails(
-            id=result.id,
-            user_id=result.user_id,
-            exam_id=result.exam_id,
-            answers=result.answers,
-            score=result.score,
-            correct_answers=result.correct_answers,
-            total_questions=result.total_questions,
-            created_at=result.created_at,
-            user_email=user.email if user else "Unknown",
-            user_name=user.full_name if user and user.full_name else (user.email if user else "Unknown"),
-            exam_title=exam.title if exam else "Unknown"
-        ))
+    """Get all exam results, optionally filtered by exam and question outcome (admin only)"""
+    query = db.query(
+        ResultModel, UserModel.email, UserModel.full_name, ExamModel.title
+    ).outerjoin(
+        UserModel, UserModel.id == ResultModel.user_id
+    ).outerjoin(
+        ExamModel, ExamModel.id == ResultModel.exam_id
+    )
+    query = _filter_results(query, exam_id, question_id, is_correct)
+    rows = _apply_results_page(query, skip, limit, cursor).all()
+    results = [row[0] for row in rows]
+    _set_results_next_cursor(response, results, limit)
+    answers = load_answers(db, results)
     
-    return results_with_details
+    return [
+        _result_with_details(result, answers[result.id], user_email, user_full_name, exam_title)
+        for result, user_email, user_full_name, exam_title in rows
+    ]
 
 
 @router.delete("/{result_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_result(
     result_id: int,
     db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_admin_user)
+    current_user: UserPrincipal = Depends(get_current_admin_user)
 ):
     """Delete a result (admin only)"""
     result = db.query(ResultModel).filter(ResultModel.id == result_id).first()
@@ -234,7 +495,166 @@ def delete_result(
             detail="Result not found"
         )
     
+    remove_result(db, result, load_answers(db, [result])[result.id])
+    delete_answers(db, [result.id])
+    delete_submission_keys(db, [result.id])
     db.delete(result)
     db.commit()
     
     return None
+
+
+@async_router.post("/", response_model=ResultDetailed, status_code=status.HTTP_201_CREATED)
+async def submit_exam_async(
+    result_data: ResultCreate,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Submit exam answers and get results; retries with the same Idempotency-Key get the original response"""
+    if idempotency_key is not None:
+        validate_idempotency_key(idempotency_key)
+        fingerprint = request_fingerprint(result_data)
+        replay = get_cached_replay(current_user.id, idempotency_key, fingerprint)
+        if replay is None:
+            replay = await _replay_submission_async(db, current_user.id, idempotency_key, fingerprint)
+        if replay is not None:
+            return replay
+    
+    answer_key = await get_answer_key_async(db, result_data.exam_id)
+    
+    if not answer_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
+    
+    out_of_range = answers_out_of_range(answer_key, result_data.answers)
+    if out_of_range:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Answers out of range for questions: {out_of_range}"
+        )
+    
+    submitted_answers = result_data.answers
+    seed = paper = None
+    if result_data.attempt_id is not None:
+        seed, stored_paper, saved = await close_attempt_async(db, result_data.attempt_id, current_user.id, result_data.exam_id)
+        answer_key, submitted_answers, paper = attempt_submission(
+            answer_key, seed, stored_paper, saved, result_data.answers
+        )
+    elif answer_key.randomized:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Randomized exams must be submitted with their attempt_id"
+        )
+    
+    db_result, answers, details = build_result(current_user.id, answer_key, submitted_answers, seed, paper)
+    
+    db.add(db_result)
+    await db.flush()
+    await save_answers_async(db, db_result.id, answers)
+    await record_result_async(db, db_result, answers)
+    
+    if idempotency_key is not None:
+        db.add(SubmissionKeyModel(
+            user_id=current_user.id,
+            key=idempotency_key,
+            result_id=db_result.id,
+            request_hash=fingerprint
+        ))
+    
+    try:
+        await db.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key was stored first
+        await db.rollback()
+        replay = (
+            await _replay_submission_async(db, current_user.id, idempotency_key, fingerprint)
+            if idempotency_key else None
+        )
+        if replay is None:
+            raise
+        return replay
+    await db.refresh(db_result)
+    
+    response = _result_detailed(db_result, answers, answer_key.title, details)
+    if idempotency_key is not None:
+        cache_replay(current_user.id, idempotency_key, fingerprint, response)
+    
+    return response
+
+
+@async_router.get("/my", response_model=List[ResultWithDetails])
+async def get_my_results_async(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Get current user's exam results"""
+    statement = select(ResultModel, ExamModel.title).outerjoin(
+        ExamModel, ExamModel.id == ResultModel.exam_id
+    ).where(
+        ResultModel.user_id == current_user.id
+    )
+    rows = (await db.execute(_apply_results_page(statement, skip, limit, cursor))).all()
+    results = [result for result, _ in rows]
+    _set_results_next_cursor(response, results, limit)
+    answers = await load_answers_async(db, results)
+    
+    return [
+        _result_with_details(result, answers[result.id], current_user.email, current_user.full_name, exam_title)
+        for result, exam_title in rows
+    ]
+
+
+@async_router.get("/{result_id}", response_model=ResultDetailed)
+async def get_result_detail_async(
+    result_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Get detailed result for a specific exam submission"""
+    result = await db.get(ResultModel, result_id)
+    _check_result_access(result, current_user)
+    
+    answer_key = await get_answer_key_async(db, result.exam_id)
+    answers = (await load_answers_async(db, [result]))[result.id]
+    details = _review_details(answer_key, answers)
+    
+    return _result_detailed(result, answers, answer_key.title if answer_key else "Unknown", details)
+
+
+@async_router.get("/", response_model=List[ResultWithDetails])
+async def get_all_results_async(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    exam_id: Optional[int] = None,
+    question_id: Optional[int] = None,
+    is_correct: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: UserPrincipal = Depends(get_current_admin_user)
+):
+    """Get all exam results, optionally filtered by exam and question outcome (admin only)"""
+    statement = select(
+        ResultModel, UserModel.email, UserModel.full_name, ExamModel.title
+    ).outerjoin(
+        UserModel, UserModel.id == ResultModel.user_id
+    ).outerjoin(
+        ExamModel, ExamModel.id == ResultModel.exam_id
+    )
+    statement = _filter_results(statement, exam_id, question_id, is_correct)
+    rows = (await db.execute(_apply_results_page(statement, skip, limit, cursor))).all()
+    results = [row[0] for row in rows]
+    _set_results_next_cursor(response, results, limit)
+    answers = await load_answers_async(db, results)
+    
+    return [
+        _result_with_details(result, answers[result.id], user_email, user_full_name, exam_title)
+        for result, user_email, user_full_name, exam_title in rows
+    ]
@@ -0,0 +1,126 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.answer_keys import get_answer_key
+from app.core.attempts import close_attempt
+from app.core.database import get_db
+from app.core.grading import answers_out_of_range, attempt_submission
+from app.core.idempotency import (
+    IDEMPOTENCY_KEY_HEADER,
+    check_fingerprint,
+    request_fingerprint,
+    validate_idempotency_key
+)
+from app.core.question_pools import paper_to_json
+from app.core.security import UserPrincipal, get_current_user
+from app.core.submission_queue import PENDING, find_submission, submission_workers
+from app.models.queued_submission import QueuedSubmission as QueuedSubmissionModel
+from app.schemas.result import ResultCreate
+from app.schemas.submission import SubmissionStatus
+
+router = APIRouter()
+
+
+def _submission_response(response: Response, submission: QueuedSubmissionModel) -> QueuedSubmissionModel:
+    response.headers["Location"] = f"/api/submissions/{submission.id}"
+    return submission
+
+
+@router.post("/", response_model=SubmissionStatus, status_code=status.HTTP_202_ACCEPTED)
+def enqueue_submission(
+    result_data: ResultCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Validate exam answers and queue them for grading; poll the returned submission for its result"""
+    fingerprint = None
+    if idempotency_key is not None:
+        validate_idempotency_key(idempotency_key)
+        fingerprint = request_fingerprint(result_data)
+        submission = find_submission(db, current_user.id, idempotency_key)
+        if submission is not None:
+            check_fingerprint(submission.request_hash, fingerprint)
+            return _submission_response(response, submission)
+    
+    answer_key = get_answer_key(db, result_data.exam_id)
+    
+    if not answer_key:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exam not found"
+        )
+    
+    out_of_range = answers_out_of_range(answer_key, result_data.answers)
+    if out_of_range:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Answers out of range for questions: {out_of_range}"
+        )
+    
+    answers = result_data.answers
+    seed = paper = None
+    if result_data.attempt_id is not None:
+        seed, stored_paper, saved = close_attempt(db, result_data.attempt_id, current_user.id, result_data.exam_id)
+        answer_key, answers, paper = attempt_submission(answer_key, seed, stored_paper, saved, result_data.answers)
+    elif answer_key.randomized:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Randomized exams must be submitted with their attempt_id"
+        )
+    
+    submission = QueuedSubmissionModel(
+        user_id=current_user.id,
+        exam_id=result_data.exam_id,
+        answers=[answer.model_dump() for answer in answers],
+        # Only randomized papers need their seed and questions to be graded
+        seed=seed if paper is not None else None,
+        paper=paper_to_json(paper) if paper is not None else None,
+        idempotency_key=idempotency_key,
+        request_hash=fingerprint,
+        status=PENDING
+    )
+    db.add(submission)
+    
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key was queued first
+        db.rollback()
+        submission = find_submission(db, current_user.id, idempotency_key) if idempotency_key else None
+        if submission is None:
+            raise
+        check_fingerprint(submission.request_hash, fingerprint)
+        return _submission_response(response, submission)
+    
+    db.refresh(submission)
+    submission_workers.notify()
+    
+    return _submission_response(response, submission)
+
+
+@router.get("/{submission_id}", response_model=SubmissionStatus)
+def get_submission(
+    submission_id: int,
+    db: Session = Depends(get_db),
+    current_user: UserPrincipal = Depends(get_current_user)
+):
+    """Get the grading status of a queued submission and, once done, its result id"""
+    submission = db.get(QueuedSubmissionModel, submission_id)
+    
+    if not submission:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Submission not found"
+        )
+    
+    if submission.user_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to view this submission"
+        )
+    
+    return submission
@@ -0,0 +1,170 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import VersionedCache
+from app.models.exam import Exam
+from app.models.question import Question
+
+
+@dataclass(frozen=True)
+class CompiledQuestion:
+    """Static question payload needed to grade and review an answer"""
+    id: int
+    question: str
+    options: List[str]
+    correct_answer: int
+    explanation: str
+    tag: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    """Compiled answer key of an exam, questions keyed by id in question order
+
+    Randomized exams also carry their pool settings and the question ids of
+    the bank grouped by tag, so papers are drawn without querying the bank.
+    """
+    exam_id: int
+    title: str
+    questions: Dict[int, CompiledQuestion]
+    pool_size: Optional[int] = None
+    pool_tags: Optional[Dict[str, int]] = None
+    shuffle_options: bool = False
+    question_ids: Tuple[int, ...] = ()
+    ids_by_tag: Dict[Optional[str], Tuple[int, ...]] = field(default_factory=dict)
+
+    @property
+    def total_questions(self) -> int:
+        return len(self.questions)
+
+    @property
+    def randomized(self) -> bool:
+        return bool(self.pool_size or self.pool_tags or self.shuffle_options)
+
+
+_answer_keys = VersionedCache()
+
+
+def _version_statement(exam_id: int):
+    return select(Exam.version).where(Exam.id == exam_id)
+
+
+def exam_version(db: Session, exam_id: int) -> Optional[int]:
+    """Current version of an exam, or None if it does not exist"""
+    return db.execute(_version_statement(exam_id)).scalar_one_or_none()
+
+
+async def exam_version_async(db: AsyncSession, exam_id: int) -> Optional[int]:
+    """Async variant of exam_version"""
+    return (await db.execute(_version_statement(exam_id))).scalar_one_or_none()
+
+
+def bump_exam_version(db: Session, exam_id: int) -> None:
+    """Mark every cached view of an exam stale, in every process, once the caller commits"""
+    db.execute(update(Exam).where(Exam.id == exam_id).values(version=Exam.version + 1))
+
+
+def _answer_key_statements(exam_id: int):
+    """Statements selecting the exam header and its question payload"""
+    exam_statement = select(
+        Exam.id,
+        Exam.title,
+        Exam.pool_size,
+        Exam.pool_tags,
+        Exam.shuffle_options,
+        Exam.version
+    ).where(Exam.id == exam_id)
+    questions_statement = select(
+        Question.id,
+        Question.question,
+        Question.options,
+        Question.correct_answer,
+        Question.explanation,
+        Question.tag
+    ).where(Question.exam_id == exam_id).order_by(Question.question_order)
+    return exam_statement, questions_statement
+
+
+def _build_answer_key(exam, rows) -> AnswerKey:
+    """Build the answer key of an exam from its selected rows"""
+    questions = {
+        row.id: CompiledQuestion(
+            id=row.id,
+            question=row.question,
+            options=row.options,
+            correct_answer=row.correct_answer,
+            explanation=row.explanation,
+            tag=row.tag
+        )
+        for row in rows
+    }
+
+    ids_by_tag = {}
+    for question in questions.values():
+        ids_by_tag.setdefault(question.tag, []).append(question.id)
+
+    return AnswerKey(
+        exam_id=exam.id,
+        title=exam.title,
+        questions=questions,
+        pool_size=exam.pool_size,
+        pool_tags=exam.pool_tags,
+        shuffle_options=bool(exam.shuffle_options),
+        question_ids=tuple(questions),
+        ids_by_tag={tag: tuple(ids) for tag, ids in ids_by_tag.items()}
+    )
+
+
+def get_answer_key(db: Session, exam_id: int) -> Optional[AnswerKey]:
+    """Get the compiled answer key of an exam, compiling it on first use and after every edit"""
+    version = exam_version(db, exam_id)
+    if version is None:
+        return None
+
+    answer_key = _answer_keys.get(exam_id, version)
+    if answer_key is not None:
+        return answer_key
+
+    generation = _answer_keys.generation(exam_id)
+    exam_statement, questions_statement = _answer_key_statements(exam_id)
+
+    exam = db.execute(exam_statement).first()
+    if exam is None:
+        return None
+
+    answer_key = _build_answer_key(exam, db.execute(questions_statement).all())
+    _answer_keys.set(exam_id, answer_key, generation, exam.version)
+
+    return answer_key
+
+
+async def get_answer_key_async(db: AsyncSession, exam_id: int) -> Optional[AnswerKey]:
+    """Async variant of get_answer_key"""
+    version = await exam_version_async(db, exam_id)
+    if version is None:
+        return None
+
+    answer_key = _answer_keys.get(exam_id, version)
+    if answer_key is not None:
+        return answer_key
+
+    generation = _answer_keys.generation(exam_id)
+    exam_statement, questions_statement = _answer_key_statements(exam_id)
+
+    exam = (await db.execute(exam_statement)).first()
+    if exam is None:
+        return None
+
+    answer_key = _build_answer_key(exam, (await db.execute(questions_statement)).all())
+    _answer_keys.set(exam_id, answer_key, generation, exam.version)
+
+    return answer_key
+
+
+def invalidate_answer_key(exam_id: int) -> None:
+    """Drop the cached answer key of an exam after it changes"""
+    _answer_keys.invalidate(exam_id)
@@ -0,0 +1,389 @@
+import asyncio
+import logging
+import threading
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import SessionLocal, dialect_insert
+from app.core.answer_keys import AnswerKey
+from app.core.question_pools import assemble_paper, new_seed, paper_to_json
+from app.models.attempt import Attempt, AttemptAnswer
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class AttemptInfo:
+    """Owner and exam of an attempt, enough to authorize an autosave"""
+    id: int
+    user_id: int
+    exam_id: int
+    submitted: bool
+
+
+# Open attempts by id, so autosaves are authorized without a query
+_open_attempts = TTLCache(maxsize=settings.ATTEMPT_CACHE_SIZE, ttl=settings.ATTEMPT_CACHE_TTL_SECONDS)
+
+
+class AnswerWriteBuffer:
+    """Coalesces autosaved answers in memory and writes them to the database in batches
+
+    Only the latest answer of each (attempt, question) is kept, so a flush
+    writes at most one row per answer changed since the previous flush, however
+    often it was saved. A background thread flushes every `interval` seconds,
+    or as soon as `max_pending` answers are waiting.
+    """
+
+    def __init__(self, session_factory, interval: float, max_pending: int, batch_size: int):
+        self.session_factory = session_factory
+        self.interval = interval
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self._pending: Dict[int, Dict[int, int]] = {}
+        self._pending_count = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, attempt_id: int, answers: Dict[int, int]) -> None:
+        """Buffer answers of an attempt, replacing any pending answer to the same question"""
+        with self._lock:
+            pending = self._pending.setdefault(attempt_id, {})
+            before = len(pending)
+            pending.update(answers)
+            self._pending_count += len(pending) - before
+            full = self._pending_count >= self.max_pending
+        if full:
+            self._wakeup.set()
+
+    def pending(self, attempt_id: int) -> Dict[int, int]:
+        """Answers of an attempt not written to the database yet"""
+        with self._lock:
+            return dict(self._pending.get(attempt_id, {}))
+
+    def take(self, attempt_id: int) -> Dict[int, int]:
+        """Remove and return the pending answers of an attempt"""
+        with self._lock:
+            answers = self._pending.pop(attempt_id, {})
+            self._pending_count -= len(answers)
+            return answers
+
+    @contextmanager
+    def paused(self):
+        """Hold off flushes, waiting for the one in progress to commit"""
+        with self._flush_lock:
+            yield
+
+    @asynccontextmanager
+    async def paused_async(self):
+        """Async variant of paused, polling so the event loop is not blocked"""
+        while not self._flush_lock.acquire(blocking=False):
+            await asyncio.sleep(0.005)
+        try:
+            yield
+        finally:
+            self._flush_lock.release()
+
+    def __len__(self) -> int:
+        return self._pending_count
+
+    def _restore(self, drained: Dict[int, Dict[int, int]]) -> None:
+        """Put back answers of a failed flush without overwriting newer ones"""
+        with self._lock:
+            for attempt_id, answers in drained.items():
+                pending = self._pending.setdefault(attempt_id, {})
+                for question_id, selected_answer in answers.items():
+                    pending.setdefault(question_id, selected_answer)
+            self._pending_count = sum(len(answers) for answers in self._pending.values())
+
+    def _write(self, db: Session, drained: Dict[int, Dict[int, int]]) -> int:
+        attempt_ids = list(drained)
+        open_ids = []
+        for start in range(0, len(attempt_ids), self.batch_size):
+            open_ids.extend(db.execute(
+                select(Attempt.id).where(
+                    Attempt.id.in_(attempt_ids[start:start + self.batch_size]),
+                    Attempt.submitted_at.is_(None)
+                )
+            ).scalars())
+
+        # Answers of attempts submitted or deleted meanwhile are dropped
+        rows = [
+            {"attempt_id": attempt_id, "question_id": question_id, "selected_answer": selected_answer}
+            for attempt_id in open_ids
+            for question_id, selected_answer in drained[attempt_id].items()
+        ]
+        table = AttemptAnswer.__table__
+        statement = dialect_insert(db.get_bind().dialect.name)(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=["attempt_id", "question_id"],
+            set_={"selected_answer": statement.excluded.selected_answer}
+        )
+        for start in range(0, len(rows), self.batch_size):
+            db.execute(statement, rows[start:start + self.batch_size])
+        for start in range(0, len(open_ids), self.batch_size):
+            db.execute(
+                update(Attempt)
+                .where(Attempt.id.in_(open_ids[start:start + self.batch_size]))
+                .values(updated_at=func.now())
+            )
+        return len(rows)
+
+    def flush(self) -> int:
+        """Write every pending answer in one transaction; returns the number of rows written
+
+        If the batch fails for any reason other than the database being
+        unavailable, it is retried row by row and the rows that still fail are
+        dropped, so one bad answer cannot hold back every other autosave.
+        """
+        with self._flush_lock:
+            with self._lock:
+                drained, self._pending, self._pending_count = self._pending, {}, 0
+            if not drained:
+                return 0
+
+            db = self.session_factory()
+            try:
+                written = self._write(db, drained)
+                db.commit()
+                return written
+            except OperationalError:
+                # Database unavailable or locked: keep everything for the next flush
+                db.rollback()
+                self._restore(drained)
+                raise
+            except Exception:
+                db.rollback()
+                logger.exception("Failed to flush autosaved answers in one batch, retrying row by row")
+            finally:
+                db.close()
+
+            return self._write_rows(drained)
+
+    def _write_rows(self, drained: Dict[int, Dict[int, int]]) -> int:
+        """Write answers one row per transaction, dropping the rows the database rejects"""
+        rows = [
+            (attempt_id, question_id, selected_answer)
+            for attempt_id, answers in drained.items()
+            for question_id, selected_answer in answers.items()
+        ]
+        written = 0
+        db = self.session_factory()
+        try:
+            for index, (attempt_id, question_id, selected_answer) in enumerate(rows):
+                try:
+                    written += self._write(db, {attempt_id: {question_id: selected_answer}})
+                    db.commit()
+                except OperationalError:
+                    # Database unavailable or locked: keep this row and the rest for the next flush
+                    db.rollback()
+                    remaining: Dict[int, Dict[int, int]] = {}
+                    for row in rows[index:]:
+                        remaining.setdefault(row[0], {})[row[1]] = row[2]
+                    self._restore(remaining)
+                    raise
+                except Exception:
+                    db.rollback()
+                    logger.exception(
+                        "Dropped autosaved answer %s to question %s of attempt %s",
+                        selected_answer, question_id, attempt_id
+                    )
+        finally:
+            db.close()
+        return written
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Failed to flush autosaved answers")
+
+    def start(self) -> None:
+        """Start the background flusher"""
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="answer-write-buffer", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background flusher and write what is still pending"""
+        if self._thread is not None:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+answer_buffer = AnswerWriteBuffer(
+    SessionLocal,
+    interval=settings.AUTOSAVE_FLUSH_INTERVAL_SECONDS,
+    max_pending=settings.AUTOSAVE_MAX_PENDING,
+    batch_size=settings.AUTOSAVE_BATCH_SIZE
+)
+
+
+def start_attempt(db: Session, user_id: int, answer_key: AnswerKey) -> Attempt:
+    """Get the open attempt of a user at an exam, starting one if there is none
+
+    Attempts at randomized exams store the paper drawn for them, so they are
+    graded on the questions shown even if the bank is edited meanwhile.
+    """
+    attempt = db.execute(
+        select(Attempt)
+        .where(
+            Attempt.user_id == user_id,
+            Attempt.exam_id == answer_key.exam_id,
+            Attempt.submitted_at.is_(None)
+        )
+        .order_by(Attempt.id.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+    if attempt is None:
+        seed = paper = None
+        if answer_key.randomized:
+            seed = new_seed()
+            paper = paper_to_json(assemble_paper(answer_key, seed))
+        attempt = Attempt(user_id=user_id, exam_id=answer_key.exam_id, seed=seed, paper=paper)
+        db.add(attempt)
+        db.commit()
+        db.refresh(attempt)
+
+    return attempt
+
+
+def get_attempt_info(db: Session, attempt_id: int) -> Optional[AttemptInfo]:
+    """Owner and exam of an attempt, cached while it is open"""
+    info = _open_attempts.get(attempt_id)
+    if info is not None:
+        return info
+
+    row = db.execute(
+        select(Attempt.user_id, Attempt.exam_id, Attempt.submitted_at).where(Attempt.id == attempt_id)
+    ).first()
+    if row is None:
+        return None
+
+    info = AttemptInfo(
+        id=attempt_id,
+        user_id=row.user_id,
+        exam_id=row.exam_id,
+        submitted=row.submitted_at is not None
+    )
+    if not info.submitted:
+        _open_attempts.set(attempt_id, info)
+    return info
+
+
+def attempt_seed(attempt_id: int, seed: Optional[int]) -> int:
+    """Paper seed of an attempt; attempts started before seeds were stored use their id"""
+    return seed if seed is not None else attempt_id
+
+
+def _saved_answers_statement(attempt_id: int):
+    return select(AttemptAnswer.question_id, AttemptAnswer.selected_answer).where(
+        AttemptAnswer.attempt_id == attempt_id
+    )
+
+
+def attempt_answers(db: Session, attempt_id: int) -> Dict[int, int]:
+    """Saved answers of an attempt, including those still buffered"""
+    answers = dict(db.execute(_saved_answers_statement(attempt_id)).tuples().all())
+    answers.update(answer_buffer.pending(attempt_id))
+    return answers
+
+
+def _close_statement(attempt_id: int, user_id: int):
+    return (
+        update(Attempt)
+        .where(Attempt.id == attempt_id, Attempt.user_id == user_id, Attempt.submitted_at.is_(None))
+        .values(submitted_at=func.now())
+    )
+
+
+def _attempt_error(row, exam_id: int) -> HTTPException:
+    """Why an attempt could not be closed for a submission"""
+    if row is None:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Attempt not found")
+    if row.exam_id != exam_id:
+        return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Attempt belongs to another exam")
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Attempt already submitted")
+
+
+def close_attempt(
+    db: Session,
+    attempt_id: int,
+    user_id: int,
+    exam_id: int
+) -> Tuple[int, Optional[dict], Dict[int, int]]:
+    """Mark an attempt submitted in the caller's transaction; returns its seed, stored paper and saved answers
+
+    Buffered answers are copied rather than taken, so they survive a rollback
+    of the submission; once it commits the next flush drops them.
+    """
+    row = db.execute(
+        select(Attempt.exam_id, Attempt.seed, Attempt.paper)
+        .where(Attempt.id == attempt_id, Attempt.user_id == user_id)
+    ).first()
+    if row is None or row.exam_id != exam_id:
+        raise _attempt_error(row, exam_id)
+
+    # A flush drained but not committed yet would be missing from both the table and the buffer
+    with answer_buffer.paused():
+        if db.execute(_close_statement(attempt_id, user_id)).rowcount == 0:
+            raise _attempt_error(row, exam_id)
+        answers = dict(db.execute(_saved_answers_statement(attempt_id)).tuples().all())
+        answers.update(answer_buffer.pending(attempt_id))
+
+    _open_attempts.pop(attempt_id)
+    return attempt_seed(attempt_id, row.seed), row.paper, answers
+
+
+async def close_attempt_async(
+    db: AsyncSession,
+    attempt_id: int,
+    user_id: int,
+    exam_id: int
+) -> Tuple[int, Optional[dict], Dict[int, int]]:
+    """Async variant of close_attempt"""
+    row = (await db.execute(
+        select(Attempt.exam_id, Attempt.seed, Attempt.paper)
+        .where(Attempt.id == attempt_id, Attempt.user_id == user_id)
+    )).first()
+    if row is None or row.exam_id != exam_id:
+        raise _attempt_error(row, exam_id)
+
+    async with answer_buffer.paused_async():
+        if (await db.execute(_close_statement(attempt_id, user_id))).rowcount == 0:
+            raise _attempt_error(row, exam_id)
+        answers = dict((await db.execute(_saved_answers_statement(attempt_id))).tuples().all())
+        answers.update(answer_buffer.pending(attempt_id))
+
+    _open_attempts.pop(attempt_id)
+    return attempt_seed(attempt_id, row.seed), row.paper, answers
+
+
+def delete_exam_attempts(db: Session, exam_id: int) -> None:
+    """Delete the attempts of an exam and their saved answers"""
+    attempt_ids = db.execute(select(Attempt.id).where(Attempt.exam_id == exam_id)).scalars().all()
+    for attempt_id in attempt_ids:
+        _open_attempts.pop(attempt_id)
+        answer_buffer.take(attempt_id)
+    exam_attempt_ids = select(Attempt.id).where(Attempt.exam_id == exam_id)
+    db.execute(delete(AttemptAnswer).where(AttemptAnswer.attempt_id.in_(exam_attempt_ids)))
+    db.execute(delete(Attempt).where(Attempt.exam_id == exam_id))
@@ -0,0 +1,98 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after a time to live"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Cache a value, evicting the least recently used entry when full"""
+        if self.maxsize <= 0:
+            return
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        """Drop a cached value"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every cached value"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class VersionedCache:
+    """Process-local cache of values derived from rows that can be invalidated
+
+    Every invalidation bumps a per-key generation, so a value computed from data
+    read before the invalidation is never stored after it. Values may also be
+    stored with the version of the row they were built from; a lookup with
+    another version misses, so changes made by other processes are picked up
+    as soon as the row's version is bumped.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._generations = {}
+        self._lock = Lock()
+
+    def get(self, key: Hashable, version: Optional[int] = None) -> Optional[Any]:
+        """Get a cached value, or None if missing or built from another version of its row"""
+        entry = self._data.get(key)
+        if entry is None or entry[0] != version:
+            return None
+        return entry[1]
+
+    def generation(self, key: Hashable) -> int:
+        """Current generation of a key, to pass to `set` once the value is built"""
+        with self._lock:
+            return self._generations.get(key, 0)
+
+    def set(self, key: Hashable, value: Any, generation: int, version: Optional[int] = None) -> None:
+        """Cache a value unless the key was invalidated since `generation`"""
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._data[key] = (version, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop a cached value and discard any value still being built for it"""
+        with self._lock:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop every cached value"""
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,127 @@
+import zlib
+from typing import Dict, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    # Without the brotli package responses are only gzipped
+    brotli = None
+
+
+def _accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Content codings of an Accept-Encoding header with their q-values"""
+    encodings = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip():
+            encodings[name.strip()] = quality
+    return encodings
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred content coding a client accepts: br, then gzip; None to send the body as is"""
+    accepted = _accepted_encodings(accept_encoding)
+    default = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in (("br",) if brotli is not None else ()) + ("gzip",):
+        quality = accepted.get(encoding, default)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _Compressor:
+    """Incremental gzip or Brotli compressor"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=brotli_quality)
+            self.compress, self.finish = compressor.process, compressor.finish
+        else:
+            # wbits 31: gzip container
+            compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+            self.compress, self.finish = compressor.compress, compressor.flush
+
+
+class CompressionMiddleware:
+    """Compress response bodies of at least minimum_size bytes with Brotli or gzip
+
+    Responses that already carry a Content-Encoding (e.g. the precompressed
+    exam payloads) are sent as they are. The ETag of a compressed response is
+    made weak, since its bytes differ from the identity representation.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1000, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                # Held back until the first body chunk shows whether to compress
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if compressor is None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if "content-encoding" in headers or (not more_body and len(body) < self.minimum_size):
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                etag = headers.get("etag")
+                if etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+                body = compressor.compress(body)
+                if more_body:
+                    del headers["Content-Length"]
+                else:
+                    body += compressor.finish()
+                    headers["Content-Length"] = str(len(body))
+                await send(start_message)
+                await send({**message, "body": body})
+                return
+
+            body = compressor.compress(body)
+            if not more_body:
+                body += compressor.finish()
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_compressed)
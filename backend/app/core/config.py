@@ -12,11 +12,82 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./exam_system.db"
     
+    # Async database mode: serve the exam fetch, submit and results endpoints
+    # as `async def` handlers on an AsyncSession. ASYNC_DATABASE_URL defaults
+    # to DATABASE_URL with the aiosqlite/asyncpg driver. aiosqlite is in
+    # requirements.txt; asyncpg is an optional extra for PostgreSQL
+    # (pip install asyncpg==0.30.0).
+    ASYNC_DATABASE: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    
+    # Connection pool
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_RECYCLE: int = 1800  # seconds
+    DB_POOL_PRE_PING: bool = True
+    
+    # SQLite connection pragmas
+    SQLITE_WAL: bool = True
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    
     # JWT
     SECRET_KEY: str = "your-secret-key-change-this-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7  # 7 days
     
+    # Password hashing pool (0 workers hashes in a threadpool thread); requests
+    # beyond the workers plus the queue are answered 429
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+    
+    # Authenticated user cache (0 size disables it)
+    USER_CACHE_SIZE: int = 10000
+    USER_CACHE_TTL_SECONDS: int = 60
+    
+    # Verified token cache (0 size disables it)
+    TOKEN_CACHE_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: int = 300
+    
+    # Replay cache of idempotent exam submissions (0 size disables it; the
+    # database constraint still deduplicates retries)
+    IDEMPOTENCY_CACHE_SIZE: int = 10000
+    IDEMPOTENCY_CACHE_TTL_SECONDS: int = 600
+    
+    # Attempt autosave: answers are buffered in memory and flushed in
+    # batches every interval, or sooner once this many are pending
+    AUTOSAVE_FLUSH_INTERVAL_SECONDS: float = 2.0
+    AUTOSAVE_MAX_PENDING: int = 50000
+    AUTOSAVE_BATCH_SIZE: int = 1000
+    ATTEMPT_CACHE_SIZE: int = 10000
+    ATTEMPT_CACHE_TTL_SECONDS: int = 3600
+    
+    # Queued submissions: grading worker threads per process, submissions
+    # graded per transaction, idle poll interval, and how long a claimed
+    # batch may stay unfinished before another worker takes it over
+    SUBMISSION_WORKERS: int = 2
+    SUBMISSION_BATCH_SIZE: int = 200
+    SUBMISSION_POLL_INTERVAL_SECONDS: float = 0.5
+    SUBMISSION_CLAIM_TIMEOUT_SECONDS: int = 60
+    
+    # Question search ranks only the newest matches of a query, so broad
+    # queries cost the same as narrow ones
+    SEARCH_MAX_CANDIDATES: int = 2000
+    
+    # Estimated similarity (Jaccard of text shingles) from which two
+    # questions are reported as near-duplicates
+    DUPLICATE_THRESHOLD: float = 0.8
+    
+    # Compiled exam package (build_exam_package.py) served read-only under
+    # /api/packaged-exams from a memory mapping; empty to serve none
+    EXAM_PACKAGE_PATH: str = ""
+    
+    # Response compression: bodies from this size (bytes) are sent with
+    # Brotli or gzip, whichever the client prefers
+    COMPRESSION_MINIMUM_SIZE: int = 1000
+    GZIP_COMPRESSLEVEL: int = 6
+    BROTLI_QUALITY: int = 4
+    
     # CORS
     BACKEND_CORS_ORIGINS: Union[str, List[str]] = ["http://localhost:5173", "http://localhost:3000"]
     
@@ -1,19 +1,85 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
+IS_SQLITE = "sqlite" in settings.DATABASE_URL
+
+
+def _pool_options(url: str) -> dict:
+    """Connection pool options, except for in-memory SQLite which uses a single connection"""
+    if url in ("sqlite://", "sqlite+aiosqlite://") or ":memory:" in url:
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune every new SQLite connection for concurrent readers and writers"""
+    cursor = dbapi_connection.cursor()
+    if settings.SQLITE_WAL:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.close()
+
+
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+    connect_args={"check_same_thread": False} if IS_SQLITE else {},
+    **_pool_options(settings.DATABASE_URL)
 )
 
+if IS_SQLITE:
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
+def dialect_insert(dialect_name: str):
+    """Dialect insert construct supporting ON CONFLICT upserts"""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+def _async_database_url(url: str) -> str:
+    """Swap the sync driver of a database URL for its async counterpart"""
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    return url
+
+
+async_engine = None
+AsyncSessionLocal = None
+
+if settings.ASYNC_DATABASE:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+    async_database_url = settings.ASYNC_DATABASE_URL or _async_database_url(settings.DATABASE_URL)
+    async_pool_options = _pool_options(async_database_url)
+    if async_pool_options and "sqlite" in async_database_url:
+        # aiosqlite defaults to NullPool, reopening the file on every checkout
+        async_pool_options["poolclass"] = AsyncAdaptedQueuePool
+    async_engine = create_async_engine(async_database_url, **async_pool_options)
+    if "sqlite" in async_database_url:
+        event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+    AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+
 def get_db():
     """Dependency to get database session"""
     db = SessionLocal()
@@ -21,3 +87,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """Dependency to get an async database session"""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,437 @@
+import json
+import mmap
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.answer_keys import AnswerKey, CompiledQuestion
+from app.core.config import settings
+from app.core.exam_payloads import ExamPayload, build_exam_payload
+from app.core.question_pools import paper_length
+from app.schemas.exam import ExamForStudent, ExamList, QuestionForStudent
+
+# Compiled exam package: exams in the JSON import format laid out as
+# fixed-width little-endian records, so a server maps the file and reads any
+# exam without parsing the others.
+#
+#   header      HEADER_DTYPE, with the byte offset of every section
+#   exams       EXAM_DTYPE per exam: its questions are a slice of the question table
+#   questions   QUESTION_DTYPE per question: its options are a slice of the option table
+#   options     uint32 string index per option
+#   strings     uint64 offsets (string_count + 1) into the UTF-8 string data
+#
+# Strings are stored once however often they appear (e.g. "True"/"False"
+# options). Exam ids are 1-based positions in the package, question ids
+# 1-based positions in the question table.
+MAGIC = b"EXAMPKG\0"
+VERSION = 1
+NO_STRING = 0xFFFFFFFF
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("version", "<u4"),
+    ("exam_count", "<u4"),
+    ("question_count", "<u4"),
+    ("option_count", "<u4"),
+    ("string_count", "<u4"),
+    ("reserved", "<u4"),
+    ("created_at", "<i8"),
+    ("exams", "<u8"),
+    ("questions", "<u8"),
+    ("options", "<u8"),
+    ("string_offsets", "<u8"),
+    ("string_data", "<u8"),
+])
+
+EXAM_DTYPE = np.dtype([
+    ("title", "<u4"),
+    ("duration_minutes", "<u4"),
+    ("first_question", "<u4"),
+    ("question_count", "<u4"),
+    ("pool_size", "<u4"),
+    # JSON of the tag quotas, NO_STRING if none
+    ("pool_tags", "<u4"),
+    ("shuffle_options", "u1"),
+    ("reserved", "u1", (3,)),
+])
+
+QUESTION_DTYPE = np.dtype([
+    ("question", "<u4"),
+    ("explanation", "<u4"),
+    ("tag", "<u4"),
+    ("first_option", "<u4"),
+    ("option_count", "<u2"),
+    ("correct_answer", "<i2"),
+])
+
+_ALIGNMENT = 8
+
+
+class ExamPackageError(ValueError):
+    """File is not a valid exam package"""
+
+
+def normalize_exam_json(data: dict) -> dict:
+    """Exam in the JSON import format with the importer's defaults applied and optional keys only when set"""
+    exam = {
+        "title": data["title"],
+        "durationMinutes": data.get("durationMinutes", 30),
+    }
+    if data.get("poolSize"):
+        exam["poolSize"] = data["poolSize"]
+    if data.get("poolTags"):
+        exam["poolTags"] = data["poolTags"]
+    if data.get("shuffleOptions"):
+        exam["shuffleOptions"] = True
+
+    questions = []
+    for q_data in data["questions"]:
+        question = {
+            "question": q_data["question"],
+            "options": list(q_data["options"]),
+            "correctAnswer": q_data.get("correctAnswer", 0),
+            "explanation": q_data.get("explanation", ""),
+        }
+        if q_data.get("tag") is not None:
+            question["tag"] = q_data["tag"]
+        questions.append(question)
+    exam["questions"] = questions
+    return exam
+
+
+def write_exam_package(path: str, exams: Iterable[dict]) -> Tuple[int, int]:
+    """Compile exams in the JSON import format into a package file; returns (exams, questions) written
+
+    The file is written next to its destination and moved into place, so a
+    server mapping the previous package never reads a partial one.
+    """
+    strings: Dict[str, int] = {}
+    string_data = bytearray()
+    string_offsets = [0]
+
+    def string(value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+            string_data.extend(value.encode("utf-8"))
+            string_offsets.append(len(string_data))
+        return index
+
+    exam_rows, question_rows, option_rows = [], [], []
+    for data in exams:
+        exam = normalize_exam_json(data)
+        exam_rows.append((
+            string(exam["title"]),
+            exam["durationMinutes"],
+            len(question_rows),
+            len(exam["questions"]),
+            exam.get("poolSize", 0),
+            string(json.dumps(exam["poolTags"])) if "poolTags" in exam else NO_STRING,
+            exam.get("shuffleOptions", False),
+            (0, 0, 0)
+        ))
+        for question in exam["questions"]:
+            question_rows.append((
+                string(question["question"]),
+                string(question["explanation"]),
+                string(question.get("tag")),
+                len(option_rows),
+                len(question["options"]),
+                question["correctAnswer"]
+            ))
+            option_rows.extend(string(option) for option in question["options"])
+
+    sections = [
+        np.array(exam_rows, dtype=EXAM_DTYPE),
+        np.array(question_rows, dtype=QUESTION_DTYPE),
+        np.array(option_rows, dtype="<u4"),
+        np.array(string_offsets, dtype="<u8"),
+        np.frombuffer(bytes(string_data), dtype="u1"),
+    ]
+
+    header = np.zeros(1, dtype=HEADER_DTYPE)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["exam_count"] = len(exam_rows)
+    header["question_count"] = len(question_rows)
+    header["option_count"] = len(option_rows)
+    header["string_count"] = len(strings)
+    header["created_at"] = int(datetime.now(timezone.utc).timestamp())
+
+    offset = HEADER_DTYPE.itemsize
+    for name, section in zip(("exams", "questions", "options", "string_offsets", "string_data"), sections):
+        offset += -offset % _ALIGNMENT
+        header[name] = offset
+        offset += section.nbytes
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(header.tobytes())
+            for section in sections:
+                f.write(b"\0" * (-f.tell() % _ALIGNMENT))
+                f.write(section.tobytes())
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+
+    return len(exam_rows), len(question_rows)
+
+
+class ExamPackage:
+    """Memory-mapped exam package
+
+    Opening reads only the header; records are numpy views over the mapping,
+    and an exam's strings are decoded the first time it is served. Answer keys
+    and rendered payloads are kept per exam, as the package never changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < HEADER_DTYPE.itemsize:
+                raise ExamPackageError(f"{path} is too short to be an exam package")
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            # A copy, so that the header holds no view on the mapping
+            header = np.frombuffer(self._mmap[:HEADER_DTYPE.itemsize], dtype=HEADER_DTYPE)[0]
+            if header["magic"] != MAGIC.rstrip(b"\0"):
+                raise ExamPackageError(f"{path} is not an exam package")
+            if header["version"] != VERSION:
+                raise ExamPackageError(f"{path} has package version {header['version']}, expected {VERSION}")
+
+            def section(name: str, dtype, count: int) -> np.ndarray:
+                return np.frombuffer(self._mmap, dtype=dtype, count=count, offset=int(header[name]))
+
+            self.exam_count = int(header["exam_count"])
+            self.question_count = int(header["question_count"])
+            self.created_at = datetime.fromtimestamp(int(header["created_at"]), timezone.utc).replace(tzinfo=None)
+            self._exams = section("exams", EXAM_DTYPE, self.exam_count)
+            self._questions = section("questions", QUESTION_DTYPE, self.question_count)
+            self._options = section("options", "<u4", int(header["option_count"]))
+            self._string_offsets = section("string_offsets", "<u8", int(header["string_count"]) + 1)
+            self._string_data = int(header["string_data"])
+            if self._string_data + int(self._string_offsets[-1]) > len(self._mmap):
+                raise ValueError("string data runs past the end of the file")
+        except ValueError as e:
+            self.close()
+            if isinstance(e, ExamPackageError):
+                raise
+            raise ExamPackageError(f"{path} is truncated or corrupt: {e}") from e
+
+        self._answer_keys: Dict[int, AnswerKey] = {}
+        self._payloads: Dict[int, ExamPayload] = {}
+
+    def close(self) -> None:
+        """Unmap the package; views handed out before must not be used afterwards"""
+        self._exams = self._questions = self._options = self._string_offsets = None
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _string(self, index: int) -> Optional[str]:
+        return self._strings(np.array([index]))[0]
+
+    def _strings(self, indices: np.ndarray) -> List[Optional[str]]:
+        """Decode many strings, offsets looked up in one go"""
+        indices = indices.astype(np.int64)
+        present = indices != NO_STRING
+        indices = np.where(present, indices, 0)
+        starts = (self._string_offsets[indices] + self._string_data).tolist()
+        ends = (self._string_offsets[indices + 1] + self._string_data).tolist()
+        return [
+            self._mmap[start:end].decode("utf-8") if is_present else None
+            for start, end, is_present in zip(starts, ends, present.tolist())
+        ]
+
+    def _exam(self, exam_id: int):
+        if not 1 <= exam_id <= self.exam_count:
+            return None
+        return self._exams[exam_id - 1]
+
+    def _exam_questions(self, exam) -> List[Tuple[int, dict]]:
+        """Ids and decoded fields of the questions of an exam record, in order"""
+        first = int(exam["first_question"])
+        records = self._questions[first:first + int(exam["question_count"])]
+        if not len(records):
+            return []
+
+        # The options of an exam's questions are contiguous, in question order
+        first_option = int(records["first_option"][0])
+        end_option = int(records["first_option"][-1]) + int(records["option_count"][-1])
+        count = len(records)
+        strings = self._strings(np.concatenate((
+            records["question"], records["explanation"], records["tag"], self._options[first_option:end_option]
+        )))
+        options = strings[3 * count:]
+
+        questions = []
+        option = 0
+        for offset, (option_count, correct_answer) in enumerate(
+            zip(records["option_count"].tolist(), records["correct_answer"].tolist())
+        ):
+            questions.append((first + offset + 1, {
+                "question": strings[offset],
+                "options": options[option:option + option_count],
+                "correctAnswer": correct_answer,
+                "explanation": strings[count + offset],
+                "tag": strings[2 * count + offset],
+            }))
+            option += option_count
+        return questions
+
+    def _exam_settings(self, exam) -> dict:
+        pool_tags = self._string(int(exam["pool_tags"]))
+        return {
+            "title": self._string(int(exam["title"])),
+            "duration_minutes": int(exam["duration_minutes"]),
+            "pool_size": int(exam["pool_size"]) or None,
+            "pool_tags": json.loads(pool_tags) if pool_tags is not None else None,
+            "shuffle_options": bool(exam["shuffle_options"]),
+        }
+
+    def _tag_counts(self, exam) -> Dict[Optional[str], int]:
+        """Number of questions of an exam per tag"""
+        first = int(exam["first_question"])
+        tags = self._questions[first:first + int(exam["question_count"])]["tag"]
+        string_ids, counts = np.unique(tags, return_counts=True)
+        return {self._string(int(string_id)): int(count) for string_id, count in zip(string_ids, counts)}
+
+    def exam_list(self) -> List[ExamList]:
+        """List view of every exam in the package"""
+        exams = []
+        for index, exam in enumerate(self._exams):
+            exam_settings = self._exam_settings(exam)
+            bank_size = int(exam["question_count"])
+            randomized = bool(exam_settings["pool_size"] or exam_settings["pool_tags"])
+            exams.append(ExamList(
+                id=index + 1,
+                created_at=self.created_at,
+                question_count=paper_length(
+                    bank_size,
+                    exam_settings["pool_size"],
+                    exam_settings["pool_tags"],
+                    self._tag_counts(exam) if exam_settings["pool_tags"] else {}
+                ),
+                bank_size=bank_size if randomized else None,
+                **exam_settings
+            ))
+        return exams
+
+    def answer_key(self, exam_id: int) -> Optional[AnswerKey]:
+        """Answer key of an exam, decoded on first use; None if the package has no such exam"""
+        answer_key = self._answer_keys.get(exam_id)
+        if answer_key is not None:
+            return answer_key
+
+        exam = self._exam(exam_id)
+        if exam is None:
+            return None
+
+        exam_settings = self._exam_settings(exam)
+        questions = {
+            question_id: CompiledQuestion(
+                id=question_id,
+                question=fields["question"],
+                options=fields["options"],
+                correct_answer=fields["correctAnswer"],
+                explanation=fields["explanation"],
+                tag=fields["tag"]
+            )
+            for question_id, fields in self._exam_questions(exam)
+        }
+        ids_by_tag = {}
+        for question in questions.values():
+            ids_by_tag.setdefault(question.tag, []).append(question.id)
+
+        answer_key = AnswerKey(
+            exam_id=exam_id,
+            title=exam_settings["title"],
+            questions=questions,
+            pool_size=exam_settings["pool_size"],
+            pool_tags=exam_settings["pool_tags"],
+            shuffle_options=exam_settings["shuffle_options"],
+            question_ids=tuple(questions),
+            ids_by_tag={tag: tuple(ids) for tag, ids in ids_by_tag.items()}
+        )
+        self._answer_keys[exam_id] = answer_key
+        return answer_key
+
+    def exam_payload(self, exam_id: int) -> Optional[ExamPayload]:
+        """Rendered student view of an exam, as served by GET /api/exams/{id}; None if there is no such exam
+
+        Randomized exams are listed without questions, as their papers are
+        drawn per attempt.
+        """
+        payload = self._payloads.get(exam_id)
+        if payload is not None:
+            return payload
+
+        exam = self._exam(exam_id)
+        if exam is None:
+            return None
+
+        exam_settings = self._exam_settings(exam)
+        answer_key = self.answer_key(exam_id)
+        questions = [] if answer_key.randomized else [
+            QuestionForStudent(id=question.id, question=question.question, options=question.options)
+            for question in answer_key.questions.values()
+        ]
+        payload = build_exam_payload(ExamForStudent(
+            id=exam_id,
+            created_at=self.created_at,
+            questions=questions,
+            **exam_settings
+        ))
+        self._payloads[exam_id] = payload
+        return payload
+
+    def exam_json(self, exam_id: int) -> Optional[dict]:
+        """Exam in the JSON import format, as normalized by `normalize_exam_json`"""
+        exam = self._exam(exam_id)
+        if exam is None:
+            return None
+
+        exam_settings = self._exam_settings(exam)
+        data = {"title": exam_settings["title"], "durationMinutes": exam_settings["duration_minutes"]}
+        if exam_settings["pool_size"]:
+            data["poolSize"] = exam_settings["pool_size"]
+        if exam_settings["pool_tags"]:
+            data["poolTags"] = exam_settings["pool_tags"]
+        if exam_settings["shuffle_options"]:
+            data["shuffleOptions"] = True
+
+        questions = []
+        for _, fields in self._exam_questions(exam):
+            if fields["tag"] is None:
+                del fields["tag"]
+            questions.append(fields)
+        data["questions"] = questions
+        return data
+
+
+_package: Optional[ExamPackage] = None
+_package_lock = threading.Lock()
+
+
+def get_exam_package() -> Optional[ExamPackage]:
+    """Package set by EXAM_PACKAGE_PATH, mapped on first use; None if none is configured"""
+    global _package
+    if _package is None and settings.EXAM_PACKAGE_PATH:
+        with _package_lock:
+            if _package is None:
+                _package = ExamPackage(settings.EXAM_PACKAGE_PATH)
+    return _package
@@ -0,0 +1,92 @@
+import gzip
+import hashlib
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import Request, Response, status
+
+from app.core.cache import VersionedCache
+from app.core.compression import brotli, choose_encoding
+from app.schemas.exam import ExamForStudent
+
+
+@dataclass(frozen=True)
+class ExamPayload:
+    """Student view of an exam rendered once into JSON bytes, plain and compressed"""
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    gzip_etag: str
+    # None when the brotli package is not installed
+    brotli_body: Optional[bytes] = None
+    brotli_etag: Optional[str] = None
+
+
+_payloads = VersionedCache()
+
+
+def build_exam_payload(exam: ExamForStudent) -> ExamPayload:
+    """Render the student view of an exam, plain, gzipped and Brotli-compressed, with strong ETags
+
+    Payloads are compressed once per render, so Brotli uses its slowest and
+    smallest setting.
+    """
+    body = exam.model_dump_json().encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()[:32]
+    return ExamPayload(
+        body=body,
+        gzip_body=gzip.compress(body, mtime=0),
+        etag=f'"{digest}"',
+        gzip_etag=f'"{digest}-gzip"',
+        brotli_body=brotli.compress(body, quality=11) if brotli is not None else None,
+        brotli_etag=f'"{digest}-br"' if brotli is not None else None
+    )
+
+
+def get_exam_payload(exam_id: int, version: int) -> Optional[ExamPayload]:
+    """Get the cached student payload of an exam, or None if not rendered yet for this version"""
+    return _payloads.get(exam_id, version)
+
+
+def payload_generation(exam_id: int) -> int:
+    """Generation to pass to `store_exam_payload` once the payload is rendered"""
+    return _payloads.generation(exam_id)
+
+
+def store_exam_payload(exam_id: int, payload: ExamPayload, generation: int, version: int) -> None:
+    """Cache a payload rendered from `version` of its exam unless the exam changed while rendering"""
+    _payloads.set(exam_id, payload, generation, version)
+
+
+def invalidate_exam_payload(exam_id: int) -> None:
+    """Drop the cached student payload of an exam after it changes"""
+    _payloads.invalidate(exam_id)
+
+
+def _etag_matches(if_none_match: str, payload: ExamPayload) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return bool(tags & {payload.etag, payload.gzip_etag, payload.brotli_etag})
+
+
+def exam_payload_response(request: Request, payload: ExamPayload) -> Response:
+    """Serve a rendered payload, honouring If-None-Match and Brotli/gzip Accept-Encoding"""
+    encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+    if encoding == "br" and payload.brotli_body is not None:
+        body, etag = payload.brotli_body, payload.brotli_etag
+    elif encoding is not None:
+        encoding = "gzip"
+        body, etag = payload.gzip_body, payload.gzip_etag
+    else:
+        body, etag = payload.body, payload.etag
+    headers = {"ETag": etag, "Vary": "Accept-Encoding", "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, payload):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, media_type="application/json", headers=headers)
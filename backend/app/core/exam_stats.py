@@ -0,0 +1,251 @@
+import math
+from typing import List, Optional, Tuple
+
+from sqlalchemy import bindparam, case, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.database import dialect_insert
+from app.models.exam_stats import ExamStats, ExamScoreBucket, ExamQuestionStats
+from app.models.question import Question
+from app.models.result import Result
+from app.models.result_answer import ResultAnswer
+from app.schemas.exam import ExamStatistics, QuestionStatistics
+
+HISTOGRAM_BIN_WIDTH = 10
+
+
+def _score_bucket(score: float) -> int:
+    return max(0, min(100, int(score)))
+
+
+def _upsert_increment(dialect_name: str, model, keys: List[str], counters: List[str]):
+    """INSERT ... ON CONFLICT DO UPDATE adding the inserted counters to the stored ones"""
+    table = model.__table__
+    statement = dialect_insert(dialect_name)(table)
+    return statement.on_conflict_do_update(
+        index_elements=keys,
+        set_={name: table.c[name] + statement.excluded[name] for name in counters}
+    )
+
+
+def _record_statements(dialect_name: str, result: Result, answers: List[dict]) -> List[Tuple]:
+    """Statements adding a result to the running stats of its exam"""
+    statements = [
+        (
+            _upsert_increment(dialect_name, ExamStats, ["exam_id"], ["attempt_count", "score_sum"]),
+            {"exam_id": result.exam_id, "attempt_count": 1, "score_sum": result.score}
+        ),
+        (
+            _upsert_increment(dialect_name, ExamScoreBucket, ["exam_id", "bucket"], ["count"]),
+            {"exam_id": result.exam_id, "bucket": _score_bucket(result.score), "count": 1}
+        ),
+    ]
+    if answers:
+        statements.append((
+            _upsert_increment(dialect_name, ExamQuestionStats, ["exam_id", "question_id"], ["answered", "correct"]),
+            [
+                {
+                    "exam_id": result.exam_id,
+                    "question_id": answer["question_id"],
+                    "answered": 1,
+                    "correct": 1 if answer["is_correct"] else 0
+                }
+                for answer in answers
+            ]
+        ))
+    return statements
+
+
+def record_result(db: Session, result: Result, answers: List[dict]) -> None:
+    """Add a new result and its graded answers to the running stats of its exam, in the caller's transaction"""
+    for statement, params in _record_statements(db.get_bind().dialect.name, result, answers):
+        db.execute(statement, params)
+
+
+async def record_result_async(db: AsyncSession, result: Result, answers: List[dict]) -> None:
+    """Async variant of record_result"""
+    for statement, params in _record_statements(db.get_bind().dialect.name, result, answers):
+        await db.execute(statement, params)
+
+
+def record_results(db: Session, graded: List[Tuple[Result, List[dict]]]) -> None:
+    """Add a batch of new results and their graded answers to the running stats, one upsert per table"""
+    attempts, buckets, questions = {}, {}, {}
+    for result, answers in graded:
+        count, score_sum = attempts.get(result.exam_id, (0, 0.0))
+        attempts[result.exam_id] = (count + 1, score_sum + result.score)
+        bucket = (result.exam_id, _score_bucket(result.score))
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+        for answer in answers:
+            key = (result.exam_id, answer["question_id"])
+            answered, correct = questions.get(key, (0, 0))
+            questions[key] = (answered + 1, correct + (1 if answer["is_correct"] else 0))
+
+    dialect_name = db.get_bind().dialect.name
+    if attempts:
+        db.execute(
+            _upsert_increment(dialect_name, ExamStats, ["exam_id"], ["attempt_count", "score_sum"]),
+            [
+                {"exam_id": exam_id, "attempt_count": count, "score_sum": score_sum}
+                for exam_id, (count, score_sum) in attempts.items()
+            ]
+        )
+        db.execute(
+            _upsert_increment(dialect_name, ExamScoreBucket, ["exam_id", "bucket"], ["count"]),
+            [{"exam_id": exam_id, "bucket": bucket, "count": count} for (exam_id, bucket), count in buckets.items()]
+        )
+    if questions:
+        db.execute(
+            _upsert_increment(dialect_name, ExamQuestionStats, ["exam_id", "question_id"], ["answered", "correct"]),
+            [
+                {"exam_id": exam_id, "question_id": question_id, "answered": answered, "correct": correct}
+                for (exam_id, question_id), (answered, correct) in questions.items()
+            ]
+        )
+
+
+def remove_result(db: Session, result: Result, answers: List[dict]) -> None:
+    """Subtract a result being deleted from the running stats of its exam"""
+    db.execute(
+        update(ExamStats)
+        .where(ExamStats.exam_id == result.exam_id, ExamStats.attempt_count > 0)
+        .values(
+            attempt_count=ExamStats.attempt_count - 1,
+            score_sum=ExamStats.score_sum - result.score
+        )
+    )
+    db.execute(
+        update(ExamScoreBucket)
+        .where(
+            ExamScoreBucket.exam_id == result.exam_id,
+            ExamScoreBucket.bucket == _score_bucket(result.score),
+            ExamScoreBucket.count > 0
+        )
+        .values(count=ExamScoreBucket.count - 1)
+    )
+    if answers:
+        table = ExamQuestionStats.__table__
+        db.execute(
+            update(table)
+            .where(
+                table.c.exam_id == result.exam_id,
+                table.c.question_id == bindparam("b_question_id"),
+                table.c.answered > 0
+            )
+            .values(
+                answered=table.c.answered - 1,
+                correct=table.c.correct - bindparam("b_correct")
+            ),
+            [
+                {"b_question_id": answer["question_id"], "b_correct": 1 if answer["is_correct"] else 0}
+                for answer in answers
+            ]
+        )
+
+
+def clear_exam_stats(db: Session, exam_id: int) -> None:
+    """Delete the running stats of an exam"""
+    for model in (ExamStats, ExamScoreBucket, ExamQuestionStats):
+        db.execute(delete(model).where(model.exam_id == exam_id))
+
+
+def rebuild_exam_stats(db: Session, exam_id: int) -> None:
+    """Recompute the running stats of an exam from its stored results
+
+    Aggregates in the database; results are expected to have their answers in
+    result_answers (see `backfill_result_answers`).
+    """
+    clear_exam_stats(db, exam_id)
+
+    attempt_count, score_sum = db.execute(
+        select(func.count(Result.id), func.coalesce(func.sum(Result.score), 0))
+        .where(Result.exam_id == exam_id)
+    ).one()
+    if not attempt_count:
+        return
+    db.add(ExamStats(exam_id=exam_id, attempt_count=attempt_count, score_sum=score_sum))
+
+    buckets = {}
+    for score, count in db.execute(
+        select(Result.score, func.count()).where(Result.exam_id == exam_id).group_by(Result.score)
+    ):
+        bucket = _score_bucket(score)
+        buckets[bucket] = buckets.get(bucket, 0) + count
+    db.add_all([
+        ExamScoreBucket(exam_id=exam_id, bucket=bucket, count=count)
+        for bucket, count in buckets.items()
+    ])
+
+    db.add_all([
+        ExamQuestionStats(exam_id=exam_id, question_id=question_id, answered=answered, correct=correct)
+        for question_id, answered, correct in db.execute(
+            select(
+                ResultAnswer.question_id,
+                func.count(),
+                func.sum(case((ResultAnswer.is_correct, 1), else_=0))
+            )
+            .join(Result, Result.id == ResultAnswer.result_id)
+            .where(Result.exam_id == exam_id)
+            .group_by(ResultAnswer.question_id)
+        )
+    ])
+    db.flush()
+
+
+def _percentile(buckets: List[int], fraction: float) -> Optional[float]:
+    """Score at a percentile of the 1-point bucket histogram (nearest rank)"""
+    total = sum(buckets)
+    if total == 0:
+        return None
+    rank = max(1, math.ceil(total * fraction))
+    seen = 0
+    for bucket, count in enumerate(buckets):
+        seen += count
+        if seen >= rank:
+            return float(bucket)
+    return 100.0
+
+
+def get_exam_statistics(db: Session, exam_id: int) -> ExamStatistics:
+    """Read the running stats of an exam; cost does not depend on the number of results"""
+    stats = db.get(ExamStats, exam_id)
+    attempt_count = stats.attempt_count if stats else 0
+
+    buckets = [0] * 101
+    for bucket, count in db.execute(
+        select(ExamScoreBucket.bucket, ExamScoreBucket.count).where(ExamScoreBucket.exam_id == exam_id)
+    ):
+        buckets[bucket] = count
+
+    histogram = [0] * (100 // HISTOGRAM_BIN_WIDTH)
+    for bucket, count in enumerate(buckets):
+        histogram[min(bucket // HISTOGRAM_BIN_WIDTH, len(histogram) - 1)] += count
+
+    question_rows = db.execute(
+        select(Question.id, ExamQuestionStats.answered, ExamQuestionStats.correct)
+        .outerjoin(
+            ExamQuestionStats,
+            (ExamQuestionStats.exam_id == Question.exam_id) & (ExamQuestionStats.question_id == Question.id)
+        )
+        .where(Question.exam_id == exam_id)
+        .order_by(Question.question_order)
+    ).all()
+
+    return ExamStatistics(
+        exam_id=exam_id,
+        attempt_count=attempt_count,
+        mean_score=stats.score_sum / attempt_count if attempt_count else None,
+        median_score=_percentile(buckets, 0.5),
+        p90_score=_percentile(buckets, 0.9),
+        score_histogram=histogram,
+        questions=[
+            QuestionStatistics(
+                question_id=question_id,
+                answered=answered or 0,
+                correct=correct or 0,
+                correct_rate=correct / answered if answered else None
+            )
+            for question_id, answered, correct in question_rows
+        ]
+    )
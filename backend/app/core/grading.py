@@ -0,0 +1,128 @@
+from typing import Dict, List, Optional, Tuple
+
+from app.core.answer_keys import AnswerKey
+from app.core.question_pools import Paper, attempt_paper, paper_answer_key, paper_to_json, to_bank_answers
+from app.models.result import Result
+from app.schemas.result import AnswerSubmit, ResultDetail
+
+
+def answers_out_of_range(answer_key: AnswerKey, answers: List[AnswerSubmit]) -> List[int]:
+    """Ids of the questions answered with an option they do not have; blank answers are in range"""
+    return [
+        answer.question_id
+        for answer in answers
+        if answer.question_id in answer_key.questions
+        and answer.selected_answer >= len(answer_key.questions[answer.question_id].options)
+    ]
+
+
+def grade_answers(answer_key: AnswerKey, answers):
+    """Grade submitted answers against an answer key"""
+    correct_count = 0
+    answers_list = []
+    details = []
+
+    for answer in answers:
+        # Find the question
+        question = answer_key.questions.get(answer.question_id)
+
+        if not question:
+            continue
+
+        is_correct = question.correct_answer == answer.selected_answer
+        if is_correct:
+            correct_count += 1
+
+        answers_list.append({
+            "question_id": answer.question_id,
+            "selected_answer": answer.selected_answer,
+            "is_correct": is_correct
+        })
+
+        details.append(ResultDetail(
+            question_id=question.id,
+            question=question.question,
+            options=question.options,
+            user_answer=answer.selected_answer,
+            correct_answer=question.correct_answer,
+            is_correct=is_correct,
+            explanation=question.explanation
+        ))
+
+    return correct_count, answers_list, details
+
+
+def merge_attempt_answers(
+    answer_key: AnswerKey,
+    saved: Dict[int, int],
+    answers: List[AnswerSubmit]
+) -> List[AnswerSubmit]:
+    """Answers of a submitted attempt: its saved answers overridden by the submitted ones, in exam order
+
+    A submitted answer left blank (negative) does not clear a saved one.
+    """
+    merged = dict(saved)
+    merged.update(
+        (answer.question_id, answer.selected_answer)
+        for answer in answers
+        if answer.selected_answer >= 0 or answer.question_id not in merged
+    )
+
+    return [
+        AnswerSubmit(question_id=question_id, selected_answer=merged[question_id])
+        for question_id in answer_key.questions
+        if question_id in merged
+    ]
+
+
+def attempt_submission(
+    answer_key: AnswerKey,
+    seed: int,
+    stored_paper: Optional[dict],
+    saved: Dict[int, int],
+    answers: List[AnswerSubmit]
+) -> Tuple[AnswerKey, List[AnswerSubmit], Optional[Paper]]:
+    """Answer key to grade a submitted attempt against, its merged answers and its paper
+
+    For randomized exams only the questions on the attempt's paper are graded,
+    the paper stored when it started (or drawn again from its seed for older
+    attempts), and answers are mapped back from the option order shown to the
+    bank's. The paper is None for fixed exams.
+    """
+    if not answer_key.randomized:
+        return answer_key, merge_attempt_answers(answer_key, saved, answers), None
+
+    paper = attempt_paper(answer_key, seed, stored_paper)
+    paper_key = paper_answer_key(answer_key, paper)
+    return paper_key, to_bank_answers(paper, merge_attempt_answers(paper_key, saved, answers)), paper
+
+
+def build_result(
+    user_id: int,
+    answer_key: AnswerKey,
+    answers,
+    seed: Optional[int] = None,
+    paper: Optional[Paper] = None
+):
+    """Grade a submission and build its unsaved result, graded answers and review details
+
+    `seed` and `paper` are those of a submitted attempt at a randomized exam;
+    the seed is only kept along with a paper.
+    """
+    correct_count, answers_list, details = grade_answers(answer_key, answers)
+
+    total_questions = answer_key.total_questions
+    score = (correct_count / total_questions * 100) if total_questions > 0 else 0
+
+    db_result = Result(
+        user_id=user_id,
+        exam_id=answer_key.exam_id,
+        answers=[],
+        score=score,
+        correct_answers=correct_count,
+        total_questions=total_questions,
+        seed=seed if paper is not None else None,
+        paper=paper_to_json(paper) if paper is not None else None
+    )
+
+    return db_result, answers_list, details
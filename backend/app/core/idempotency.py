@@ -0,0 +1,65 @@
+import hashlib
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.models.submission_key import SubmissionKey
+from app.schemas.result import ResultCreate, ResultDetailed
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+MAX_IDEMPOTENCY_KEY_LENGTH = 64
+
+# Graded responses of recent submissions keyed by (user id, idempotency key)
+_replays = TTLCache(maxsize=settings.IDEMPOTENCY_CACHE_SIZE, ttl=settings.IDEMPOTENCY_CACHE_TTL_SECONDS)
+
+
+def validate_idempotency_key(key: str) -> None:
+    if not key or len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{IDEMPOTENCY_KEY_HEADER} must be 1 to {MAX_IDEMPOTENCY_KEY_LENGTH} characters"
+        )
+
+
+def request_fingerprint(result_data: ResultCreate) -> str:
+    """Hash of a submission, to tell a retry from a different request reusing its key"""
+    return hashlib.sha256(result_data.model_dump_json().encode("utf-8")).hexdigest()
+
+
+def check_fingerprint(stored: str, fingerprint: str) -> None:
+    if stored != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{IDEMPOTENCY_KEY_HEADER} was already used for a different submission"
+        )
+
+
+def get_cached_replay(user_id: int, key: str, fingerprint: str) -> Optional[ResultDetailed]:
+    """Graded response of a recent submission with this key, or None"""
+    entry = _replays.get((user_id, key))
+    if entry is None:
+        return None
+    stored, response = entry
+    check_fingerprint(stored, fingerprint)
+    return response
+
+
+def cache_replay(user_id: int, key: str, fingerprint: str, response: ResultDetailed) -> None:
+    _replays.set((user_id, key), (fingerprint, response))
+
+
+def delete_submission_keys(db: Session, result_ids) -> None:
+    """Delete the idempotency keys of the given results (ids or a select of ids)
+
+    Their cached replays are dropped too, so a retry after the result is
+    deleted submits again instead of returning the deleted result.
+    """
+    for user_id, key in db.execute(
+        select(SubmissionKey.user_id, SubmissionKey.key).where(SubmissionKey.result_id.in_(result_ids))
+    ):
+        _replays.pop((user_id, key))
+    db.execute(delete(SubmissionKey).where(SubmissionKey.result_id.in_(result_ids)))
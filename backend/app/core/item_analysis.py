@@ -0,0 +1,190 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import exists, select
+from sqlalchemy.orm import Session
+
+from app.core.answer_keys import get_answer_key
+from app.core.question_pools import assemble_paper
+from app.models.question import Question
+from app.models.result import Result
+from app.models.result_answer import ResultAnswer
+from app.schemas.exam import ItemAnalysis, ItemStatistics
+
+# Share of top and bottom scorers compared by the discrimination index
+DISCRIMINATION_GROUP = 0.27
+
+UNANSWERED = -1
+
+
+def load_response_matrix(db: Session, exam_id: int) -> Tuple[List[int], np.ndarray, np.ndarray, np.ndarray, int]:
+    """Load the results of an exam into a dense students x questions matrix
+
+    Returns the question ids (columns, in exam order), the answer key, the int8
+    matrix of selected options (UNANSWERED where a question was skipped), the
+    boolean matrix of the questions each student was shown and the largest
+    number of options of any question. On randomized exams every result's
+    paper is read from the result, or drawn again from its seed for older
+    results; results stored without either count as shown the questions they
+    have answers for.
+    """
+    questions = db.execute(
+        select(Question.id, Question.correct_answer, Question.options)
+        .where(Question.exam_id == exam_id)
+        .order_by(Question.question_order)
+    ).all()
+
+    question_ids = [q.id for q in questions]
+    key = np.array([q.correct_answer for q in questions], dtype=np.int8)
+    option_count = max((len(q.options) for q in questions), default=0)
+
+    results = db.execute(
+        select(Result.id, Result.seed, Result.paper).where(Result.exam_id == exam_id).order_by(Result.id)
+    ).all()
+    result_ids = np.array([result.id for result in results], dtype=np.int64)
+
+    answers = db.execute(
+        select(ResultAnswer.result_id, ResultAnswer.question_id, ResultAnswer.selected_answer)
+        .join(Result, Result.id == ResultAnswer.result_id)
+        .where(Result.exam_id == exam_id)
+    ).all()
+    # Results not backfilled into result_answers yet still carry their JSON list
+    for result_id, legacy_answers in db.execute(
+        select(Result.id, Result.answers)
+        .where(Result.exam_id == exam_id, ~exists().where(ResultAnswer.result_id == Result.id))
+    ):
+        answers.extend(
+            (result_id, answer["question_id"], answer["selected_answer"]) for answer in legacy_answers or []
+        )
+    answers = np.array(answers, dtype=np.int64).reshape(-1, 3)
+
+    matrix = np.full((len(result_ids), len(question_ids)), UNANSWERED, dtype=np.int8)
+    answer_key = get_answer_key(db, exam_id)
+    randomized = answer_key is not None and answer_key.randomized
+    presented = np.zeros(matrix.shape, dtype=bool) if randomized else np.ones(matrix.shape, dtype=bool)
+    if len(answers) and question_ids:
+        rows = np.searchsorted(result_ids, answers[:, 0])
+
+        # Map question ids to exam-order columns, dropping answers to removed questions
+        ids = np.array(question_ids, dtype=np.int64)
+        sorter = np.argsort(ids)
+        positions = np.minimum(np.searchsorted(ids, answers[:, 1], sorter=sorter), len(ids) - 1)
+        cols = sorter[positions]
+        known = ids[cols] == answers[:, 1]
+
+        if randomized:
+            unseeded = np.array([result.seed is None and result.paper is None for result in results], dtype=bool)
+            shown = known & unseeded[rows]
+            presented[rows[shown], cols[shown]] = True
+
+        selected = answers[:, 2]
+        valid = known & (selected >= 0) & (selected < option_count)
+        matrix[rows[valid], cols[valid]] = selected[valid]
+
+    if randomized:
+        columns = {question_id: col for col, question_id in enumerate(question_ids)}
+        for row, result in enumerate(results):
+            if result.paper is not None:
+                shown = result.paper["question_ids"]
+            elif result.seed is not None:
+                shown = assemble_paper(answer_key, result.seed).question_ids
+            else:
+                continue
+            presented[row, [columns[q] for q in shown if q in columns]] = True
+        matrix[~presented] = UNANSWERED
+
+    return question_ids, key, matrix, presented, option_count
+
+
+def _column_correlation(x: np.ndarray, y: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Pearson correlation of every column of x with the same column of y, over the rows set in mask"""
+    weights = mask.astype(np.float64)
+    count = weights.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = (x - (x * weights).sum(axis=0) / count) * weights
+        y = (y - (y * weights).sum(axis=0) / count) * weights
+        denominator = np.sqrt((x * x).sum(axis=0) * (y * y).sum(axis=0))
+        return np.where((count >= 2) & (denominator > 0), (x * y).sum(axis=0) / denominator, np.nan)
+
+
+def _masked_mean(values: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Mean of every column over the rows set in mask, NaN where none is"""
+    count = mask.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, (values * mask).sum(axis=0) / count, np.nan)
+
+
+def compute_item_statistics(
+    key: np.ndarray,
+    matrix: np.ndarray,
+    option_count: int,
+    presented: Optional[np.ndarray] = None
+):
+    """Compute the classical item statistics of a response matrix
+
+    Returns per-question arrays of difficulty (proportion correct, skipped
+    counted as wrong), upper-lower discrimination index, corrected
+    point-biserial correlation (item vs. rest score), option selection counts
+    and omitted counts. With a `presented` mask, every question is measured
+    only over the students who were shown it.
+    """
+    student_count, question_count = matrix.shape
+    if presented is None:
+        presented = np.ones(matrix.shape, dtype=bool)
+    correct = ((matrix == key) & presented).astype(np.float64)
+    total = correct.sum(axis=1)
+
+    difficulty = _masked_mean(correct, presented)
+
+    # Discrimination: proportion correct among top minus bottom scorers
+    group_size = max(1, int(round(student_count * DISCRIMINATION_GROUP)))
+    order = np.argsort(total, kind="stable")
+    if student_count >= 2:
+        lower, upper = order[:group_size], order[-group_size:]
+        discrimination = _masked_mean(correct[upper], presented[upper]) - _masked_mean(correct[lower], presented[lower])
+    else:
+        discrimination = np.full(question_count, np.nan)
+
+    # Corrected point-biserial: correlate each item with the score on the other items
+    rest = total[:, None] - correct
+    point_biserial = _column_correlation(correct, rest, presented)
+
+    # Distractor frequencies: one bincount over (question, option) pairs
+    answered = (matrix >= 0) & presented
+    flat = (np.arange(question_count, dtype=np.int64)[None, :] * option_count + matrix)[answered]
+    option_counts = np.bincount(flat, minlength=question_count * option_count).reshape(question_count, option_count)
+    omitted = presented.sum(axis=0) - answered.sum(axis=0)
+
+    return difficulty, discrimination, point_biserial, option_counts, omitted
+
+
+def _optional(value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def analyze_exam(db: Session, exam_id: int) -> ItemAnalysis:
+    """Item analysis of every question of an exam over its stored results"""
+    question_ids, key, matrix, presented, option_count = load_response_matrix(db, exam_id)
+    difficulty, discrimination, point_biserial, option_counts, omitted = compute_item_statistics(
+        key, matrix, option_count, presented
+    )
+    student_count = matrix.shape[0]
+    shown_counts = presented.sum(axis=0)
+
+    return ItemAnalysis(
+        exam_id=exam_id,
+        student_count=student_count,
+        questions=[
+            ItemStatistics(
+                question_id=question_id,
+                difficulty=_optional(difficulty[idx]),
+                discrimination=_optional(discrimination[idx]),
+                point_biserial=_optional(point_biserial[idx]),
+                option_counts=option_counts[idx].tolist(),
+                option_frequencies=(option_counts[idx] / shown_counts[idx]).tolist() if shown_counts[idx] else [],
+                omitted=int(omitted[idx]),
+                presented=int(shown_counts[idx])
+            )
+            for idx, question_id in enumerate(question_ids)
+        ]
+    )
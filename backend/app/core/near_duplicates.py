@@ -0,0 +1,201 @@
+import re
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.exam import Exam
+from app.models.question import Question
+from app.schemas.exam import DuplicateGroup, DuplicateQuestion, DuplicateReport
+
+# Questions are compared by the character 5-grams of their normalized text
+# and options, through MinHash signatures banded into an LSH index: only
+# questions sharing a band are compared, so a bank is checked in time linear
+# in its size instead of comparing every pair.
+SHINGLE_SIZE = 5
+NUM_PERM = 128
+
+_PRIME = (1 << 31) - 1
+_SHINGLE_WEIGHTS = np.array([pow(257, k, _PRIME) for k in range(SHINGLE_SIZE)], dtype=np.uint64)
+
+# Hash functions of the signature: multiply-shift, (a * x + b) mod 2^64 keeping
+# the high 32 bits, which needs no division
+_rng = np.random.RandomState(42)
+_PERM_A = _rng.randint(0, 1 << 63, size=NUM_PERM, dtype=np.int64).astype(np.uint64) * np.uint64(2) + np.uint64(1)
+_PERM_B = _rng.randint(0, 1 << 63, size=NUM_PERM, dtype=np.int64).astype(np.uint64)
+
+# Shingles hashed per block of the signature computation, bounding its memory
+_BLOCK_SHINGLES = 20000
+
+
+def normalize_question(question: str, options: Sequence[str]) -> str:
+    """Comparable text of a question: lowercase words without accents or punctuation, options sorted"""
+    def normalize(text: str) -> str:
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(char for char in text if not unicodedata.combining(char))
+        return " ".join(re.findall(r"\w+", text.lower()))
+
+    return " | ".join([normalize(question)] + sorted(normalize(option) for option in options or []))
+
+
+def _shingle_hashes(texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Hashes of the shingles of every text, concatenated, and the offset of each text's first shingle"""
+    encoded = [text.encode("utf-8").ljust(SHINGLE_SIZE) for text in texts]
+    lengths = np.array([len(data) for data in encoded], dtype=np.int64)
+    data = np.frombuffer(b"".join(encoded), dtype=np.uint8).astype(np.uint64)
+
+    windows = np.lib.stride_tricks.sliding_window_view(data, SHINGLE_SIZE)
+    hashes = (windows * _SHINGLE_WEIGHTS).sum(axis=1) % _PRIME
+
+    # Keep only the windows lying within a single text
+    counts = lengths - SHINGLE_SIZE + 1
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    positions = np.repeat(starts - offsets, counts) + np.arange(counts.sum())
+    return hashes[positions], offsets
+
+
+def minhash_signatures(texts: List[str]) -> np.ndarray:
+    """MinHash signature (NUM_PERM values) of the shingle set of every text"""
+    signatures = np.empty((len(texts), NUM_PERM), dtype=np.uint32)
+    if not texts:
+        return signatures
+
+    hashes, offsets = _shingle_hashes(texts)
+    ends = np.append(offsets[1:], len(hashes))
+    buffer = np.empty((NUM_PERM, _BLOCK_SHINGLES), dtype=np.uint64)
+    first = 0
+    while first < len(texts):
+        # Whole texts per block, at least one
+        last = max(first + 1, int(np.searchsorted(ends, offsets[first] + _BLOCK_SHINGLES, side="right")))
+        block = hashes[offsets[first]:ends[last - 1]]
+        if len(block) > buffer.shape[1]:
+            buffer = np.empty((NUM_PERM, len(block)), dtype=np.uint64)
+        permuted = buffer[:, :len(block)]
+        np.multiply(_PERM_A[:, None], block[None, :], out=permuted)
+        permuted += _PERM_B[:, None]
+        permuted >>= np.uint64(32)
+        signatures[first:last] = np.minimum.reduceat(permuted, offsets[first:last] - offsets[first], axis=1).T
+        first = last
+
+    return signatures
+
+
+def lsh_params(threshold: float) -> Tuple[int, int]:
+    """Bands and rows per band whose candidate threshold sits just below the similarity threshold"""
+    best = (NUM_PERM, 1)
+    rows = 1
+    while rows <= NUM_PERM:
+        bands = NUM_PERM // rows
+        if (1 / bands) ** (1 / rows) <= threshold - 0.05:
+            best = (bands, rows)
+        rows *= 2
+    return best
+
+
+def find_near_duplicates(
+    signatures: np.ndarray,
+    threshold: float,
+    focus: Optional[np.ndarray] = None
+) -> List[Tuple[List[int], float]]:
+    """Groups of near-duplicate rows of a signature matrix, with the lowest similarity linking each group
+
+    Rows sharing an LSH band are checked against the first row of the band
+    bucket, and those whose estimated Jaccard similarity reaches the threshold
+    are joined. With a focus mask, only buckets holding a focused row are
+    checked, so new questions are matched against the whole bank.
+    """
+    count = len(signatures)
+    parent = np.arange(count)
+    link_similarity: Dict[int, float] = {}
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    bands, rows = lsh_params(threshold)
+    for band in range(bands):
+        keys = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        _, labels, sizes = np.unique(keys.view(f"V{keys.itemsize * rows}").ravel(), return_inverse=True, return_counts=True)
+        shared = sizes[labels] > 1
+        if focus is not None:
+            shared &= np.isin(labels, np.unique(labels[focus]))
+        members = np.flatnonzero(shared)
+        if not len(members):
+            continue
+
+        order = members[np.argsort(labels[members], kind="stable")]
+        bucket_starts = np.flatnonzero(np.diff(labels[order], prepend=-1))
+        for first, end in zip(bucket_starts, np.append(bucket_starts[1:], len(order))):
+            bucket = order[first:end]
+            similarities = (signatures[bucket[1:]] == signatures[bucket[0]]).mean(axis=1)
+            for member, similarity in zip(bucket[1:], similarities):
+                if similarity < threshold:
+                    continue
+                root, other = find(bucket[0]), find(member)
+                if root != other:
+                    parent[other] = root
+                    link_similarity[root] = min(similarity, link_similarity.get(root, 1.0), link_similarity.pop(other, 1.0))
+
+    groups: Dict[int, List[int]] = {}
+    for index in range(count):
+        groups.setdefault(find(index), []).append(index)
+
+    return [
+        (members, float(link_similarity.get(root, 1.0)))
+        for root, members in groups.items()
+        if len(members) > 1
+    ]
+
+
+def near_duplicate_report(
+    db: Session,
+    threshold: float,
+    exam_id: Optional[int] = None,
+    min_question_id: Optional[int] = None
+) -> DuplicateReport:
+    """Groups of near-duplicate questions in the bank
+
+    With exam_id, only groups holding a question of that exam are reported;
+    with min_question_id, only groups holding a question newer than it (e.g.
+    just imported).
+    """
+    rows = db.execute(
+        select(Question.id, Question.exam_id, Exam.title, Question.question, Question.options)
+        .join(Exam, Exam.id == Question.exam_id)
+        .order_by(Question.id)
+    ).all()
+
+    signatures = minhash_signatures([normalize_question(row.question, row.options) for row in rows])
+    focus = None
+    if exam_id is not None:
+        focus = np.array([row.exam_id == exam_id for row in rows], dtype=bool)
+    elif min_question_id is not None:
+        focus = np.array([row.id > min_question_id for row in rows], dtype=bool)
+
+    groups = find_near_duplicates(signatures, threshold, focus)
+    groups.sort(key=lambda group: (-group[1], rows[group[0][0]].id))
+
+    return DuplicateReport(
+        threshold=threshold,
+        question_count=len(rows),
+        groups=[
+            DuplicateGroup(
+                similarity=similarity,
+                questions=[
+                    DuplicateQuestion(
+                        question_id=rows[index].id,
+                        exam_id=rows[index].exam_id,
+                        exam_title=rows[index].title,
+                        question=rows[index].question
+                    )
+                    for index in members
+                ]
+            )
+            for members, similarity in groups
+        ]
+    )
@@ -0,0 +1,130 @@
+import random
+import secrets
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.core.answer_keys import AnswerKey
+from app.schemas.exam import QuestionForStudent
+from app.schemas.result import AnswerSubmit
+
+
+@dataclass(frozen=True)
+class Paper:
+    """Questions drawn for an attempt in the order shown, and the bank index of every option shown"""
+    question_ids: Tuple[int, ...]
+    option_orders: Dict[int, Tuple[int, ...]]
+
+
+def new_seed() -> int:
+    """Random seed of a new attempt's paper"""
+    return secrets.randbits(62)
+
+
+def paper_length(
+    bank_size: int,
+    pool_size: Optional[int],
+    pool_tags: Optional[Dict[str, int]],
+    tag_counts: Dict[Optional[str], int]
+) -> int:
+    """Number of questions on every paper of an exam, as drawn by assemble_paper"""
+    if pool_tags:
+        return sum(max(0, min(count, tag_counts.get(tag, 0))) for tag, count in pool_tags.items())
+    if pool_size:
+        return min(pool_size, bank_size)
+    return bank_size
+
+
+def assemble_paper(answer_key: AnswerKey, seed: int) -> Paper:
+    """Draw the paper of an attempt from the exam's bank, deterministically from its seed
+
+    Questions are sampled from the id arrays precompiled in the answer key,
+    per tag when the exam sets pool_tags, so drawing costs O(questions drawn)
+    whatever the size of the bank. The same seed and bank always give the same
+    paper, which is how submissions are graded without storing it.
+    """
+    rng = random.Random(seed)
+
+    if answer_key.pool_tags:
+        drawn = []
+        for tag in sorted(answer_key.pool_tags):
+            ids = answer_key.ids_by_tag.get(tag, ())
+            drawn.extend(rng.sample(ids, max(0, min(answer_key.pool_tags[tag], len(ids)))))
+        rng.shuffle(drawn)
+    elif answer_key.pool_size:
+        ids = answer_key.question_ids
+        drawn = rng.sample(ids, min(answer_key.pool_size, len(ids)))
+    else:
+        drawn = list(answer_key.question_ids)
+
+    option_orders = {}
+    if answer_key.shuffle_options:
+        for question_id in drawn:
+            order = list(range(len(answer_key.questions[question_id].options)))
+            rng.shuffle(order)
+            option_orders[question_id] = tuple(order)
+
+    return Paper(question_ids=tuple(drawn), option_orders=option_orders)
+
+
+def paper_to_json(paper: Paper) -> dict:
+    """Paper as stored on an attempt, so it is graded as shown even if the bank changes"""
+    return {
+        "question_ids": list(paper.question_ids),
+        "option_orders": {str(question_id): list(order) for question_id, order in paper.option_orders.items()},
+    }
+
+
+def paper_from_json(answer_key: AnswerKey, data: dict) -> Paper:
+    """Stored paper, without the questions deleted from the bank since it was drawn
+
+    Questions whose option count changed meanwhile are shown in bank order.
+    """
+    question_ids = tuple(question_id for question_id in data["question_ids"] if question_id in answer_key.questions)
+    option_orders = {}
+    for key, order in data.get("option_orders", {}).items():
+        question = answer_key.questions.get(int(key))
+        if question is not None and sorted(order) == list(range(len(question.options))):
+            option_orders[int(key)] = tuple(order)
+    return Paper(question_ids=question_ids, option_orders=option_orders)
+
+
+def attempt_paper(answer_key: AnswerKey, seed: int, stored: Optional[dict]) -> Paper:
+    """Paper of an attempt: the one stored when it started, else drawn again from its seed"""
+    if stored is not None:
+        return paper_from_json(answer_key, stored)
+    return assemble_paper(answer_key, seed)
+
+
+def paper_answer_key(answer_key: AnswerKey, paper: Paper) -> AnswerKey:
+    """Answer key restricted to the questions of a paper, in paper order"""
+    return AnswerKey(
+        exam_id=answer_key.exam_id,
+        title=answer_key.title,
+        questions={question_id: answer_key.questions[question_id] for question_id in paper.question_ids}
+    )
+
+
+def to_bank_answers(paper: Paper, answers: List[AnswerSubmit]) -> List[AnswerSubmit]:
+    """Map answers from the option order shown on a paper back to the bank's option indices"""
+    bank_answers = []
+    for answer in answers:
+        order = paper.option_orders.get(answer.question_id)
+        selected_answer = answer.selected_answer
+        if order is not None and 0 <= selected_answer < len(order):
+            selected_answer = order[selected_answer]
+        bank_answers.append(AnswerSubmit(question_id=answer.question_id, selected_answer=selected_answer))
+    return bank_answers
+
+
+def paper_questions(answer_key: AnswerKey, paper: Paper) -> List[QuestionForStudent]:
+    """Questions of a paper as shown to the student, options in paper order"""
+    questions = []
+    for question_id in paper.question_ids:
+        question = answer_key.questions[question_id]
+        order = paper.option_orders.get(question_id)
+        questions.append(QuestionForStudent(
+            id=question.id,
+            question=question.question,
+            options=[question.options[index] for index in order] if order else question.options
+        ))
+    return questions
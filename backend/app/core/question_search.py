@@ -0,0 +1,239 @@
+import logging
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import Text, cast, inspect, or_, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.exam import Exam
+from app.models.question import Question
+from app.schemas.exam import QuestionSearchHit
+
+SNIPPET_START = "<mark>"
+SNIPPET_END = "</mark>"
+SNIPPET_WORDS = 16
+
+logger = logging.getLogger(__name__)
+
+# Whether each SQLite database (by URL) has its FTS5 table
+_sqlite_indexed: Dict[str, bool] = {}
+
+# Full-text index of SQLite: an FTS5 table with one row per question (rowid =
+# question id) kept in sync by triggers, so every write path (API, bulk
+# import, exam deletion) updates it. Options are indexed as their decoded
+# text rather than the JSON list.
+_SQLITE_OPTIONS_TEXT = "(SELECT group_concat(value, ' ') FROM json_each({}.options))"
+
+_SQLITE_INDEX = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5(
+        question, options, explanation,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3 4'
+    )
+    """,
+    # Matches in the question text rank above matches in options and explanation
+    "INSERT INTO questions_fts(questions_fts, rank) VALUES ('rank', 'bm25(3.0, 2.0, 1.0)')",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS questions_fts_insert AFTER INSERT ON questions BEGIN
+        INSERT INTO questions_fts(rowid, question, options, explanation)
+        VALUES (new.id, new.question, {_SQLITE_OPTIONS_TEXT.format("new")}, new.explanation);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS questions_fts_delete AFTER DELETE ON questions BEGIN
+        DELETE FROM questions_fts WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS questions_fts_update AFTER UPDATE OF question, options, explanation ON questions
+    BEGIN
+        DELETE FROM questions_fts WHERE rowid = old.id;
+        INSERT INTO questions_fts(rowid, question, options, explanation)
+        VALUES (new.id, new.question, {_SQLITE_OPTIONS_TEXT.format("new")}, new.explanation);
+    END
+    """,
+    f"""
+    INSERT INTO questions_fts(rowid, question, options, explanation)
+    SELECT id, question, {_SQLITE_OPTIONS_TEXT.format("questions")}, explanation FROM questions
+    """,
+]
+
+# Full-text index of PostgreSQL: a generated tsvector column with a GIN index
+_POSTGRES_INDEX = [
+    """
+    ALTER TABLE questions ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(question, '')), 'A')
+        || setweight(jsonb_to_tsvector('simple', coalesce(options::jsonb, '[]'::jsonb), '["string"]'), 'B')
+        || setweight(to_tsvector('simple', coalesce(explanation, '')), 'C')
+    ) STORED
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_questions_search_vector ON questions USING GIN (search_vector)",
+]
+
+
+def create_search_index(engine: Engine) -> None:
+    """Create the full-text index of the question bank if it does not exist yet, filling it from the table
+
+    Other databases than SQLite and PostgreSQL have no index and are searched
+    with LIKE.
+    """
+    dialect = engine.dialect.name
+    if dialect == "sqlite":
+        if _has_sqlite_index(engine):
+            return
+        try:
+            with engine.begin() as connection:
+                for statement in _SQLITE_INDEX:
+                    connection.execute(text(statement))
+            _sqlite_indexed[str(engine.url)] = True
+        except OperationalError:
+            logger.warning("SQLite has no FTS5, question search falls back to LIKE", exc_info=True)
+    elif dialect == "postgresql":
+        with engine.begin() as connection:
+            for statement in _POSTGRES_INDEX:
+                connection.execute(text(statement))
+
+
+def _has_sqlite_index(engine: Engine) -> bool:
+    url = str(engine.url)
+    if url not in _sqlite_indexed:
+        _sqlite_indexed[url] = inspect(engine).has_table("questions_fts")
+    return _sqlite_indexed[url]
+
+
+def search_terms(query: str) -> List[str]:
+    """Words of a search query; operators and punctuation are ignored"""
+    return re.findall(r"\w+", query.lower())
+
+
+def _sqlite_search(db: Session, terms: List[str], exam_id: Optional[int], skip: int, limit: int):
+    # Every term must match, the last one as a prefix so results show up while typing
+    match = " ".join([f'"{term}"' for term in terms[:-1]] + [f'"{terms[-1]}"*'])
+    exam_filter = "AND q.exam_id = :exam_id" if exam_id is not None else ""
+    params = {
+        "match": match,
+        "exam_id": exam_id,
+        "candidates": settings.SEARCH_MAX_CANDIDATES,
+        "start": SNIPPET_START,
+        "end": SNIPPET_END,
+        "limit": limit,
+        "skip": skip
+    }
+
+    # bm25 scores every match, so queries matching more than the candidate
+    # limit are ranked among their newest matches only, found from the rowid
+    # index without scoring
+    boundary = db.execute(text(f"""
+        SELECT questions_fts.rowid
+        FROM questions_fts
+        JOIN questions q ON q.id = questions_fts.rowid
+        WHERE questions_fts MATCH :match {exam_filter}
+        ORDER BY questions_fts.rowid DESC
+        LIMIT 1 OFFSET :candidates
+    """), params).scalar()
+    params["boundary"] = boundary
+
+    statement = f"""
+        SELECT q.id AS question_id, q.exam_id, e.title AS exam_title, q.question_order, q.question,
+               snippet(questions_fts, -1, :start, :end, '…', {SNIPPET_WORDS}) AS snippet,
+               -questions_fts.rank AS rank
+        FROM questions_fts
+        JOIN questions q ON q.id = questions_fts.rowid
+        JOIN exams e ON e.id = q.exam_id
+        WHERE questions_fts MATCH :match {exam_filter}
+              {"AND questions_fts.rowid > :boundary" if boundary is not None else ""}
+        ORDER BY questions_fts.rank
+        LIMIT :limit OFFSET :skip
+    """
+    return db.execute(text(statement), params).all()
+
+
+def _postgres_search(db: Session, terms: List[str], exam_id: Optional[int], skip: int, limit: int):
+    # Same semantics as SQLite: the newest matching candidates, ranked
+    statement = f"""
+        WITH query AS (SELECT to_tsquery('simple', :match) AS query),
+        candidates AS (
+            SELECT q.id
+            FROM questions q, query
+            WHERE q.search_vector @@ query.query {"AND q.exam_id = :exam_id" if exam_id is not None else ""}
+            ORDER BY q.id DESC
+            LIMIT :candidates
+        )
+        SELECT q.id AS question_id, q.exam_id, e.title AS exam_title, q.question_order, q.question,
+               ts_headline('simple', q.question || ' ' || q.explanation, query.query, :headline) AS snippet,
+               ts_rank_cd(q.search_vector, query.query) AS rank
+        FROM candidates
+        JOIN questions q ON q.id = candidates.id
+        JOIN exams e ON e.id = q.exam_id,
+             query
+        ORDER BY rank DESC, q.id
+        LIMIT :limit OFFSET :skip
+    """
+    return db.execute(text(statement), {
+        "match": " & ".join(terms[:-1] + [f"{terms[-1]}:*"]),
+        "exam_id": exam_id,
+        "candidates": settings.SEARCH_MAX_CANDIDATES,
+        "headline": f"StartSel={SNIPPET_START}, StopSel={SNIPPET_END}, MaxWords={SNIPPET_WORDS}, MinWords=5",
+        "limit": limit,
+        "skip": skip
+    }).all()
+
+
+def _like_search(db: Session, terms: List[str], exam_id: Optional[int], skip: int, limit: int):
+    """Unindexed fallback: questions containing every term, unranked"""
+    statement = select(
+        Question.id.label("question_id"),
+        Question.exam_id,
+        Exam.title.label("exam_title"),
+        Question.question_order,
+        Question.question,
+        Question.question.label("snippet")
+    ).join(Exam, Exam.id == Question.exam_id)
+    for term in terms:
+        pattern = f"%{term}%"
+        statement = statement.where(or_(
+            Question.question.ilike(pattern),
+            Question.explanation.ilike(pattern),
+            cast(Question.options, Text).ilike(pattern)
+        ))
+    if exam_id is not None:
+        statement = statement.where(Question.exam_id == exam_id)
+    return db.execute(statement.order_by(Question.id).offset(skip).limit(limit)).all()
+
+
+def search_questions(
+    db: Session,
+    query: str,
+    exam_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20
+) -> List[QuestionSearchHit]:
+    """Questions of the bank matching every word of a query, best matches first, with a highlighted snippet"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        rows = _postgres_search(db, terms, exam_id, skip, limit)
+    elif dialect == "sqlite" and _has_sqlite_index(db.get_bind()):
+        rows = _sqlite_search(db, terms, exam_id, skip, limit)
+    else:
+        rows = _like_search(db, terms, exam_id, skip, limit)
+
+    return [
+        QuestionSearchHit(
+            question_id=row.question_id,
+            exam_id=row.exam_id,
+            exam_title=row.exam_title,
+            question_order=row.question_order,
+            question=row.question,
+            snippet=row.snippet,
+            rank=getattr(row, "rank", None)
+        )
+        for row in rows
+    ]
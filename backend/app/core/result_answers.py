@@ -0,0 +1,115 @@
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, exists, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.result import Result
+from app.models.result_answer import ResultAnswer
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def answer_rows(result_id: int, answers: List[dict]) -> List[dict]:
+    """Rows of the result_answers table for the graded answers of a result"""
+    return [
+        {
+            "result_id": result_id,
+            "question_id": answer["question_id"],
+            "selected_answer": answer["selected_answer"],
+            "is_correct": answer["is_correct"]
+        }
+        for answer in answers
+    ]
+
+
+def save_answers(db: Session, result_id: int, answers: List[dict]) -> None:
+    """Bulk insert the graded answers of a flushed result"""
+    if answers:
+        db.execute(insert(ResultAnswer), answer_rows(result_id, answers))
+
+
+async def save_answers_async(db: AsyncSession, result_id: int, answers: List[dict]) -> None:
+    """Async variant of save_answers"""
+    if answers:
+        await db.execute(insert(ResultAnswer), answer_rows(result_id, answers))
+
+
+def delete_answers(db: Session, result_ids) -> None:
+    """Delete the answers of the given results (ids or a select of ids)"""
+    db.execute(delete(ResultAnswer).where(ResultAnswer.result_id.in_(result_ids)))
+
+
+def _answers_statement(result_ids: List[int]):
+    return select(
+        ResultAnswer.result_id,
+        ResultAnswer.question_id,
+        ResultAnswer.selected_answer,
+        ResultAnswer.is_correct
+    ).where(ResultAnswer.result_id.in_(result_ids)).order_by(ResultAnswer.id)
+
+
+def _group_answers(results: Iterable[Result], rows) -> Dict[int, List[dict]]:
+    """Group answer rows by result, falling back to the legacy JSON list"""
+    answers = {}
+    for row in rows:
+        answers.setdefault(row.result_id, []).append({
+            "question_id": row.question_id,
+            "selected_answer": row.selected_answer,
+            "is_correct": row.is_correct
+        })
+
+    for result in results:
+        if result.id not in answers:
+            answers[result.id] = result.answers or []
+
+    return answers
+
+
+def load_answers(db: Session, results: List[Result]) -> Dict[int, List[dict]]:
+    """Answers of several results (or rows with id and answers) keyed by result id, in one query"""
+    if not results:
+        return {}
+    rows = db.execute(_answers_statement([result.id for result in results])).all()
+    return _group_answers(results, rows)
+
+
+async def load_answers_async(db: AsyncSession, results: List[Result]) -> Dict[int, List[dict]]:
+    """Async variant of load_answers"""
+    if not results:
+        return {}
+    rows = (await db.execute(_answers_statement([result.id for result in results]))).all()
+    return _group_answers(results, rows)
+
+
+def backfill_result_answers(
+    db: Session,
+    exam_id: Optional[int] = None,
+    batch_size: int = BACKFILL_BATCH_SIZE
+) -> int:
+    """Copy legacy JSON answers into result_answers for results that have no rows yet
+
+    Idempotent: results already migrated are skipped. Returns the number of
+    results backfilled; the caller commits.
+    """
+    statement = select(Result.id).where(
+        ~exists().where(ResultAnswer.result_id == Result.id)
+    ).order_by(Result.id)
+    if exam_id is not None:
+        statement = statement.where(Result.exam_id == exam_id)
+    pending_ids = db.execute(statement).scalars().all()
+
+    backfilled = 0
+    for start in range(0, len(pending_ids), batch_size):
+        batch = pending_ids[start:start + batch_size]
+        rows = []
+        for result_id, answers in db.execute(
+            select(Result.id, Result.answers).where(Result.id.in_(batch))
+        ):
+            if answers:
+                rows.extend(answer_rows(result_id, answers))
+                backfilled += 1
+        if rows:
+            db.execute(insert(ResultAnswer), rows)
+
+    return backfilled
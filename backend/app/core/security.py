@@ -1,11 +1,22 @@
+import asyncio
+import hashlib
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 from app.core.database import get_db
 from app.models.user import User
@@ -14,6 +25,53 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
 
+@dataclass(frozen=True)
+class UserPrincipal:
+    """Authenticated user as seen by the API, detached from any session"""
+    id: int
+    email: str
+    full_name: Optional[str]
+    is_admin: bool
+    is_active: bool
+    created_at: Optional[datetime]
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserPrincipal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_admin=bool(user.is_admin),
+            is_active=bool(user.is_active),
+            created_at=user.created_at
+        )
+
+
+user_cache = TTLCache(maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS)
+token_cache = TTLCache(maxsize=settings.TOKEN_CACHE_SIZE, ttl=settings.TOKEN_CACHE_TTL_SECONDS)
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    """Drop the cached principal of a user after it changes"""
+    user_cache.pop(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _collect_changed_user(mapper, connection, target: User) -> None:
+    # Flushed is not committed yet: a request reading the user now would cache
+    # the old row again, so the cache is only invalidated after the commit
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault("changed_user_ids", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session: Session) -> None:
+    for user_id in session.info.pop("changed_user_ids", ()):
+        invalidate_cached_user(user_id)
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -24,6 +82,71 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+_password_pool: Optional[ProcessPoolExecutor] = None
+_password_pool_lock = threading.Lock()
+_password_slots = threading.BoundedSemaphore(
+    max(settings.PASSWORD_HASH_WORKERS, 1) + settings.PASSWORD_HASH_QUEUE_SIZE
+)
+
+
+def _get_password_pool() -> ProcessPoolExecutor:
+    """Start the password hashing process pool on first use"""
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is None:
+            _password_pool = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return _password_pool
+
+
+def _discard_password_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken password pool so the next job starts a new one"""
+    global _password_pool
+    with _password_pool_lock:
+        if _password_pool is pool:
+            _password_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run_password_job(func, *args):
+    """Run a bcrypt operation in the password pool, rejecting work when saturated
+
+    The job is awaited rather than waited on, so requests queued for the pool
+    do not hold threads of the server's threadpool.
+    """
+    if not _password_slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many authentication requests, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+    
+    try:
+        if settings.PASSWORD_HASH_WORKERS <= 0:
+            return await run_in_threadpool(func, *args)
+        pool = _get_password_pool()
+        try:
+            return await asyncio.wrap_future(pool.submit(func, *args))
+        except BrokenProcessPool:
+            # A worker process died (e.g. killed for memory): retry once in a new pool
+            _discard_password_pool(pool)
+            return await asyncio.wrap_future(_get_password_pool().submit(func, *args))
+    finally:
+        _password_slots.release()
+
+
+async def verify_password_offloaded(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password in the bounded password pool"""
+    return await _run_password_job(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_offloaded(password: str) -> str:
+    """Hash a password in the bounded password pool"""
+    return await _run_password_job(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -38,22 +161,35 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_token(token: str) -> dict:
-    """Decode a JWT token"""
+    """Decode a JWT token, reusing the verified claims of recently seen tokens"""
+    token_key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(token_key)
+    if payload is not None and payload.get("exp", float("inf")) > time.time():
+        return dict(payload)
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    
+    # Never keep a token cached past its expiration
+    exp = payload.get("exp")
+    if exp is None:
+        token_cache.set(token_key, payload)
+    else:
+        token_cache.set(token_key, payload, ttl=exp - time.time())
+    
+    return dict(payload)
 
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
-) -> User:
+) -> UserPrincipal:
     """Get the current authenticated user"""
     token = credentials.credentials
     payload = decode_token(token)
@@ -75,6 +211,10 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    principal = user_cache.get(user_id)
+    if principal is not None:
+        return principal
+    
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise HTTPException(
@@ -83,10 +223,13 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return user
+    principal = UserPrincipal.from_user(user)
+    user_cache.set(user_id, principal)
+    
+    return principal
 
 
-def get_current_admin_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_admin_user(current_user: UserPrincipal = Depends(get_current_user)) -> UserPrincipal:
     """Get the current authenticated admin user"""
     if not current_user.is_admin:
         raise HTTPException(
@@ -0,0 +1,256 @@
+import logging
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from sqlalchemy import and_, bindparam, delete, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from app.core.answer_keys import get_answer_key
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.exam_stats import record_results
+from app.core.grading import build_result
+from app.core.question_pools import attempt_paper, paper_answer_key
+from app.core.result_answers import answer_rows
+from app.models.queued_submission import QueuedSubmission
+from app.models.result_answer import ResultAnswer
+from app.schemas.result import AnswerSubmit
+
+PENDING = "pending"
+PROCESSING = "processing"
+DONE = "done"
+FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def find_submission(db: Session, user_id: int, idempotency_key: str) -> Optional[QueuedSubmission]:
+    """Queued submission of a user with an idempotency key, or None"""
+    return db.execute(
+        select(QueuedSubmission).where(
+            QueuedSubmission.user_id == user_id,
+            QueuedSubmission.idempotency_key == idempotency_key
+        )
+    ).scalar_one_or_none()
+
+
+def delete_exam_submissions(db: Session, exam_id: int) -> None:
+    """Delete the queued submissions of an exam"""
+    db.execute(delete(QueuedSubmission).where(QueuedSubmission.exam_id == exam_id))
+
+
+def claim_batch(db: Session, batch_size: int, claim_timeout: float) -> Optional[str]:
+    """Mark up to batch_size pending submissions as processing under a new claim token
+
+    Submissions left processing longer than claim_timeout (their worker
+    died) are claimed again. Commits the claim and returns its token, or None
+    if there was nothing to claim.
+    """
+    token = uuid.uuid4().hex
+    now = _utcnow()
+    claimable = or_(
+        QueuedSubmission.status == PENDING,
+        and_(
+            QueuedSubmission.status == PROCESSING,
+            QueuedSubmission.claimed_at < now - timedelta(seconds=claim_timeout)
+        )
+    )
+    candidates = select(QueuedSubmission.id).where(claimable).order_by(QueuedSubmission.id).limit(batch_size)
+    # Check with a read first so idle polling does not take the write lock
+    if db.execute(candidates.limit(1)).first() is None:
+        db.rollback()
+        return None
+    if db.get_bind().dialect.name == "postgresql":
+        candidates = candidates.with_for_update(skip_locked=True)
+
+    db.execute(
+        update(QueuedSubmission)
+        .where(QueuedSubmission.id.in_(candidates), claimable)
+        .values(status=PROCESSING, claimed_by=token, claimed_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+    return token
+
+
+def grade_claimed(db: Session, token: str, submission_ids: Optional[List[int]] = None) -> int:
+    """Grade the submissions of a claim and store their results, in the caller's transaction
+
+    Results and their answers are inserted with multi-row statements and the
+    exam stats updated with one upsert per table. Returns the number of
+    submissions finished, or 0 if the claim was taken over meanwhile.
+    """
+    statement = select(QueuedSubmission).where(QueuedSubmission.claimed_by == token)
+    if submission_ids is not None:
+        statement = statement.where(QueuedSubmission.id.in_(submission_ids))
+    submissions = db.execute(statement.order_by(QueuedSubmission.id)).scalars().all()
+
+    graded, failed = [], []
+    for submission in submissions:
+        answer_key = get_answer_key(db, submission.exam_id)
+        if answer_key is None:
+            failed.append({"b_id": submission.id, "b_error": "Exam not found"})
+            continue
+        paper = None
+        if answer_key.randomized and (submission.paper is not None or submission.seed is not None):
+            # Answers were mapped to the bank's options when queued; grade them against the paper
+            paper = attempt_paper(answer_key, submission.seed, submission.paper)
+            answer_key = paper_answer_key(answer_key, paper)
+        answers = [AnswerSubmit(**answer) for answer in submission.answers]
+        db_result, answers_list, _ = build_result(submission.user_id, answer_key, answers, submission.seed, paper)
+        graded.append((submission, db_result, answers_list))
+
+    if graded:
+        db.add_all([db_result for _, db_result, _ in graded])
+        db.flush()
+        rows = [
+            row
+            for _, db_result, answers_list in graded
+            for row in answer_rows(db_result.id, answers_list)
+        ]
+        if rows:
+            db.execute(insert(ResultAnswer), rows)
+        record_results(db, [(db_result, answers_list) for _, db_result, answers_list in graded])
+
+    table = QueuedSubmission.__table__
+    now = _utcnow()
+    finished = 0
+    if graded:
+        finished += db.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"), table.c.claimed_by == token)
+            .values(status=DONE, result_id=bindparam("b_result_id"), processed_at=now),
+            [{"b_id": submission.id, "b_result_id": db_result.id} for submission, db_result, _ in graded]
+        ).rowcount
+    if failed:
+        finished += db.execute(
+            update(table)
+            .where(table.c.id == bindparam("b_id"), table.c.claimed_by == token)
+            .values(status=FAILED, error=bindparam("b_error"), processed_at=now),
+            failed
+        ).rowcount
+
+    if finished != len(submissions):
+        # Another worker reclaimed part of this batch; let it grade the whole batch
+        db.rollback()
+        return 0
+    return finished
+
+
+class SubmissionWorkers:
+    """Threads draining the submission queue in batches
+
+    Every worker claims a batch, grades it and stores all its results in one
+    transaction. A batch that fails is retried one submission at a time, so a
+    single bad submission is marked failed without holding back the others.
+    """
+
+    def __init__(self, session_factory, workers: int, batch_size: int, poll_interval: float, claim_timeout: float):
+        self.session_factory = session_factory
+        self.workers = workers
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.claim_timeout = claim_timeout
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def notify(self) -> None:
+        """Wake the workers up after a submission is queued"""
+        self._wakeup.set()
+
+    def _grade_one_by_one(self, token: str, submission_ids: List[int]) -> int:
+        finished = 0
+        for submission_id in submission_ids:
+            db = self.session_factory()
+            try:
+                finished += grade_claimed(db, token, [submission_id])
+                db.commit()
+            except Exception as exc:
+                db.rollback()
+                logger.exception("Failed to grade queued submission %s", submission_id)
+                db.execute(
+                    update(QueuedSubmission)
+                    .where(QueuedSubmission.id == submission_id, QueuedSubmission.claimed_by == token)
+                    .values(status=FAILED, error=str(exc)[:500], processed_at=_utcnow())
+                )
+                db.commit()
+                finished += 1
+            finally:
+                db.close()
+        return finished
+
+    def process_batch(self) -> int:
+        """Claim and grade one batch; returns the number of submissions finished"""
+        db = self.session_factory()
+        try:
+            token = claim_batch(db, self.batch_size, self.claim_timeout)
+            if token is None:
+                return 0
+            submission_ids = db.execute(
+                select(QueuedSubmission.id).where(QueuedSubmission.claimed_by == token)
+            ).scalars().all()
+            if not submission_ids:
+                return 0
+            try:
+                finished = grade_claimed(db, token)
+                db.commit()
+                return finished
+            except Exception:
+                db.rollback()
+        finally:
+            db.close()
+
+        return self._grade_one_by_one(token, submission_ids)
+
+    def drain(self) -> int:
+        """Grade queued submissions until none is left; returns how many were finished"""
+        total = 0
+        while True:
+            finished = self.process_batch()
+            if not finished:
+                return total
+            total += finished
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                if self.process_batch():
+                    continue
+            except Exception:
+                logger.exception("Submission worker failed")
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+
+    def start(self) -> None:
+        """Start the worker threads"""
+        if self._threads:
+            return
+        self._stopping.clear()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"submission-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self) -> None:
+        """Stop the worker threads once their current batch is done"""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+submission_workers = SubmissionWorkers(
+    SessionLocal,
+    workers=settings.SUBMISSION_WORKERS,
+    batch_size=settings.SUBMISSION_BATCH_SIZE,
+    poll_interval=settings.SUBMISSION_POLL_INTERVAL_SECONDS,
+    claim_timeout=settings.SUBMISSION_CLAIM_TIMEOUT_SECONDS
+)
@@ -1,17 +1,39 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.core.attempts import answer_buffer
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
 from app.core.database import engine, Base
-from app.api import auth, exams, results
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.core.question_search import create_search_index
+from app.core.submission_queue import submission_workers
+from app.api import attempts, auth, exams, packaged_exams, questions, results, submissions
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
+create_search_index(engine)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Flush autosaved answers in the background, and what is left on shutdown
+    answer_buffer.start()
+    # Grade queued submissions
+    if settings.SUBMISSION_WORKERS > 0:
+        submission_workers.start()
+    yield
+    submission_workers.stop()
+    answer_buffer.stop()
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -23,6 +45,7 @@ if settings.DEBUG:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "Location"],
     )
 else:
     app.add_middleware(
@@ -31,12 +54,30 @@ else:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "Location"],
     )
 
+# Compress large responses; precompressed exam payloads pass through as they are
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.GZIP_COMPRESSLEVEL,
+    brotli_quality=settings.BROTLI_QUALITY
+)
+
 # Include routers
+# Async variants go first so they take precedence over their sync counterparts
+if settings.ASYNC_DATABASE:
+    app.include_router(exams.async_router, prefix="/api/exams", tags=["Exams"])
+    app.include_router(results.async_router, prefix="/api/results", tags=["Results"])
+
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(exams.router, prefix="/api/exams", tags=["Exams"])
+app.include_router(questions.router, prefix="/api/questions", tags=["Questions"])
 app.include_router(results.router, prefix="/api/results", tags=["Results"])
+app.include_router(attempts.router, prefix="/api/attempts", tags=["Attempts"])
+app.include_router(submissions.router, prefix="/api/submissions", tags=["Submissions"])
+app.include_router(packaged_exams.router, prefix="/api/packaged-exams", tags=["Packaged exams"])
 
 
 @app.get("/")
@@ -2,5 +2,10 @@ from app.models.user import User
 from app.models.exam import Exam
 from app.models.question import Question
 from app.models.result import Result
+from app.models.result_answer import ResultAnswer
+from app.models.submission_key import SubmissionKey
+from app.models.attempt import Attempt, AttemptAnswer
+from app.models.queued_submission import QueuedSubmission
+from app.models.exam_stats import ExamStats, ExamScoreBucket, ExamQuestionStats
 
-__all__ = ["User", "Exam", "Question", "Result"]
+__all__ = ["User", "Exam", "Question", "Result", "ResultAnswer", "SubmissionKey", "Attempt", "AttemptAnswer", "QueuedSubmission", "ExamStats", "ExamScoreBucket", "ExamQuestionStats"]
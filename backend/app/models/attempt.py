@@ -0,0 +1,30 @@
+from sqlalchemy import Column, BigInteger, Integer, SmallInteger, ForeignKey, DateTime, Index, JSON
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class Attempt(Base):
+    """Exam attempt in progress, whose answers are autosaved until it is submitted"""
+    __tablename__ = "attempts"
+    __table_args__ = (
+        Index("ix_attempts_user_id_exam_id", "user_id", "exam_id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), nullable=False)
+    started_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), nullable=True)
+    submitted_at = Column(DateTime(timezone=True), nullable=True)
+    seed = Column(BigInteger, nullable=True)  # Seed of the randomized paper, see app.core.question_pools
+    paper = Column(JSON, nullable=True)  # Randomized paper as drawn at the start, graded even if the bank changes
+
+
+class AttemptAnswer(Base):
+    """Latest autosaved answer of a question in an attempt"""
+    __tablename__ = "attempt_answers"
+
+    attempt_id = Column(Integer, ForeignKey("attempts.id", ondelete="CASCADE"), primary_key=True)
+    question_id = Column(Integer, primary_key=True)
+    selected_answer = Column(SmallInteger, nullable=False)
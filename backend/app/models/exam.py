@@ -1,19 +1,38 @@
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, JSON
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import false, func
 
 from app.core.database import Base
 
 
 class Exam(Base):
     __tablename__ = "exams"
+    # Never reuse the id of a deleted exam: caches are keyed on (id, version)
+    # and a new exam starts again at version 1
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     duration_minutes = Column(Integer, default=30)
+    # Randomized papers: questions drawn per attempt from the exam's bank
+    pool_size = Column(Integer, nullable=True)  # Questions per paper, None for all
+    pool_tags = Column(JSON, nullable=True)  # Questions per paper by tag, overrides pool_size
+    shuffle_options = Column(Boolean, nullable=False, default=False, server_default=false())
+    # Bumped on every edit, so each worker process notices its cached copies are stale
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     # Relationships
-    questions = relationship("Question", back_populates="exam", cascade="all, delete-orphan")
+    questions = relationship(
+        "Question",
+        back_populates="exam",
+        cascade="all, delete-orphan",
+        order_by="Question.question_order"
+    )
     results = relationship("Result", back_populates="exam", cascade="all, delete-orphan")
+
+    @property
+    def randomized(self) -> bool:
+        """Whether every attempt gets its own paper instead of the full question list"""
+        return bool(self.pool_size or self.pool_tags or self.shuffle_options)
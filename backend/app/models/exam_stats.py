@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+
+from app.core.database import Base
+
+
+class ExamStats(Base):
+    """Running totals of the results of an exam"""
+    __tablename__ = "exam_stats"
+
+    exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), primary_key=True)
+    attempt_count = Column(Integer, nullable=False, default=0)
+    score_sum = Column(Float, nullable=False, default=0)
+
+
+class ExamScoreBucket(Base):
+    """Number of results of an exam whose score falls in a 1-point bucket (0-100)"""
+    __tablename__ = "exam_score_buckets"
+
+    exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class ExamQuestionStats(Base):
+    """Answer counts of a question across the results of its exam"""
+    __tablename__ = "exam_question_stats"
+
+    exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), primary_key=True)
+    question_id = Column(Integer, primary_key=True)
+    answered = Column(Integer, nullable=False, default=0)
+    correct = Column(Integer, nullable=False, default=0)
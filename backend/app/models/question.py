@@ -8,12 +8,13 @@ class Question(Base):
     __tablename__ = "questions"
 
     id = Column(Integer, primary_key=True, index=True)
-    exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), nullable=False)
+    exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), nullable=False, index=True)
     question = Column(Text, nullable=False)
     options = Column(JSON, nullable=False)  # List of options
     correct_answer = Column(Integer, nullable=False)  # Index of correct option
     explanation = Column(Text, nullable=False)
     question_order = Column(Integer, nullable=False)
+    tag = Column(String, nullable=True)  # Stratum of the exam's question bank
 
     # Relationships
     exam = relationship("Exam", back_populates="questions")
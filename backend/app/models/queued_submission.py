@@ -0,0 +1,29 @@
+from sqlalchemy import Column, BigInteger, Integer, String, Text, ForeignKey, DateTime, JSON, Index, UniqueConstraint
+from sqlalchemy.sql import func
+
+from app.core.database import Base
+
+
+class QueuedSubmission(Base):
+    """Exam submission waiting to be graded by the submission workers"""
+    __tablename__ = "submission_queue"
+    __table_args__ = (
+        Index("ix_submission_queue_status_id", "status", "id"),
+        UniqueConstraint("user_id", "idempotency_key", name="uq_submission_queue_user_id_idempotency_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), nullable=False)
+    answers = Column(JSON, nullable=False)  # List of submitted answers
+    seed = Column(BigInteger, nullable=True)  # Paper seed of the attempt, for randomized exams
+    paper = Column(JSON, nullable=True)  # Paper of the attempt, for randomized exams
+    idempotency_key = Column(String(64), nullable=True)
+    request_hash = Column(String(64), nullable=True)
+    status = Column(String(16), nullable=False, default="pending")  # pending, processing, done, failed
+    claimed_by = Column(String(32), nullable=True)
+    claimed_at = Column(DateTime, nullable=True)
+    result_id = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    processed_at = Column(DateTime(timezone=True), nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, JSON
+from sqlalchemy import Column, BigInteger, Integer, String, Float, ForeignKey, DateTime, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -7,14 +7,22 @@ from app.core.database import Base
 
 class Result(Base):
     __tablename__ = "results"
+    __table_args__ = (
+        Index("ix_results_user_id_created_at", "user_id", "created_at"),
+        Index("ix_results_created_at_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     exam_id = Column(Integer, ForeignKey("exams.id", ondelete="CASCADE"), nullable=False)
-    answers = Column(JSON, nullable=False)  # List of user's answers
+    # Legacy JSON list of answers; new results store them in result_answers
+    answers = Column(JSON, nullable=False, default=list)
     score = Column(Float, nullable=False)
     correct_answers = Column(Integer, nullable=False)
     total_questions = Column(Integer, nullable=False)
+    # Paper of a randomized attempt, to know which questions it was shown; None on fixed exams
+    seed = Column(BigInteger, nullable=True)
+    paper = Column(JSON, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     # Relationships
@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, SmallInteger, Boolean, ForeignKey, Index
+
+from app.core.database import Base
+
+
+class ResultAnswer(Base):
+    __tablename__ = "result_answers"
+    __table_args__ = (
+        Index("ix_result_answers_result_id", "result_id"),
+        Index("ix_result_answers_question_id_is_correct", "question_id", "is_correct"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    result_id = Column(Integer, ForeignKey("results.id", ondelete="CASCADE"), nullable=False)
+    question_id = Column(Integer, nullable=False)
+    selected_answer = Column(SmallInteger, nullable=False)
+    is_correct = Column(Boolean, nullable=False)
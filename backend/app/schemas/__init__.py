@@ -1,13 +1,23 @@
 from app.schemas.user import User, UserCreate, UserLogin, UserUpdate, Token
 from app.schemas.exam import (
     Exam, ExamCreate, ExamUpdate, ExamList, ExamForStudent,
-    Question, QuestionCreate
+    Question, QuestionCreate, QuestionUpdate, QuestionPatch,
+    ExamStatistics, QuestionStatistics, ItemAnalysis, ItemStatistics, QuestionSearchHit,
+    DuplicateQuestion, DuplicateGroup, DuplicateReport
 )
-from app.schemas.result import Result, ResultCreate, ResultWithDetails, ResultDetailed
+from app.schemas.result import (
+    Result, ResultCreate, ResultWithDetails, ResultDetailed, PackagedSubmission, GradedSubmission
+)
+from app.schemas.attempt import Attempt, AttemptCreate, AttemptAnswersUpdate
+from app.schemas.submission import SubmissionStatus
 
 __all__ = [
     "User", "UserCreate", "UserLogin", "UserUpdate", "Token",
     "Exam", "ExamCreate", "ExamUpdate", "ExamList", "ExamForStudent",
-    "Question", "QuestionCreate",
-    "Result", "ResultCreate", "ResultWithDetails", "ResultDetailed"
+    "Question", "QuestionCreate", "QuestionUpdate", "QuestionPatch",
+    "ExamStatistics", "QuestionStatistics", "ItemAnalysis", "ItemStatistics", "QuestionSearchHit",
+    "DuplicateQuestion", "DuplicateGroup", "DuplicateReport",
+    "Result", "ResultCreate", "ResultWithDetails", "ResultDetailed", "PackagedSubmission", "GradedSubmission",
+    "Attempt", "AttemptCreate", "AttemptAnswersUpdate",
+    "SubmissionStatus"
 ]
@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Dict, List, Optional
+from datetime import datetime
+
+from app.schemas.result import AnswerSubmit
+
+
+class AttemptCreate(BaseModel):
+    exam_id: int
+
+
+class AttemptAnswersUpdate(BaseModel):
+    answers: List[AnswerSubmit]
+
+
+class Attempt(BaseModel):
+    id: int
+    exam_id: int
+    started_at: datetime
+    submitted_at: Optional[datetime] = None
+    answers: Dict[int, int]
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
 from datetime import datetime
 
 
@@ -8,12 +8,26 @@ class QuestionBase(BaseModel):
     options: List[str]
     correct_answer: int
     explanation: str
+    tag: Optional[str] = None
 
 
 class QuestionCreate(QuestionBase):
     pass
 
 
+class QuestionUpdate(QuestionBase):
+    """Question in a full exam update, matched to an existing one by id if given"""
+    id: Optional[int] = None
+
+
+class QuestionPatch(BaseModel):
+    question: Optional[str] = None
+    options: Optional[List[str]] = None
+    correct_answer: Optional[int] = None
+    explanation: Optional[str] = None
+    tag: Optional[str] = None
+
+
 class QuestionInDB(QuestionBase):
     id: int
     exam_id: int
@@ -40,6 +54,9 @@ class QuestionForStudent(BaseModel):
 class ExamBase(BaseModel):
     title: str
     duration_minutes: int = 30
+    pool_size: Optional[int] = Field(None, ge=1)
+    pool_tags: Optional[Dict[str, int]] = None
+    shuffle_options: bool = False
 
 
 class ExamCreate(ExamBase):
@@ -49,7 +66,10 @@ class ExamCreate(ExamBase):
 class ExamUpdate(BaseModel):
     title: Optional[str] = None
     duration_minutes: Optional[int] = None
-    questions: Optional[List[QuestionCreate]] = None
+    pool_size: Optional[int] = Field(None, ge=1)
+    pool_tags: Optional[Dict[str, int]] = None
+    shuffle_options: Optional[bool] = None
+    questions: Optional[List[QuestionUpdate]] = None
 
 
 class ExamInDB(ExamBase):
@@ -71,4 +91,71 @@ class ExamForStudent(ExamInDB):
 
 class ExamList(ExamInDB):
     """Exam in list view without questions"""
-    question_count: Optional[int] = 0
+    question_count: Optional[int] = 0  # Questions per paper
+    bank_size: Optional[int] = None  # Questions in the bank, for randomized exams
+
+
+class QuestionStatistics(BaseModel):
+    question_id: int
+    answered: int
+    correct: int
+    correct_rate: Optional[float] = None
+
+
+class ExamStatistics(BaseModel):
+    """Aggregated results of an exam; the histogram has 10-point score bins"""
+    exam_id: int
+    attempt_count: int
+    mean_score: Optional[float] = None
+    median_score: Optional[float] = None
+    p90_score: Optional[float] = None
+    score_histogram: List[int]
+    questions: List[QuestionStatistics]
+
+
+class QuestionSearchHit(BaseModel):
+    """Question matching a search, with the matched words highlighted in its snippet"""
+    question_id: int
+    exam_id: int
+    exam_title: str
+    question_order: int
+    question: str
+    snippet: str
+    rank: Optional[float] = None
+
+
+class DuplicateQuestion(BaseModel):
+    question_id: int
+    exam_id: int
+    exam_title: str
+    question: str
+
+
+class DuplicateGroup(BaseModel):
+    """Near-duplicate questions, with the lowest estimated similarity linking them"""
+    similarity: float
+    questions: List[DuplicateQuestion]
+
+
+class DuplicateReport(BaseModel):
+    threshold: float
+    question_count: int
+    groups: List[DuplicateGroup]
+
+
+class ItemStatistics(BaseModel):
+    question_id: int
+    difficulty: Optional[float] = None
+    discrimination: Optional[float] = None
+    point_biserial: Optional[float] = None
+    option_counts: List[int]
+    option_frequencies: List[float]
+    omitted: int
+    presented: int  # Students shown the question; fewer than all on randomized exams
+
+
+class ItemAnalysis(BaseModel):
+    """Psychometric item statistics of an exam over its stored results"""
+    exam_id: int
+    student_count: int
+    questions: List[ItemStatistics]
@@ -1,16 +1,21 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, Field
+from typing import List, Optional
 from datetime import datetime
 
 
 class AnswerSubmit(BaseModel):
     question_id: int
-    selected_answer: int
+    # Option index, or -1 for a question left blank; stored as a SmallInteger
+    selected_answer: int = Field(ge=-1, le=32767)
 
 
 class ResultCreate(BaseModel):
     exam_id: int
     answers: List[AnswerSubmit]
+    # Autosaved attempt being submitted; its saved answers fill in any
+    # question missing from `answers`. Required for randomized exams, whose
+    # paper is rebuilt from the attempt's seed
+    attempt_id: Optional[int] = None
 
 
 class ResultInDB(BaseModel):
@@ -50,3 +55,17 @@ class ResultDetail(BaseModel):
 class ResultDetailed(Result):
     exam_title: str
     details: List[ResultDetail]
+
+
+class PackagedSubmission(BaseModel):
+    answers: List[AnswerSubmit]
+
+
+class GradedSubmission(BaseModel):
+    """Answers graded against a packaged exam; nothing is stored"""
+    exam_id: int
+    exam_title: str
+    score: float
+    correct_answers: int
+    total_questions: int
+    details: List[ResultDetail]
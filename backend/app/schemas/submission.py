@@ -0,0 +1,16 @@
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class SubmissionStatus(BaseModel):
+    id: int
+    exam_id: int
+    status: str
+    result_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    processed_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
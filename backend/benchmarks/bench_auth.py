@@ -0,0 +1,80 @@
+"""
+Benchmark de la dependencia de autenticación con y sin cachés
+
+Uso: python benchmarks/bench_auth.py [requests] [threads]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_db_fd, _db_path = tempfile.mkstemp(suffix=".db")
+os.close(_db_fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.security import HTTPAuthorizationCredentials  # noqa: E402
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.security import (  # noqa: E402
+    create_access_token,
+    get_current_user,
+    token_cache,
+    user_cache
+)
+from app.models.user import User  # noqa: E402
+
+
+def authenticate(credentials: HTTPAuthorizationCredentials) -> float:
+    """Run the auth dependency once and return its latency in seconds"""
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        get_current_user(credentials=credentials, db=db)
+    finally:
+        db.close()
+    return time.perf_counter() - start
+
+
+def run(label: str, credentials: HTTPAuthorizationCredentials, requests: int, threads: int):
+    """Run the auth dependency concurrently and print throughput and latency"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = sorted(pool.map(lambda _: authenticate(credentials), range(requests)))
+    elapsed = time.perf_counter() - start
+
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"{label:<10} {requests / elapsed:>10.0f} req/s   p50 {p50:6.3f} ms   p99 {p99:6.3f} ms")
+
+
+def main(requests: int = 20000, threads: int = 16):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    user = User(email="bench@example.com", hashed_password="x", full_name="Bench")
+    db.add(user)
+    db.commit()
+    token = create_access_token(data={"sub": str(user.id)})
+    db.close()
+
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    print("=" * 60)
+    print(f"Auth dependency benchmark ({requests} requests, {threads} threads)")
+    print("=" * 60)
+
+    user_size, token_size = user_cache.maxsize, token_cache.maxsize
+    user_cache.maxsize = token_cache.maxsize = 0
+    run("uncached", credentials, requests, threads)
+
+    user_cache.maxsize, token_cache.maxsize = user_size, token_size
+    run("cached", credentials, requests, threads)
+
+
+if __name__ == "__main__":
+    try:
+        main(*(int(arg) for arg in sys.argv[1:3]))
+    finally:
+        os.remove(_db_path)
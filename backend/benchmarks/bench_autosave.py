@@ -0,0 +1,134 @@
+"""
+Benchmark del autoguardado de respuestas: una escritura por petición frente
+al buffer que agrupa las actualizaciones y las escribe por lotes
+
+Uso: python benchmarks/bench_autosave.py [students] [seconds] [autosave_interval]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+_db_fd, _db_path = tempfile.mkstemp(suffix=".db")
+os.close(_db_fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete, event  # noqa: E402
+
+from app.core.attempts import AnswerWriteBuffer  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import Base, SessionLocal, dialect_insert, engine  # noqa: E402
+from app.models import Attempt, AttemptAnswer, Exam, User  # noqa: E402
+
+QUESTIONS = 50
+
+statements = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _count_statements(*args):
+    global statements
+    statements += 1
+
+
+def autosave_schedule(students: int, seconds: int, interval: int, seed: int = 1):
+    """(time, attempt id, answers) of every autosave, students changing 1-3 answers between saves"""
+    rng = random.Random(seed)
+    events = []
+    for attempt_id in range(1, students + 1):
+        offset = rng.uniform(0, interval)
+        for tick in range(int(seconds / interval)):
+            changed = {rng.randrange(1, QUESTIONS + 1): rng.randrange(4) for _ in range(rng.randint(1, 3))}
+            events.append((offset + tick * interval, attempt_id, changed))
+    events.sort(key=lambda event: event[0])
+    return events
+
+
+def reset():
+    db = SessionLocal()
+    db.execute(delete(AttemptAnswer))
+    db.commit()
+    db.close()
+
+
+def run_direct(events):
+    """One upsert transaction per autosave request"""
+    table = AttemptAnswer.__table__
+    statement = dialect_insert(engine.dialect.name)(table)
+    statement = statement.on_conflict_do_update(
+        index_elements=["attempt_id", "question_id"],
+        set_={"selected_answer": statement.excluded.selected_answer}
+    )
+    transactions = 0
+    for _, attempt_id, answers in events:
+        db = SessionLocal()
+        db.execute(statement, [
+            {"attempt_id": attempt_id, "question_id": question_id, "selected_answer": selected}
+            for question_id, selected in answers.items()
+        ])
+        db.commit()
+        db.close()
+        transactions += 1
+    return transactions, sum(len(answers) for _, _, answers in events)
+
+
+def run_buffered(events, flush_interval: float):
+    """Autosaves go to the write buffer, flushed every flush_interval of simulated time"""
+    buffer = AnswerWriteBuffer(
+        SessionLocal,
+        interval=flush_interval,
+        max_pending=settings.AUTOSAVE_MAX_PENDING,
+        batch_size=settings.AUTOSAVE_BATCH_SIZE
+    )
+    transactions = rows = 0
+    next_flush = flush_interval
+    for at, attempt_id, answers in events:
+        while at >= next_flush:
+            if len(buffer):
+                rows += buffer.flush()
+                transactions += 1
+            next_flush += flush_interval
+        buffer.add(attempt_id, answers)
+    if len(buffer):
+        rows += buffer.flush()
+        transactions += 1
+    return transactions, rows
+
+
+def run(label: str, func, *args):
+    global statements
+    reset()
+    statements = 0
+    start = time.perf_counter()
+    transactions, rows = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<10} {transactions:>8} transactions {statements:>8} statements "
+          f"{rows:>8} rows written   {elapsed:6.2f} s of database time")
+
+
+def main(students: int = 1000, seconds: int = 60, interval: int = 5):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add(User(email="bench@example.com", hashed_password="x"))
+    db.add(Exam(title="Bench", duration_minutes=seconds // 60 or 1))
+    db.flush()
+    db.add_all([Attempt(user_id=1, exam_id=1) for _ in range(students)])
+    db.commit()
+    db.close()
+
+    events = autosave_schedule(students, seconds, interval)
+    print(f"{students} students autosaving every {interval} s for {seconds} s: {len(events)} requests")
+    run("direct", run_direct, events)
+    run("buffered", run_buffered, events, settings.AUTOSAVE_FLUSH_INTERVAL_SECONDS)
+
+
+if __name__ == "__main__":
+    try:
+        main(*(int(arg) for arg in sys.argv[1:4]))
+    finally:
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(_db_path + suffix):
+                os.remove(_db_path + suffix)
@@ -0,0 +1,159 @@
+"""
+Benchmark de la carga de exámenes: archivos JSON frente a un paquete binario
+mapeado en memoria, en tiempo de carga y memoria residente (RSS)
+
+Cada escenario se mide en un proceso nuevo. El banco sintético se genera a
+partir de los exámenes DP-900 de ejemplo.
+
+Uso: python benchmarks/bench_exam_package.py [exams]
+"""
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.answer_keys import AnswerKey, CompiledQuestion  # noqa: E402
+from app.core.exam_package import ExamPackage, normalize_exam_json, write_exam_package  # noqa: E402
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "exams")
+EXAMS_PER_FILE = 100
+
+
+def rss_kib() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def make_corpus(directory: str, exams: int) -> str:
+    """JSON files of synthetic exams derived from the samples, and the package compiled from them"""
+    rng = random.Random(1)
+    samples = [
+        json.load(open(os.path.join(SAMPLES_DIR, name), encoding="utf-8"))
+        for name in sorted(os.listdir(SAMPLES_DIR))
+        if name.endswith(".json")
+    ]
+    questions = [question for sample in samples for question in sample["questions"]]
+
+    batch, file_index = [], 0
+    for index in range(exams):
+        batch.append({
+            "title": f"Practice exam {index}",
+            "durationMinutes": 50,
+            "questions": [
+                # Unique question text and explanation per exam, shared options
+                {**question, "question": f"[{index}.{order}] {question['question']}",
+                 "explanation": f"{question['explanation']} (see exam {index}, question {order})"}
+                for order, question in enumerate(rng.sample(questions, 50), start=1)
+            ]
+        })
+        if len(batch) == EXAMS_PER_FILE or index == exams - 1:
+            with open(os.path.join(directory, f"exams-{file_index:04d}.json"), "w", encoding="utf-8") as f:
+                json.dump(batch, f)
+            batch, file_index = [], file_index + 1
+
+    package_path = os.path.join(directory, "exams.exampkg")
+
+    def iter_exams():
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(".json"):
+                yield from json.load(open(os.path.join(directory, name), encoding="utf-8"))
+
+    start = time.perf_counter()
+    write_exam_package(package_path, iter_exams())
+    print(f"Compiled {exams} exams into a package in {time.perf_counter() - start:.2f} s")
+    return package_path
+
+
+def json_answer_keys(directory: str):
+    """JSON path: parse every file and compile the answer keys of every exam"""
+    answer_keys = {}
+    question_id = 0
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        with open(os.path.join(directory, name), encoding="utf-8") as f:
+            for data in json.load(f):
+                exam = normalize_exam_json(data)
+                questions = {}
+                for q_data in exam["questions"]:
+                    question_id += 1
+                    questions[question_id] = CompiledQuestion(
+                        id=question_id,
+                        question=q_data["question"],
+                        options=q_data["options"],
+                        correct_answer=q_data["correctAnswer"],
+                        explanation=q_data["explanation"]
+                    )
+                exam_id = len(answer_keys) + 1
+                answer_keys[exam_id] = AnswerKey(
+                    exam_id=exam_id,
+                    title=exam["title"],
+                    questions=questions,
+                    question_ids=tuple(questions)
+                )
+    return answer_keys
+
+
+def run_scenario(scenario: str, directory: str, package_path: str) -> dict:
+    baseline = rss_kib()
+    start = time.perf_counter()
+
+    if scenario == "json: parse every exam":
+        answer_keys = json_answer_keys(directory)
+        assert answer_keys[1].total_questions == 50
+    else:
+        package = ExamPackage(package_path)
+        if scenario == "package: serve one exam":
+            assert package.exam_payload(package.exam_count // 2) is not None
+        elif scenario == "package: decode every exam":
+            for exam_id in range(1, package.exam_count + 1):
+                package.answer_key(exam_id)
+
+    return {"seconds": time.perf_counter() - start, "rss_kib": rss_kib() - baseline}
+
+
+SCENARIOS = [
+    "json: parse every exam",
+    "package: open",
+    "package: serve one exam",
+    "package: decode every exam",
+]
+
+
+def main():
+    exams = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    directory = tempfile.mkdtemp()
+    try:
+        package_path = make_corpus(directory, exams)
+        json_bytes = sum(
+            os.path.getsize(os.path.join(directory, name))
+            for name in os.listdir(directory)
+            if name.endswith(".json")
+        )
+        print(f"JSON files {json_bytes / 1024 ** 2:.1f} MiB, package {os.path.getsize(package_path) / 1024 ** 2:.1f} MiB")
+
+        print("=" * 72)
+        print(f"Loading {exams} exams ({exams * 50} questions), each scenario in a fresh process")
+        print("=" * 72)
+        for scenario in SCENARIOS:
+            output = subprocess.run(
+                [sys.executable, __file__, "--scenario", scenario, directory, package_path],
+                check=True, capture_output=True, text=True
+            ).stdout
+            result = json.loads(output)
+            print(f"  {scenario:<28} {result['seconds'] * 1000:10.1f} ms   RSS +{result['rss_kib'] / 1024:7.1f} MiB")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--scenario":
+        print(json.dumps(run_scenario(*sys.argv[2:5])))
+    else:
+        main()
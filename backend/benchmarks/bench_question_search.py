@@ -0,0 +1,130 @@
+"""
+Benchmark de la búsqueda de preguntas: índice FTS5 frente a LIKE sobre un
+banco sintético de preguntas
+
+Uso: python benchmarks/bench_question_search.py [questions] [queries]
+"""
+import os
+import random
+import statistics
+import string
+import sys
+import tempfile
+import time
+from itertools import accumulate
+
+_db_fd, _db_path = tempfile.mkstemp(suffix=".db")
+os.close(_db_fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.question_search import _like_search, create_search_index, search_questions, search_terms  # noqa: E402
+from app.models import Exam, Question  # noqa: E402
+
+VOCABULARY = 20000
+EXAMS = 100
+BATCH_SIZE = 5000
+
+
+def make_words(rng: random.Random):
+    """Random pseudo-words, drawn later with a Zipf-like frequency as in natural text"""
+    words = set()
+    while len(words) < VOCABULARY:
+        words.add("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 10))))
+    words = sorted(words)
+    cum_weights = list(accumulate(1 / (rank + 1) for rank in range(len(words))))
+    return words, cum_weights
+
+
+def sentence(rng: random.Random, words, cum_weights, length: int) -> str:
+    return " ".join(rng.choices(words, cum_weights=cum_weights, k=length))
+
+
+def populate(questions: int):
+    rng = random.Random(1)
+    words, cum_weights = make_words(rng)
+    db = SessionLocal()
+    db.execute(insert(Exam), [{"title": f"Exam {i}", "duration_minutes": 30} for i in range(EXAMS)])
+    exam_ids = [exam.id for exam in db.query(Exam.id).all()]
+    rows = []
+    for index in range(questions):
+        rows.append({
+            "exam_id": exam_ids[index % EXAMS],
+            "question": sentence(rng, words, cum_weights, 14) + "?",
+            "options": [sentence(rng, words, cum_weights, 3) for _ in range(4)],
+            "correct_answer": rng.randrange(4),
+            "explanation": sentence(rng, words, cum_weights, 25) + ".",
+            "question_order": index // EXAMS + 1
+        })
+        if len(rows) >= BATCH_SIZE:
+            db.execute(insert(Question), rows)
+            rows = []
+    if rows:
+        db.execute(insert(Question), rows)
+    db.commit()
+    db.close()
+    return words
+
+
+def timed(fn, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        hits = fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings, hits
+
+
+def report(label: str, timings):
+    timings = sorted(timings)
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"  {label:<24} p50 {statistics.median(timings):8.2f} ms   p99 {p99:8.2f} ms")
+
+
+def main():
+    questions = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    queries = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    Base.metadata.create_all(bind=engine)
+    create_search_index(engine)
+
+    start = time.perf_counter()
+    words = populate(questions)
+    print(f"Inserted {questions} questions, indexed by triggers, in {time.perf_counter() - start:.1f} s")
+
+    rng = random.Random(2)
+    # Word ranks by frequency: the top ones are in nearly every question, like stop words
+    cases = {
+        "very common word": [words[rng.randrange(0, 20)] for _ in range(queries)],
+        "common word": [words[rng.randrange(100, 1000)] for _ in range(queries)],
+        "rare word": [words[rng.randrange(5000, VOCABULARY)] for _ in range(queries)],
+        "two words": [f"{words[rng.randrange(0, 200)]} {words[rng.randrange(200, 2000)]}" for _ in range(queries)],
+        "prefix": [words[rng.randrange(0, 2000)][:3] for _ in range(queries)],
+    }
+
+    db = SessionLocal()
+    print("=" * 72)
+    print(f"Question search over {questions} questions, first page of 20")
+    print("=" * 72)
+    for case, terms in cases.items():
+        print(case)
+        fts, like = [], []
+        for query in terms:
+            fts.extend(timed(lambda: search_questions(db, query), 1)[0])
+        # LIKE scans the whole table, so it gets fewer runs
+        for query in terms[:max(1, queries // 20)]:
+            like.extend(timed(lambda: _like_search(db, search_terms(query), None, 0, 20), 1)[0])
+        report("FTS5", fts)
+        report("LIKE", like)
+    db.close()
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    finally:
+        engine.dispose()
+        os.remove(_db_path)
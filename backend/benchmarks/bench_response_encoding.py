@@ -0,0 +1,136 @@
+"""
+Benchmark de la codificación de respuestas con los exámenes DP-900 de
+ejemplo: serialización con json frente a orjson, y bytes enviados sin
+compresión, con gzip y con Brotli
+
+Uso: python benchmarks/bench_response_encoding.py [repeat]
+"""
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+
+from app.core import compression  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.schemas.exam import Exam, ExamForStudent  # noqa: E402
+from app.schemas.result import ResultDetail, ResultDetailed  # noqa: E402
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "exams")
+
+
+def sample_payloads():
+    """Response models of the sample exams: student view, admin view and a detailed result"""
+    payloads = {}
+    question_id = 0
+    for exam_id, name in enumerate(sorted(n for n in os.listdir(SAMPLES_DIR) if n.endswith(".json")), start=1):
+        with open(os.path.join(SAMPLES_DIR, name), encoding="utf-8") as f:
+            data = json.load(f)
+        questions = []
+        for order, q_data in enumerate(data["questions"], start=1):
+            question_id += 1
+            questions.append({
+                "id": question_id,
+                "exam_id": exam_id,
+                "question_order": order,
+                "question": q_data["question"],
+                "options": q_data["options"],
+                "correct_answer": q_data.get("correctAnswer", 0),
+                "explanation": q_data.get("explanation", "")
+            })
+        exam = {
+            "id": exam_id,
+            "title": data["title"],
+            "duration_minutes": data.get("durationMinutes", 30),
+            "created_at": datetime(2026, 1, 1)
+        }
+        stem = name.removesuffix(".json")
+        payloads[f"{stem} student view"] = ExamForStudent(**exam, questions=questions)
+        payloads[f"{stem} admin view"] = Exam(**exam, questions=questions)
+        payloads[f"{stem} result detail"] = ResultDetailed(
+            id=exam_id,
+            user_id=1,
+            exam_id=exam_id,
+            answers=[],
+            score=50.0,
+            correct_answers=len(questions) // 2,
+            total_questions=len(questions),
+            created_at=datetime(2026, 1, 1),
+            exam_title=data["title"],
+            details=[
+                ResultDetail(
+                    question_id=q["id"],
+                    question=q["question"],
+                    options=q["options"],
+                    user_answer=(q["correct_answer"] + index % 2) % len(q["options"]),
+                    correct_answer=q["correct_answer"],
+                    is_correct=index % 2 == 0,
+                    explanation=q["explanation"]
+                )
+                for index, q in enumerate(questions)
+            ]
+        )
+    return payloads
+
+
+def timed_us(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings)
+
+
+def compressed(body: bytes, encoding: str, gzip_level: int, brotli_quality: int) -> bytes:
+    compressor = compression._Compressor(encoding, gzip_level, brotli_quality)
+    return compressor.compress(body) + compressor.finish()
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    payloads = sample_payloads()
+
+    print("=" * 78)
+    print("Serialization: model to response body (median µs), as FastAPI renders response models")
+    print("=" * 78)
+    print(f"  {'payload':<34} {'dump':>8} {'json':>8} {'orjson':>8} {'speedup':>8}")
+    for label, model in payloads.items():
+        content = model.model_dump(mode="json")
+        assert json.loads(JSONResponse(content).body) == json.loads(ORJSONResponse(content).body)
+        dump = timed_us(lambda: model.model_dump(mode="json"), repeat)
+        standard = timed_us(lambda: JSONResponse(content), repeat)
+        fast = timed_us(lambda: ORJSONResponse(content), repeat)
+        print(f"  {label:<34} {dump:8.1f} {standard:8.1f} {fast:8.1f} {standard / fast:7.1f}x")
+
+    encodings = [
+        ("gzip", settings.GZIP_COMPRESSLEVEL, None),
+        ("gzip", 9, None),
+        ("br", None, settings.BROTLI_QUALITY),
+        ("br", None, 11),
+    ]
+    if compression.brotli is None:
+        print("\n(brotli is not installed: Brotli rows skipped)")
+        encodings = [encoding for encoding in encodings if encoding[0] != "br"]
+
+    print()
+    print("=" * 78)
+    print("Bytes on the wire (compression time, median µs)")
+    print("=" * 78)
+    for label, model in payloads.items():
+        body = ORJSONResponse(model.model_dump(mode="json")).body
+        print(f"  {label:<34} identity {len(body):>7} B")
+        for encoding, gzip_level, brotli_quality in encodings:
+            level = f"{encoding}-{gzip_level or brotli_quality}"
+            size = len(compressed(body, encoding, gzip_level or 6, brotli_quality or 4))
+            elapsed = timed_us(lambda: compressed(body, encoding, gzip_level or 6, brotli_quality or 4), max(1, repeat // 4))
+            print(f"  {'':<34} {level:<8} {size:>7} B  {size / len(body):6.1%}  {elapsed:9.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
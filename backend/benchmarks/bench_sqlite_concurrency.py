@@ -0,0 +1,130 @@
+"""
+Benchmark de lecturas concurrentes con envíos de exámenes en paralelo sobre SQLite,
+comparando el journal por defecto (rollback) con WAL
+
+Cada escritor y lector corre en su propio proceso, como los workers de uvicorn/gunicorn.
+
+Uso: python benchmarks/bench_sqlite_concurrency.py [seconds] [writers] [readers]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup():
+    """Create the schema plus the user and exam the submissions belong to"""
+    from app.core.database import Base, SessionLocal, engine
+    from app.models import Exam, User
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    db.add_all([User(id=1, email="bench@example.com", hashed_password="x"), Exam(id=1, title="Bench")])
+    db.commit()
+    db.close()
+
+
+def writer(seconds: float):
+    """Insert batches of graded submissions, holding each write transaction briefly"""
+    from sqlalchemy.exc import OperationalError
+
+    from app.core.database import SessionLocal
+    from app.models import Result
+
+    answers = [{"question_id": i, "selected_answer": 0, "is_correct": True} for i in range(60)]
+    writes = errors = 0
+    stop = time.monotonic() + seconds
+    while time.monotonic() < stop:
+        db = SessionLocal()
+        try:
+            for _ in range(50):
+                db.add(Result(
+                    user_id=1, exam_id=1, answers=answers,
+                    score=100, correct_answers=60, total_questions=60
+                ))
+            db.flush()
+            time.sleep(0.005)  # grading work while holding the write transaction
+            db.commit()
+            writes += 50
+        except OperationalError:
+            db.rollback()
+            errors += 1
+        finally:
+            db.close()
+    print(json.dumps({"writes": writes, "errors": errors}))
+
+
+def reader(seconds: float):
+    """Read the results listing in a loop, recording each read latency"""
+    from sqlalchemy.exc import OperationalError
+
+    from app.core.database import SessionLocal
+    from app.models import Result
+
+    latencies = []
+    errors = 0
+    stop = time.monotonic() + seconds
+    while time.monotonic() < stop:
+        db = SessionLocal()
+        start = time.perf_counter()
+        try:
+            db.query(Result.id, Result.score).filter(
+                Result.user_id == 1
+            ).order_by(Result.created_at.desc(), Result.id.desc()).limit(20).all()
+            latencies.append(time.perf_counter() - start)
+        except OperationalError:
+            errors += 1
+        finally:
+            db.close()
+    print(json.dumps({"latencies": latencies, "errors": errors}))
+
+
+def run(label: str, wal: bool, seconds: float, writers: int, readers: int):
+    db_fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(db_fd)
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{db_path}", SQLITE_WAL=str(wal))
+    command = [sys.executable, os.path.abspath(__file__), "--role"]
+
+    try:
+        subprocess.run(command + ["setup", "0"], env=env, check=True)
+        processes = [
+            subprocess.Popen(command + [role, str(seconds)], env=env, stdout=subprocess.PIPE, text=True)
+            for role in ["writer"] * writers + ["reader"] * readers
+        ]
+        reports = [json.loads(process.communicate()[0].strip().splitlines()[-1]) for process in processes]
+    finally:
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+
+    latencies = sorted(latency for report in reports for latency in report.get("latencies", []))
+    writes = sum(report.get("writes", 0) for report in reports)
+    errors = sum(report["errors"] for report in reports)
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(
+        f"{label:<10} {len(latencies) / seconds:>8.0f} reads/s   p50 {p50:7.3f} ms   "
+        f"p99 {p99:8.3f} ms   {writes / seconds:>6.0f} writes/s   {errors} lock errors"
+    )
+
+
+def main(seconds: float = 5, writers: int = 4, readers: int = 4):
+    print("=" * 60)
+    print(f"SQLite concurrency benchmark ({writers} writers, {readers} readers, {seconds}s)")
+    print("=" * 60)
+
+    run("rollback", False, seconds, writers, readers)
+    run("wal", True, seconds, writers, readers)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--role":
+        sys.path.insert(0, BACKEND_DIR)
+        role, seconds = sys.argv[2], float(sys.argv[3])
+        {"setup": lambda _: setup(), "writer": writer, "reader": reader}[role](seconds)
+    else:
+        main(*(float(arg) if i == 0 else int(arg) for i, arg in enumerate(sys.argv[1:4])))
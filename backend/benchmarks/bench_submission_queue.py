@@ -0,0 +1,166 @@
+"""
+Benchmark de una entrega masiva al final del examen: todos los estudiantes envían
+a la vez, calificando en la petición frente a encolar y calificar por lotes
+
+Uso: python benchmarks/bench_submission_queue.py [students] [threads] [grading_workers]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_THREADS = 40
+DEFAULT_GRADING_WORKERS = 2
+
+_db_fd, _db_path = tempfile.mkstemp(suffix=".db")
+os.close(_db_fd)
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_path}"
+# Every request thread, grading worker and the progress poll hold a connection
+# at once: size the pool for them so requests wait on the database, not the pool
+_args = [int(arg) for arg in sys.argv[1:4]]
+_threads = _args[1] if len(_args) > 1 else DEFAULT_THREADS
+_grading_workers = _args[2] if len(_args) > 2 else DEFAULT_GRADING_WORKERS
+os.environ["DB_POOL_SIZE"] = str(_threads + _grading_workers + 1)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import Response  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError  # noqa: E402
+
+from app.api.results import submit_exam  # noqa: E402
+from app.api.submissions import enqueue_submission  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.database import Base, SessionLocal, engine  # noqa: E402
+from app.core.security import UserPrincipal  # noqa: E402
+from app.core.submission_queue import DONE, SubmissionWorkers  # noqa: E402
+from app.models import Exam, Question, QueuedSubmission, Result  # noqa: E402
+from app.schemas.result import ResultCreate  # noqa: E402
+
+QUESTIONS = 50
+
+
+def principal(user_id: int) -> UserPrincipal:
+    return UserPrincipal(
+        id=user_id, email=f"student{user_id}@example.com", full_name=None,
+        is_admin=False, is_active=True, created_at=None
+    )
+
+
+def call(handler, deadline: float, user_id: int, submission: ResultCreate):
+    """Run a submit handler as a request thread would; returns (service time, time since the deadline, failed)"""
+    start = time.perf_counter()
+    db = SessionLocal()
+    failed = False
+    try:
+        handler(db, principal(user_id), submission)
+    except (OperationalError, PoolTimeoutError):
+        # "database is locked" once the busy timeout runs out, or no connection
+        # free in the pool in time: a 500 for the student
+        db.rollback()
+        failed = True
+    finally:
+        db.close()
+    end = time.perf_counter()
+    return end - start, end - deadline, failed
+
+
+def grade_in_request(db, user, submission):
+    submit_exam(submission, idempotency_key=None, db=db, current_user=user)
+
+
+def enqueue(db, user, submission):
+    enqueue_submission(submission, Response(), idempotency_key=None, db=db, current_user=user)
+
+
+def percentile(values, fraction: float) -> float:
+    return values[max(0, int(len(values) * fraction) - 1)] * 1000
+
+
+def run(label: str, handler, submissions, threads: int, workers: SubmissionWorkers = None):
+    """Release every submission at the same instant and report submit latency"""
+    if workers is not None:
+        workers.start()
+
+    deadline = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        timings = list(pool.map(lambda item: call(handler, deadline, *item), submissions))
+    accepted = time.perf_counter() - deadline
+
+    graded = accepted
+    if workers is not None:
+        db = SessionLocal()
+        while db.scalar(select(func.count()).where(QueuedSubmission.status != DONE)):
+            db.rollback()
+            time.sleep(0.05)
+        graded = time.perf_counter() - deadline
+        db.close()
+        workers.stop()
+
+    service = sorted(timing[0] for timing in timings)
+    waited = sorted(timing[1] for timing in timings)
+    failed = sum(timing[2] for timing in timings)
+    print(f"{label:<10} service p50 {percentile(service, 0.5):7.1f} ms  p99 {percentile(service, 0.99):7.1f} ms   "
+          f"from deadline p50 {percentile(waited, 0.5):7.0f} ms  p99 {percentile(waited, 0.99):7.0f} ms   "
+          f"all accepted {accepted:5.1f} s  all graded {graded:5.1f} s   failed {failed}")
+
+
+def main(
+    students: int = 5000,
+    threads: int = DEFAULT_THREADS,
+    grading_workers: int = DEFAULT_GRADING_WORKERS
+):
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    exam = Exam(title="Bench", duration_minutes=60)
+    db.add(exam)
+    db.flush()
+    db.add_all([
+        Question(
+            exam_id=exam.id, question=f"Question {i}", options=["a", "b", "c", "d"],
+            correct_answer=i % 4, explanation="", question_order=i
+        )
+        for i in range(QUESTIONS)
+    ])
+    db.commit()
+    question_ids = db.scalars(select(Question.id).order_by(Question.question_order)).all()
+    exam_id = exam.id
+    db.close()
+
+    rng = random.Random(1)
+    submissions = [
+        (user_id, ResultCreate(exam_id=exam_id, answers=[
+            {"question_id": question_id, "selected_answer": rng.randrange(4)} for question_id in question_ids
+        ]))
+        for user_id in range(1, students + 1)
+    ]
+
+    print("=" * 100)
+    print(f"Deadline burst: {students} students submitting at once, {threads} request threads, "
+          f"{grading_workers} grading workers x {settings.SUBMISSION_BATCH_SIZE} per batch")
+    print("=" * 100)
+
+    run("in request", grade_in_request, submissions, threads)
+    workers = SubmissionWorkers(
+        SessionLocal,
+        workers=grading_workers,
+        batch_size=settings.SUBMISSION_BATCH_SIZE,
+        poll_interval=settings.SUBMISSION_POLL_INTERVAL_SECONDS,
+        claim_timeout=settings.SUBMISSION_CLAIM_TIMEOUT_SECONDS
+    )
+    run("queued", enqueue, submissions, threads, workers)
+
+    db = SessionLocal()
+    print(f"results stored: {db.scalar(select(func.count()).select_from(Result))}")
+    db.close()
+
+
+if __name__ == "__main__":
+    try:
+        main(*_args)
+    finally:
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(_db_path + suffix):
+                os.remove(_db_path + suffix)
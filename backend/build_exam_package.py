@@ -0,0 +1,87 @@
+"""
+Script para compilar exámenes JSON en un paquete binario que el servidor
+carga con mmap (EXAM_PACKAGE_PATH) y sirve o corrige sin base de datos.
+Tras escribirlo, comprueba que cada examen del paquete coincide con su JSON.
+
+Uso:
+    python build_exam_package.py [--output=exams.exampkg] [archivo|directorio ...]
+"""
+import os
+import sys
+import time
+from pathlib import Path
+
+from app.core.exam_package import ExamPackage, normalize_exam_json, write_exam_package
+from import_exams import iter_json_objects
+
+
+def iter_exams(paths):
+    """Valid exams of the JSON files at the given paths, in file order"""
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(Path(path).glob('*.json'))
+        elif os.path.isfile(path):
+            files = [Path(path)]
+        else:
+            print(f"❌ Path not found: {path}")
+            continue
+        
+        for json_file in files:
+            for exam_data in iter_json_objects(str(json_file)):
+                if 'title' not in exam_data or 'questions' not in exam_data:
+                    print(f"⚠️ Skipping invalid exam format in {json_file}")
+                    continue
+                yield exam_data
+
+
+def verify_package(output: str, paths) -> bool:
+    """Check that every exam of the package reads back as its JSON source"""
+    mismatches = 0
+    with ExamPackage(output) as package:
+        exam_id = 0
+        for exam_id, exam_data in enumerate(iter_exams(paths), start=1):
+            if package.exam_json(exam_id) != normalize_exam_json(exam_data):
+                print(f"❌ Exam {exam_id} '{exam_data['title']}' does not match its JSON")
+                mismatches += 1
+        
+        if exam_id != package.exam_count:
+            print(f"❌ Package holds {package.exam_count} exams, the JSON files {exam_id}")
+            return False
+    
+    return mismatches == 0
+
+
+def build_exam_package(output: str, paths) -> bool:
+    """Compile the exams of the JSON files into a package and verify it"""
+    try:
+        start = time.perf_counter()
+        exam_count, question_count = write_exam_package(output, iter_exams(paths))
+        elapsed = time.perf_counter() - start
+        
+        if not exam_count:
+            print("⚠️ No exams found")
+        
+        print(f"✅ Wrote {exam_count} exams ({question_count} questions) to {output} in {elapsed:.2f}s")
+        print(f"   {os.path.getsize(output) / 1024:.1f} KiB")
+        
+        if not verify_package(output, paths):
+            return False
+        
+        print("✅ Round trip verified against the JSON files")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error building {output}: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Exam Package Builder")
+    print("=" * 50)
+    
+    options = dict(arg[2:].split('=', 1) for arg in sys.argv[1:] if arg.startswith('--') and '=' in arg)
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith('--')] or ['../exams']
+    
+    success = build_exam_package(options.get('output', 'exams.exampkg'), paths)
+    sys.exit(0 if success else 1)
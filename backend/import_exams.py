@@ -1,12 +1,25 @@
 """
 Script para importar exámenes desde archivos JSON
+
+Uso:
+    python import_exams.py [--no-duplicate-check] [archivo|directorio]
+    python import_exams.py --bulk [--workers=N] [--batch-size=N] [--no-duplicate-check] [archivo|directorio ...]
+
+Tras importar, las preguntas nuevas casi idénticas a otras del banco se
+señalan como posibles duplicados.
 """
 import json
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from app.core.database import SessionLocal
+from sqlalchemy import func, insert, select
+
+from app.core.config import settings
+from app.core.database import IS_SQLITE, SessionLocal, engine
+from app.core.near_duplicates import near_duplicate_report
 from app.models import Exam, Question
 
 
@@ -37,7 +50,10 @@ def import_exam_from_json(file_path: str):
             # Create exam
             exam = Exam(
                 title=exam_data['title'],
-                duration_minutes=exam_data.get('durationMinutes', 30)
+                duration_minutes=exam_data.get('durationMinutes', 30),
+                pool_size=exam_data.get('poolSize'),
+                pool_tags=exam_data.get('poolTags'),
+                shuffle_options=exam_data.get('shuffleOptions', False)
             )
             db.add(exam)
             db.flush()
@@ -50,7 +66,8 @@ def import_exam_from_json(file_path: str):
                     options=q_data['options'],
                     correct_answer=q_data.get('correctAnswer', 0),
                     explanation=q_data.get('explanation', ''),
-                    question_order=idx + 1
+                    question_order=idx + 1,
+                    tag=q_data.get('tag')
                 )
                 db.add(question)
             
@@ -69,6 +86,195 @@ def import_exam_from_json(file_path: str):
         db.close()
 
 
+def iter_json_objects(file_path: str, chunk_size: int = 1 << 20):
+    """Stream the objects of a JSON file holding an object or an array of objects
+
+    Only one top-level object is held in memory at a time. When an object of
+    an array runs past the end of the buffer, at least as much again is read
+    before decoding it from its start once more, so it is rescanned a
+    logarithmic number of times and the whole file is parsed in linear time.
+    """
+    decoder = json.JSONDecoder()
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        buffer = f.read(chunk_size)
+        pos = 0
+        in_array = None
+        
+        while True:
+            # Skip whitespace and array punctuation between objects
+            while pos < len(buffer) and (buffer[pos].isspace() or (in_array and buffer[pos] == ',')):
+                pos += 1
+            
+            if pos == len(buffer):
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    if in_array:
+                        raise ValueError(f"Unterminated JSON array in {file_path}")
+                    return
+                buffer, pos = chunk, 0
+                continue
+            
+            if in_array is None:
+                in_array = buffer[pos] == '['
+                if in_array:
+                    pos += 1
+                else:
+                    # A single object is held whole anyway: decode it in one pass
+                    buffer, pos = buffer[pos:] + f.read(), 0
+                continue
+            
+            if in_array and buffer[pos] == ']':
+                return
+            
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                chunk = f.read(max(chunk_size, len(buffer) - pos))
+                if not chunk:
+                    raise
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            
+            yield obj
+            pos = end
+            
+            if not in_array:
+                return
+
+
+def bulk_import_file(file_path: str, existing_titles: frozenset, batch_size: int = 1000):
+    """Import every exam of a JSON file in one transaction, inserting questions in batches
+
+    Returns a tuple of (imported exams, inserted questions). On error the file
+    is rolled back and the error raised.
+    """
+    db = SessionLocal()
+    imported_count = 0
+    question_count = 0
+    
+    try:
+        for exam_data in iter_json_objects(file_path):
+            if not isinstance(exam_data, dict) or 'title' not in exam_data or 'questions' not in exam_data:
+                print(f"⚠️ Skipping invalid exam format in {file_path}")
+                continue
+            
+            if exam_data['title'] in existing_titles:
+                print(f"⚠️ Exam '{exam_data['title']}' already exists, skipping...")
+                continue
+            
+            exam = Exam(
+                title=exam_data['title'],
+                duration_minutes=exam_data.get('durationMinutes', 30),
+                pool_size=exam_data.get('poolSize'),
+                pool_tags=exam_data.get('poolTags'),
+                shuffle_options=exam_data.get('shuffleOptions', False)
+            )
+            db.add(exam)
+            db.flush()
+            
+            rows = []
+            for idx, q_data in enumerate(exam_data['questions']):
+                rows.append({
+                    "exam_id": exam.id,
+                    "question": q_data['question'],
+                    "options": q_data['options'],
+                    "correct_answer": q_data.get('correctAnswer', 0),
+                    "explanation": q_data.get('explanation', ''),
+                    "question_order": idx + 1,
+                    "tag": q_data.get('tag')
+                })
+                if len(rows) >= batch_size:
+                    db.execute(insert(Question), rows)
+                    rows = []
+            if rows:
+                db.execute(insert(Question), rows)
+            
+            imported_count += 1
+            question_count += len(exam_data['questions'])
+        
+        db.commit()
+        print(f"✅ Imported {imported_count} exams ({question_count} questions) from {Path(file_path).name}")
+        return imported_count, question_count
+        
+    except Exception as e:
+        print(f"❌ Error importing {file_path}: {e}")
+        db.rollback()
+        raise
+        
+    finally:
+        db.close()
+
+
+def bulk_import(paths, workers: int = 4, batch_size: int = 1000):
+    """Import JSON files in parallel worker processes and report throughput
+
+    Existing titles are read once up front; exams sharing a title across files
+    imported in the same run are not deduplicated against each other. SQLite
+    allows a single writer, so its files are imported by one worker. Returns
+    whether every path was found and every file imported.
+    """
+    json_files = []
+    failed = []
+    for path in paths:
+        if os.path.isdir(path):
+            json_files.extend(str(p) for p in sorted(Path(path).glob('*.json')))
+        elif os.path.isfile(path):
+            json_files.append(path)
+        else:
+            print(f"❌ Path not found: {path}")
+            failed.append(path)
+    
+    if not json_files:
+        print("⚠️ No JSON files to import")
+        return not failed
+    
+    if IS_SQLITE and workers > 1:
+        print("SQLite allows one writer at a time: importing with a single worker")
+        workers = 1
+    
+    db = SessionLocal()
+    try:
+        existing_titles = frozenset(db.execute(select(Exam.title)).scalars())
+    finally:
+        db.close()
+    
+    # Worker processes must open their own connections
+    engine.dispose()
+    
+    print(f"Bulk importing {len(json_files)} JSON files with {workers} workers")
+    print("=" * 50)
+    
+    start = time.perf_counter()
+    total_exams = 0
+    total_questions = 0
+    
+    with ProcessPoolExecutor(max_workers=max(1, min(workers, len(json_files)))) as pool:
+        futures = [
+            pool.submit(bulk_import_file, json_file, existing_titles, batch_size)
+            for json_file in json_files
+        ]
+        for json_file, future in zip(json_files, futures):
+            try:
+                exams_count, questions_count = future.result()
+            except Exception:
+                failed.append(json_file)
+                continue
+            total_exams += exams_count
+            total_questions += questions_count
+    
+    elapsed = time.perf_counter() - start
+    print("\n" + "=" * 50)
+    print(f"{'❌' if failed else '✅'} Imported {total_exams} exams ({total_questions} questions) in {elapsed:.2f}s")
+    print(f"   {total_questions / elapsed if elapsed > 0 else 0:.0f} question rows/sec")
+    if failed:
+        print(f"❌ {len(failed)} files failed:")
+        for path in failed:
+            print(f"   {path}")
+    
+    return not failed
+
+
 def import_exams_from_directory(directory: str = '../exams'):
     """Import all JSON files from a directory"""
     path = Path(directory)
@@ -97,14 +303,56 @@ def import_exams_from_directory(directory: str = '../exams'):
     print(f"✅ Successfully imported {total_imported} exams!")
 
 
+def last_question_id() -> int:
+    """Id of the newest question in the bank, 0 if it is empty"""
+    db = SessionLocal()
+    try:
+        return db.execute(select(func.max(Question.id))).scalar() or 0
+    finally:
+        db.close()
+
+
+def flag_near_duplicates(min_question_id: int, threshold: float = settings.DUPLICATE_THRESHOLD):
+    """Print the questions newer than min_question_id that nearly duplicate others in the bank"""
+    db = SessionLocal()
+    try:
+        report = near_duplicate_report(db, threshold, min_question_id=min_question_id)
+    finally:
+        db.close()
+    
+    if not report.groups:
+        print(f"✅ No near-duplicate questions among {report.question_count} questions")
+        return
+    
+    print(f"\n⚠️ {len(report.groups)} groups of near-duplicate questions (similarity >= {threshold}):")
+    for group in report.groups:
+        print(f"\n  Similarity {group.similarity:.2f}")
+        for question in group.questions:
+            marker = "new" if question.question_id > min_question_id else "   "
+            print(f"    [{marker}] #{question.question_id} {question.exam_title}: {question.question[:80]}")
+
+
 if __name__ == "__main__":
     print("=" * 50)
     print("Exam Import Tool")
     print("=" * 50)
     
-    if len(sys.argv) > 1:
+    success = True
+    check_duplicates = '--no-duplicate-check' not in sys.argv[1:]
+    previous_question_id = last_question_id() if check_duplicates else 0
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    
+    if '--bulk' in sys.argv[1:]:
+        options = dict(arg[2:].split('=', 1) for arg in sys.argv[1:] if arg.startswith('--') and '=' in arg)
+        paths = args or ['../exams']
+        success = bulk_import(
+            paths,
+            workers=int(options.get('workers', os.cpu_count() or 1)),
+            batch_size=int(options.get('batch-size', 1000))
+        )
+    elif args:
         # Import specific file or directory
-        path = sys.argv[1]
+        path = args[0]
         
         if os.path.isfile(path):
             print(f"\nImporting file: {path}")
@@ -117,3 +365,8 @@ if __name__ == "__main__":
     else:
         # Default: import from ../exams directory
         import_exams_from_directory('../exams')
+    
+    if check_duplicates and last_question_id() > previous_question_id:
+        flag_near_duplicates(previous_question_id)
+    
+    sys.exit(0 if success else 1)
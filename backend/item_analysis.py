@@ -0,0 +1,55 @@
+"""
+Script para calcular el análisis de ítems (dificultad, discriminación,
+correlación punto-biserial y frecuencia de distractores) de un examen
+"""
+import json
+import sys
+import time
+
+from app.core.database import SessionLocal
+from app.core.item_analysis import analyze_exam
+from app.models import Exam
+
+
+def print_item_analysis(exam_id: int, as_json: bool = False):
+    """Print the item analysis of an exam"""
+    db = SessionLocal()
+    
+    try:
+        exam = db.get(Exam, exam_id)
+        if exam is None:
+            print(f"❌ Exam {exam_id} not found")
+            return False
+        
+        start = time.perf_counter()
+        analysis = analyze_exam(db, exam_id)
+        elapsed = time.perf_counter() - start
+        
+        if as_json:
+            print(json.dumps(analysis.model_dump(), indent=2))
+            return True
+        
+        def fmt(value):
+            return "   -  " if value is None else f"{value:6.3f}"
+        
+        print(f"{exam.title}: {analysis.student_count} results, "
+              f"{len(analysis.questions)} questions ({elapsed * 1000:.1f} ms)")
+        print("=" * 72)
+        print(f"{'#':>3} {'question':>9} {'p':>6} {'D':>6} {'r_pb':>6}  {'shown':>6} {'omitted':>7}  options")
+        for idx, item in enumerate(analysis.questions, start=1):
+            frequencies = " ".join(f"{f:4.0%}" for f in item.option_frequencies)
+            print(f"{idx:>3} {item.question_id:>9} {fmt(item.difficulty)} {fmt(item.discrimination)} "
+                  f"{fmt(item.point_biserial)}  {item.presented:>6} {item.omitted:>7}  {frequencies}")
+        
+        return True
+        
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python item_analysis.py <exam_id> [--json]")
+        sys.exit(1)
+    
+    print_item_analysis(int(sys.argv[1]), as_json="--json" in sys.argv[2:])
@@ -0,0 +1,93 @@
+"""
+Script para añadir a una base de datos existente la columna de versión de
+los exámenes, con la que cada proceso detecta que su caché está obsoleta, y
+para que SQLite no reutilice los ids de exámenes borrados
+"""
+import sys
+
+from sqlalchemy import MetaData, inspect, text
+from sqlalchemy.schema import CreateColumn, CreateTable
+
+from app.core.database import engine
+from app.models import Exam
+
+
+def _add_version_column(inspector) -> bool:
+    if "version" in {c["name"] for c in inspector.get_columns("exams")}:
+        return False
+    
+    definition = CreateColumn(Exam.__table__.c.version).compile(dialect=engine.dialect)
+    with engine.begin() as connection:
+        connection.execute(text(f"ALTER TABLE exams ADD COLUMN {definition}"))
+    print("✅ Added exams.version")
+    return True
+
+
+def _rebuild_with_autoincrement() -> bool:
+    """Recreate the SQLite exams table with AUTOINCREMENT, keeping its rows and ids"""
+    if engine.dialect.name != "sqlite":
+        # Sequences never hand out an id twice
+        return False
+    
+    # Autocommit, so the pragmas take effect and BEGIN/COMMIT below wrap the whole rebuild
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        sql = connection.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'exams'")
+        ).scalar_one()
+        if "AUTOINCREMENT" in sql.upper():
+            return False
+        
+        columns = ", ".join(c["name"] for c in inspect(connection).get_columns("exams"))
+        rebuilt = Exam.__table__.to_metadata(MetaData(), name="exams_autoincrement")
+        
+        # SQLite's documented table rebuild: with foreign keys off, dropping the
+        # old table leaves the questions and results pointing at it untouched
+        foreign_keys = connection.execute(text("PRAGMA foreign_keys")).scalar_one()
+        connection.execute(text("PRAGMA foreign_keys=OFF"))
+        try:
+            connection.execute(text("BEGIN"))
+            try:
+                connection.execute(CreateTable(rebuilt))
+                connection.execute(text(
+                    f"INSERT INTO exams_autoincrement ({columns}) SELECT {columns} FROM exams"
+                ))
+                connection.execute(text("DROP TABLE exams"))
+                connection.execute(text("ALTER TABLE exams_autoincrement RENAME TO exams"))
+                for index in Exam.__table__.indexes:
+                    index.create(connection, checkfirst=True)
+                problems = connection.execute(text("PRAGMA foreign_key_check")).all()
+                if problems:
+                    raise RuntimeError(f"Foreign key check failed: {problems[:5]}")
+                connection.execute(text("COMMIT"))
+            except Exception:
+                connection.execute(text("ROLLBACK"))
+                raise
+        finally:
+            connection.execute(text(f"PRAGMA foreign_keys={int(foreign_keys)}"))
+    print("✅ Rebuilt exams with AUTOINCREMENT ids")
+    return True
+
+
+def migrate_exam_versions():
+    """Add exams.version to an existing exams table and stop SQLite reusing exam ids"""
+    inspector = inspect(engine)
+    
+    try:
+        if "exams" not in inspector.get_table_names():
+            print("✅ Database already up to date")
+            return True
+        
+        added = _add_version_column(inspector)
+        rebuilt = _rebuild_with_autoincrement()
+        if not added and not rebuilt:
+            print("✅ Database already up to date")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = migrate_exam_versions()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,59 @@
+"""
+Script para añadir a una base de datos existente las columnas de los
+exámenes aleatorios (bancos de preguntas, etiquetas y semillas de intentos)
+"""
+import sys
+
+from sqlalchemy import inspect, text
+from sqlalchemy.schema import CreateColumn
+
+from app.core.database import engine
+from app.models import Attempt, Exam, Question, QueuedSubmission, Result
+
+NEW_COLUMNS = [
+    Exam.__table__.c.pool_size,
+    Exam.__table__.c.pool_tags,
+    Exam.__table__.c.shuffle_options,
+    Question.__table__.c.tag,
+    Attempt.__table__.c.seed,
+    QueuedSubmission.__table__.c.seed,
+    Result.__table__.c.seed,
+    Attempt.__table__.c.paper,
+    QueuedSubmission.__table__.c.paper,
+    Result.__table__.c.paper,
+]
+
+
+def migrate_question_pools():
+    """Add the question pool columns missing from existing tables"""
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    
+    try:
+        added = 0
+        with engine.begin() as connection:
+            for column in NEW_COLUMNS:
+                table = column.table.name
+                # Tables created after this feature already have every column
+                if table not in tables:
+                    continue
+                if column.name in {c["name"] for c in inspector.get_columns(table)}:
+                    continue
+                
+                definition = CreateColumn(column).compile(dialect=engine.dialect)
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {definition}"))
+                print(f"✅ Added {table}.{column.name}")
+                added += 1
+        
+        if not added:
+            print("✅ Database already up to date")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = migrate_question_pools()
+    sys.exit(0 if success else 1)
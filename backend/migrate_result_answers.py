@@ -0,0 +1,46 @@
+"""
+Script para migrar las respuestas guardadas como JSON en results.answers
+a la tabla normalizada result_answers
+"""
+import sys
+import time
+
+from app.core.database import Base, SessionLocal, engine
+from app.core.result_answers import backfill_result_answers
+from app.models import Exam, ResultAnswer
+
+
+def migrate_result_answers(exam_id: int = None):
+    """Create the result_answers table if needed and backfill it from the legacy JSON answers"""
+    Base.metadata.create_all(bind=engine, tables=[ResultAnswer.__table__])
+    db = SessionLocal()
+    
+    try:
+        if exam_id is not None and db.get(Exam, exam_id) is None:
+            print(f"❌ Exam {exam_id} not found")
+            return False
+        
+        start = time.perf_counter()
+        backfilled = backfill_result_answers(db, exam_id)
+        db.commit()
+        elapsed = time.perf_counter() - start
+        
+        print(f"✅ Backfilled answers of {backfilled} results ({elapsed:.2f} s)")
+        return True
+        
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error: {e}")
+        return False
+        
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 2:
+        print("Usage: python migrate_result_answers.py [exam_id]")
+        sys.exit(1)
+    
+    success = migrate_result_answers(int(sys.argv[1]) if len(sys.argv) == 2 else None)
+    sys.exit(0 if success else 1)
@@ -0,0 +1,47 @@
+"""
+Script para crear en una base de datos existente los índices de resultados
+que usa la paginación por cursor, que create_all no añade a tablas existentes
+"""
+import sys
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
+
+from app.core.database import engine
+from app.models import Result
+
+NEW_INDEXES = ["ix_results_user_id_created_at", "ix_results_created_at_id"]
+
+
+def migrate_result_indexes():
+    """Create the results pagination indexes missing from an existing results table"""
+    inspector = inspect(engine)
+    
+    try:
+        if "results" not in inspector.get_table_names():
+            print("✅ Database already up to date")
+            return True
+        
+        existing = {index["name"] for index in inspector.get_indexes("results")}
+        indexes = [index for index in Result.__table__.indexes if index.name in NEW_INDEXES]
+        created = 0
+        with engine.begin() as connection:
+            for index in indexes:
+                if index.name in existing:
+                    continue
+                connection.execute(CreateIndex(index, if_not_exists=True))
+                print(f"✅ Created index {index.name}")
+                created += 1
+        
+        if not created:
+            print("✅ Database already up to date")
+        return True
+    
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    success = migrate_result_indexes()
+    sys.exit(0 if success else 1)
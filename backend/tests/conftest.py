@@ -0,0 +1,70 @@
+import os
+
+# Settings are read on import: keep the app's own engine in memory and its
+# background workers off, every test gets its own database below
+os.environ["DATABASE_URL"] = "sqlite://"
+os.environ["SUBMISSION_WORKERS"] = "0"
+os.environ["PASSWORD_HASH_WORKERS"] = "0"
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.core import answer_keys, exam_payloads
+from app.core.database import Base, get_db
+from app.core.security import create_access_token, token_cache, user_cache
+from app.main import app
+from app.models import User
+
+
+@pytest.fixture
+def engine():
+    """In-memory SQLite database shared by every connection of a test"""
+    # Ids restart in every database: drop the exams cached by earlier tests
+    answer_keys._answer_keys.clear()
+    exam_payloads._payloads.clear()
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def session_factory(engine):
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def client(session_factory):
+    """Test client whose requests use the test database"""
+    def get_test_db():
+        session = session_factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = get_test_db
+    user_cache.clear()
+    token_cache.clear()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    user_cache.clear()
+    token_cache.clear()
+
+
+@pytest.fixture
+def admin_headers(db):
+    admin = User(email="admin@example.com", hashed_password="unused", full_name="Admin", is_admin=True)
+    db.add(admin)
+    db.commit()
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': str(admin.id)})}"}
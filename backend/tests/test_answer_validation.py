@@ -0,0 +1,42 @@
+import pytest
+
+from app.models import Exam, Question, Result
+
+
+@pytest.fixture
+def exam(db):
+    exam = Exam(title="Validation", duration_minutes=10)
+    db.add(exam)
+    db.flush()
+    db.add_all(
+        Question(exam_id=exam.id, question=f"Q{order}", options=["a", "b", "c"], correct_answer=0,
+                 explanation="", question_order=order)
+        for order in range(1, 3)
+    )
+    db.commit()
+    return exam
+
+
+def _answers(exam, selected):
+    return [
+        {"question_id": question.id, "selected_answer": answer}
+        for question, answer in zip(exam.questions, selected)
+    ]
+
+
+@pytest.mark.parametrize("path", ["/api/results/", "/api/submissions/"])
+@pytest.mark.parametrize("selected", [[0, 3], [0, 40000], [-2, 0]])
+def test_submitted_answers_out_of_range_are_rejected(client, db, exam, admin_headers, path, selected):
+    response = client.post(path, json={"exam_id": exam.id, "answers": _answers(exam, selected)}, headers=admin_headers)
+
+    assert response.status_code == 422
+    assert db.query(Result).count() == 0
+
+
+def test_blank_answers_are_accepted(client, exam, admin_headers):
+    response = client.post(
+        "/api/results/", json={"exam_id": exam.id, "answers": _answers(exam, [0, -1])}, headers=admin_headers
+    )
+
+    assert response.status_code == 201
+    assert response.json()["correct_answers"] == 1
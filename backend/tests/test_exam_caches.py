@@ -0,0 +1,28 @@
+from app.core.answer_keys import get_answer_key
+from app.models import Exam, Question
+
+
+def _add_exam(db, title):
+    exam = Exam(title=title, duration_minutes=10)
+    db.add(exam)
+    db.flush()
+    db.add(Question(exam_id=exam.id, question=f"{title}?", options=["a", "b"], correct_answer=0,
+                    explanation="", question_order=1))
+    db.commit()
+    return exam
+
+
+def test_new_exam_does_not_get_deleted_exams_cached_key(db):
+    old = _add_exam(db, "Old")
+    old_id = old.id
+    assert get_answer_key(db, old_id).title == "Old"
+
+    # Deleted through another process: this one's cache still holds the old key
+    db.delete(old)
+    db.commit()
+    new = _add_exam(db, "New")
+
+    assert new.id != old_id
+    answer_key = get_answer_key(db, new.id)
+    assert answer_key.title == "New"
+    assert [q.question for q in answer_key.questions.values()] == ["New?"]
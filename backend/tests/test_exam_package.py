@@ -0,0 +1,136 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.core.exam_package import HEADER_DTYPE, VERSION, ExamPackage, ExamPackageError, write_exam_package
+
+SAMPLES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "exams")
+
+EXAMS = [
+    {
+        "title": "Fixed",
+        "durationMinutes": 45,
+        "questions": [
+            {"question": "¿Dos más dos?", "options": ["3", "4"], "correctAnswer": 1, "explanation": "Suma"},
+            {"question": "True or false?", "options": ["True", "False"], "correctAnswer": 0, "explanation": ""},
+        ]
+    },
+    {
+        "title": "Bank",
+        "poolTags": {"easy": 1, "hard": 1},
+        "shuffleOptions": True,
+        "questions": [
+            {"question": "Easy one", "options": ["True", "False"], "correctAnswer": 1, "tag": "easy"},
+            {"question": "Hard one", "options": ["a", "b", "c"], "correctAnswer": 2, "explanation": "c", "tag": "hard"},
+        ]
+    },
+]
+
+
+@pytest.fixture
+def package_path(tmp_path):
+    path = str(tmp_path / "exams.exampkg")
+    assert write_exam_package(path, EXAMS) == (2, 4)
+    return path
+
+
+def test_round_trip(package_path):
+    with ExamPackage(package_path) as package:
+        assert package.exam_count == 2
+        assert package.question_count == 4
+        assert package.exam_json(1) == {
+            "title": "Fixed",
+            "durationMinutes": 45,
+            "questions": EXAMS[0]["questions"]
+        }
+        assert package.exam_json(2) == {
+            "title": "Bank",
+            "durationMinutes": 30,
+            "poolTags": {"easy": 1, "hard": 1},
+            "shuffleOptions": True,
+            "questions": [
+                {"question": "Easy one", "options": ["True", "False"], "correctAnswer": 1, "explanation": "", "tag": "easy"},
+                {"question": "Hard one", "options": ["a", "b", "c"], "correctAnswer": 2, "explanation": "c", "tag": "hard"},
+            ]
+        }
+        assert package.exam_json(3) is None
+
+
+def test_answer_key(package_path):
+    with ExamPackage(package_path) as package:
+        answer_key = package.answer_key(1)
+        assert answer_key.title == "Fixed"
+        assert not answer_key.randomized
+        assert [(q.question, q.options, q.correct_answer) for q in answer_key.questions.values()] == [
+            ("¿Dos más dos?", ["3", "4"], 1),
+            ("True or false?", ["True", "False"], 0),
+        ]
+
+        bank = package.answer_key(2)
+        assert bank.randomized and bank.pool_tags == {"easy": 1, "hard": 1}
+        assert {tag: len(ids) for tag, ids in bank.ids_by_tag.items()} == {"easy": 1, "hard": 1}
+        assert package.answer_key(0) is None
+
+
+def test_exam_list_and_payload(package_path):
+    with ExamPackage(package_path) as package:
+        assert [(exam.title, exam.question_count, exam.bank_size) for exam in package.exam_list()] == [
+            ("Fixed", 2, None),
+            ("Bank", 2, 2),
+        ]
+        payload = json.loads(package.exam_payload(1).body)
+        assert [question["options"] for question in payload["questions"]] == [["3", "4"], ["True", "False"]]
+        assert "correct_answer" not in payload["questions"][0]
+        # Papers of randomized exams are drawn per attempt
+        assert json.loads(package.exam_payload(2).body)["questions"] == []
+
+
+def test_sample_exams_round_trip(tmp_path):
+    samples = []
+    for name in sorted(os.listdir(SAMPLES_DIR)):
+        if name.endswith(".json"):
+            with open(os.path.join(SAMPLES_DIR, name), encoding="utf-8") as f:
+                samples.append(json.load(f))
+    path = str(tmp_path / "samples.exampkg")
+    write_exam_package(path, samples)
+
+    with ExamPackage(path) as package:
+        for exam_id, sample in enumerate(samples, start=1):
+            exam = package.exam_json(exam_id)
+            assert exam["title"] == sample["title"]
+            assert [q["question"] for q in exam["questions"]] == [q["question"] for q in sample["questions"]]
+            assert [q["correctAnswer"] for q in exam["questions"]] == [q["correctAnswer"] for q in sample["questions"]]
+
+
+def _rewrite_header(path, **fields):
+    with open(path, "r+b") as f:
+        header = np.frombuffer(f.read(HEADER_DTYPE.itemsize), dtype=HEADER_DTYPE).copy()
+        for name, value in fields.items():
+            header[name] = value
+        f.seek(0)
+        f.write(header.tobytes())
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "exams.json"
+    path.write_text(json.dumps(EXAMS) * 10)
+    with pytest.raises(ExamPackageError, match="is not an exam package"):
+        ExamPackage(str(path))
+
+
+def test_rejects_other_versions(package_path):
+    _rewrite_header(package_path, version=VERSION + 1)
+    with pytest.raises(ExamPackageError, match=f"has package version {VERSION + 1}"):
+        ExamPackage(package_path)
+
+
+@pytest.mark.parametrize("keep", [0, 16, HEADER_DTYPE.itemsize, HEADER_DTYPE.itemsize + 20, -1])
+def test_rejects_truncated_files(package_path, keep):
+    with open(package_path, "rb") as f:
+        data = f.read()
+    with open(package_path, "wb") as f:
+        f.write(data[:keep])
+    with pytest.raises(ExamPackageError):
+        ExamPackage(package_path)
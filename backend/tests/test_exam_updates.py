@@ -0,0 +1,72 @@
+from app.models import Exam, Question
+
+
+def _question(text, question_id=None):
+    question = {"question": text, "options": ["a", "b"], "correct_answer": 0, "explanation": ""}
+    if question_id is not None:
+        question["id"] = question_id
+    return question
+
+
+def test_questions_matched_by_id_before_content(client, db, admin_headers):
+    exam = Exam(title="Updates", duration_minutes=10)
+    db.add(exam)
+    db.flush()
+    first = Question(exam_id=exam.id, question="First", options=["a", "b"], correct_answer=0,
+                     explanation="", question_order=1)
+    second = Question(exam_id=exam.id, question="Second", options=["a", "b"], correct_answer=0,
+                      explanation="", question_order=2)
+    db.add_all([first, second])
+    db.commit()
+    first_id, second_id = first.id, second.id
+
+    # The first incoming question has the second's text, but the second asks for its row by id
+    response = client.put(
+        f"/api/exams/{exam.id}",
+        json={"questions": [_question("Second"), _question("Second, reworded", second_id)]},
+        headers=admin_headers
+    )
+
+    assert response.status_code == 200
+    questions = {q["question"]: q["id"] for q in response.json()["questions"]}
+    assert questions["Second, reworded"] == second_id
+    assert questions["Second"] not in (first_id, second_id)
+
+
+def _patch_question(client, headers, question, body):
+    return client.patch(f"/api/exams/{question.exam_id}/questions/{question.id}", json=body, headers=headers)
+
+
+def _tagged_question(db):
+    exam = Exam(title="Patch", duration_minutes=10)
+    db.add(exam)
+    db.flush()
+    question = Question(exam_id=exam.id, question="Q", options=["a", "b", "c"], correct_answer=2,
+                        explanation="", question_order=1, tag="sql")
+    db.add(question)
+    db.commit()
+    return question
+
+
+def test_patch_rejects_question_that_cannot_be_answered(client, db, admin_headers):
+    question = _tagged_question(db)
+
+    # correct_answer=2 is out of the shortened options; one option is too few; options cannot be null
+    for body in ({"options": ["a", "b"]}, {"options": ["only"], "correct_answer": 0},
+                 {"correct_answer": 3}, {"options": None}):
+        assert _patch_question(client, admin_headers, question, body).status_code == 422
+
+    response = _patch_question(client, admin_headers, question, {"options": ["a", "b"], "correct_answer": 1})
+    assert response.status_code == 200
+    assert response.json()["options"] == ["a", "b"]
+
+
+def test_patch_clears_tag_with_explicit_null(client, db, admin_headers):
+    question = _tagged_question(db)
+
+    response = _patch_question(client, admin_headers, question, {"explanation": "Why"})
+    assert response.json()["tag"] == "sql"
+
+    response = _patch_question(client, admin_headers, question, {"tag": None})
+    assert response.status_code == 200
+    assert response.json()["tag"] is None
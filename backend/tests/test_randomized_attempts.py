@@ -0,0 +1,65 @@
+from app.core.answer_keys import bump_exam_version, get_answer_key
+from app.core.question_pools import assemble_paper
+from app.models import Attempt, Exam, Question, Result
+
+
+def _add_exam(db, question_count, pool_size=None):
+    exam = Exam(title="Pool", duration_minutes=10, pool_size=pool_size)
+    db.add(exam)
+    db.flush()
+    db.add_all(
+        Question(exam_id=exam.id, question=f"Q{order}", options=["a", "b", "c"], correct_answer=0,
+                 explanation="", question_order=order)
+        for order in range(1, question_count + 1)
+    )
+    db.commit()
+    return exam
+
+
+def _submit_all_correct(client, headers, exam_id, attempt_id, question_ids):
+    return client.post(
+        "/api/results/",
+        json={
+            "exam_id": exam_id,
+            "attempt_id": attempt_id,
+            "answers": [{"question_id": question_id, "selected_answer": 0} for question_id in question_ids],
+        },
+        headers=headers
+    )
+
+
+def test_fixed_exam_results_store_no_seed(client, db, admin_headers):
+    exam = _add_exam(db, 3)
+    attempt = client.post("/api/attempts/", json={"exam_id": exam.id}, headers=admin_headers).json()
+
+    response = _submit_all_correct(client, admin_headers, exam.id, attempt["id"], [q.id for q in exam.questions])
+
+    assert response.status_code == 201
+    result = db.get(Result, response.json()["id"])
+    assert result.seed is None and result.paper is None
+
+
+def test_attempt_graded_on_the_paper_shown_after_bank_edit(client, db, admin_headers):
+    exam = _add_exam(db, 10, pool_size=5)
+    attempt = client.post("/api/attempts/", json={"exam_id": exam.id}, headers=admin_headers).json()
+    paper = client.get(f"/api/attempts/{attempt['id']}/exam", headers=admin_headers).json()
+    shown = [q["id"] for q in paper["questions"]]
+    assert len(shown) == 5
+
+    # Questions added mid-attempt change the paper the seed would draw now
+    db.add_all(
+        Question(exam_id=exam.id, question=f"New {order}", options=["a", "b"], correct_answer=1,
+                 explanation="", question_order=order)
+        for order in range(11, 21)
+    )
+    bump_exam_version(db, exam.id)
+    db.commit()
+    seed = db.get(Attempt, attempt["id"]).seed
+    assert list(assemble_paper(get_answer_key(db, exam.id), seed).question_ids) != shown
+
+    response = _submit_all_correct(client, admin_headers, exam.id, attempt["id"], shown)
+
+    assert response.status_code == 201
+    assert response.json()["total_questions"] == 5
+    assert response.json()["score"] == 100
+    assert db.get(Result, response.json()["id"]).paper["question_ids"] == shown
@@ -0,0 +1,73 @@
+from sqlalchemy import event
+
+from app.models import Exam, Question, Result, ResultAnswer, User
+
+
+def _add_results(db, exam, questions, count):
+    first = db.query(Result).count()
+    for index in range(first, first + count):
+        student = User(email=f"student{index}@example.com", hashed_password="unused", full_name=f"Student {index}")
+        db.add(student)
+        db.flush()
+        result = Result(
+            user_id=student.id,
+            exam_id=exam.id,
+            answers=[],
+            score=50.0,
+            correct_answers=1,
+            total_questions=len(questions)
+        )
+        db.add(result)
+        db.flush()
+        db.add_all(
+            ResultAnswer(
+                result_id=result.id,
+                question_id=question.id,
+                selected_answer=order % 2,
+                is_correct=order % 2 == question.correct_answer
+            )
+            for order, question in enumerate(questions)
+        )
+    db.commit()
+
+
+def _count_statements(engine, request):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        response = request()
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+    return response, len(statements)
+
+
+def test_results_list_statements_do_not_grow_with_results(client, db, engine, admin_headers):
+    exam = Exam(title="Statements", duration_minutes=10)
+    db.add(exam)
+    db.flush()
+    questions = [
+        Question(exam_id=exam.id, question=f"Q{order}", options=["a", "b"], correct_answer=0,
+                 explanation="", question_order=order)
+        for order in range(1, 5)
+    ]
+    db.add_all(questions)
+    db.commit()
+
+    _add_results(db, exam, questions, 1)
+    # The first request also caches the admin
+    assert client.get("/api/results/", headers=admin_headers).status_code == 200
+    response, one_result = _count_statements(engine, lambda: client.get("/api/results/", headers=admin_headers))
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+
+    _add_results(db, exam, questions, 49)
+    response, fifty_results = _count_statements(engine, lambda: client.get("/api/results/", headers=admin_headers))
+    assert response.status_code == 200
+    assert len(response.json()) == 50
+    assert all(len(result["answers"]) == 4 for result in response.json())
+
+    assert fifty_results == one_result
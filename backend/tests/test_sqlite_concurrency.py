@@ -0,0 +1,54 @@
+import threading
+
+from sqlalchemy import create_engine, event, func, select
+
+from app.core.database import Base, _set_sqlite_pragmas
+from app.models import Exam
+
+
+def test_read_completes_during_long_write(tmp_path):
+    """With the app's connection pragmas a reader is not locked out by a writer"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'concurrency.db'}", connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        connection.execute(Exam.__table__.insert(), [{"title": "Committed"}])
+
+    writing = threading.Event()
+    read_done = threading.Event()
+    errors = []
+
+    def write():
+        # An exclusive transaction keeps readers out in rollback journal mode, not in WAL
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute("BEGIN EXCLUSIVE")
+            cursor.executemany(
+                "INSERT INTO exams (title) VALUES (?)",
+                [(f"Uncommitted {index}",) for index in range(50000)]
+            )
+            writing.set()
+            read_done.wait(30)
+            connection.commit()
+        except Exception as e:
+            errors.append(e)
+            writing.set()
+        finally:
+            connection.close()
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    try:
+        assert writing.wait(30)
+        with engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA busy_timeout=100")
+            count = connection.execute(select(func.count()).select_from(Exam)).scalar()
+    finally:
+        read_done.set()
+        writer.join()
+        engine.dispose()
+
+    assert not errors
+    # The read sees the last committed state, not the write in progress
+    assert count == 1
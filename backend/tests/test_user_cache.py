@@ -0,0 +1,42 @@
+import pytest
+
+from app.core.security import UserPrincipal, user_cache
+from app.models import User
+
+
+@pytest.fixture
+def cached_user(db):
+    user = User(email="cached@example.com", hashed_password="unused", full_name="Cached")
+    db.add(user)
+    db.commit()
+    user_cache.clear()
+    user_cache.set(user.id, UserPrincipal.from_user(user))
+    yield user
+    user_cache.clear()
+
+
+def test_cached_user_invalidated_on_commit_not_flush(db, cached_user):
+    cached_user.full_name = "Renamed"
+    db.flush()
+    assert user_cache.get(cached_user.id) is not None
+
+    db.commit()
+    assert user_cache.get(cached_user.id) is None
+
+
+def test_cached_user_kept_on_rollback(db, cached_user):
+    cached_user.is_active = False
+    db.flush()
+    db.rollback()
+
+    assert user_cache.get(cached_user.id) is not None
+
+
+def test_deleted_user_invalidated_on_commit(db, cached_user):
+    user_id = cached_user.id
+    db.delete(cached_user)
+    db.flush()
+    assert user_cache.get(user_id) is not None
+
+    db.commit()
+    assert user_cache.get(user_id) is None
@@ -67,6 +67,7 @@ const Admin = () => {
       setExamTitle(exam.title);
       setExamDuration(exam.duration_minutes);
       setQuestions(exam.questions.map(q => ({
+        id: q.id,
         question: q.question,
         options: q.options,
         correct_answer: q.correct_answer,
@@ -192,7 +193,8 @@ const Admin = () => {
           question: q.question,
           options: q.options,
           correct_answer: q.correctAnswer,
-          explanation: q.explanation
+          explanation: q.explanation,
+          tag: q.tag
         })));
       } catch (err) {
         setError('Invalid JSON file');
@@ -253,7 +255,10 @@ const Admin = () => {
                   <tr key={exam.id}>
                     <td>{exam.title}</td>
                     <td>{exam.duration_minutes} min</td>
-                    <td>{exam.question_count}</td>
+                    <td>
+                      {exam.question_count}
+                      {exam.bank_size != null && ` of ${exam.bank_size}`}
+                    </td>
                     <td>
                       <div className="action-buttons">
                         <button
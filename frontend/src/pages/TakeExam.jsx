@@ -1,6 +1,6 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate } from 'react-router-dom';
-import { examsAPI, resultsAPI } from '../services/api';
+import { attemptsAPI, examsAPI, submissionsAPI } from '../services/api';
 import '../styles/TakeExam.css';
 
 const TakeExam = () => {
@@ -29,13 +29,17 @@ const TakeExam = () => {
   const [showConfirmModal, setShowConfirmModal] = useState(false);
   const [showWarningModal, setShowWarningModal] = useState(false);
   const [unansweredCount, setUnansweredCount] = useState(0);
+  // Server-side attempt and the answers changed since its last autosave
+  const attemptIdRef = useRef(null);
+  const unsavedAnswersRef = useRef({});
 
   useEffect(() => {
     loadExam();
   }, [examId]);
 
   useEffect(() => {
-    if (!exam) return;
+    // Stop the clock once the exam cannot be taken any further
+    if (!exam || error) return;
 
     const timer = setInterval(() => {
       setTimeRemaining((prev) => {
@@ -51,6 +55,32 @@ const TakeExam = () => {
     }, 1000);
 
     return () => clearInterval(timer);
+  }, [exam, error]);
+
+  // Autosave changed answers to the server attempt every few seconds
+  useEffect(() => {
+    if (!exam) return;
+
+    const autosave = setInterval(async () => {
+      const changed = unsavedAnswersRef.current;
+      if (!attemptIdRef.current || Object.keys(changed).length === 0) return;
+
+      unsavedAnswersRef.current = {};
+      try {
+        await attemptsAPI.saveAnswers(
+          attemptIdRef.current,
+          Object.entries(changed).map(([questionId, selected]) => ({
+            question_id: parseInt(questionId),
+            selected_answer: selected,
+          }))
+        );
+      } catch (err) {
+        // Keep them for the next autosave, unless they changed again meanwhile
+        unsavedAnswersRef.current = { ...changed, ...unsavedAnswersRef.current };
+      }
+    }, 5000);
+
+    return () => clearInterval(autosave);
   }, [exam]);
 
   // Save current question index
@@ -62,7 +92,29 @@ const TakeExam = () => {
     try {
       setLoading(true);
       const response = await examsAPI.getById(examId);
-      setExam(response.data);
+      const randomized = response.data.pool_size || response.data.pool_tags || response.data.shuffle_options;
+      
+      // Start or resume the server-side attempt; restore its answers if this browser lost them
+      try {
+        const attempt = await attemptsAPI.start(parseInt(examId));
+        attemptIdRef.current = attempt.data.id;
+        if (!localStorage.getItem(getStorageKey('answers')) && Object.keys(attempt.data.answers).length > 0) {
+          setAnswers(attempt.data.answers);
+          localStorage.setItem(getStorageKey('answers'), JSON.stringify(attempt.data.answers));
+        }
+      } catch (err) {
+        // Autosave is best effort; the exam still works from local storage,
+        // except randomized exams, whose questions come from the attempt
+        if (randomized) throw err;
+      }
+      
+      // Randomized exams: questions drawn for this attempt, options in the order shown
+      if (randomized) {
+        const paper = await attemptsAPI.getExam(attemptIdRef.current);
+        setExam(paper.data);
+      } else {
+        setExam(response.data);
+      }
       
       // Load saved time or use full duration
       const savedTime = localStorage.getItem(getStorageKey('timeRemaining'));
@@ -90,6 +142,9 @@ const TakeExam = () => {
     };
     setAnswers(newAnswers);
     localStorage.setItem(getStorageKey('answers'), JSON.stringify(newAnswers));
+    unsavedAnswersRef.current = { ...unsavedAnswersRef.current, [questionId]: optionIndex };
+    // Changed answers are a new submission, not a retry of the previous one
+    localStorage.removeItem(getStorageKey('submissionKey'));
   };
 
   const toggleFlag = () => {
@@ -120,6 +175,15 @@ const TakeExam = () => {
     }
   };
 
+  const clearSavedExam = () => {
+    localStorage.removeItem(getStorageKey('answers'));
+    localStorage.removeItem(getStorageKey('flagged'));
+    localStorage.removeItem(getStorageKey('timeRemaining'));
+    localStorage.removeItem(getStorageKey('timestamp'));
+    localStorage.removeItem(getStorageKey('currentQuestion'));
+    localStorage.removeItem(getStorageKey('submissionKey'));
+  };
+
   const handleSubmit = async () => {
     setShowConfirmModal(false);
     setShowWarningModal(false);
@@ -131,20 +195,37 @@ const TakeExam = () => {
         selected_answer: answers[q.id] ?? -1,
       }));
 
-      const response = await resultsAPI.submit({
+      // Reuse the key of an earlier attempt so a retried submission is not stored twice
+      let submissionKey = localStorage.getItem(getStorageKey('submissionKey'));
+      if (!submissionKey) {
+        submissionKey = crypto.randomUUID();
+        localStorage.setItem(getStorageKey('submissionKey'), submissionKey);
+      }
+
+      // Submissions are queued and graded in the background; poll until graded
+      let { data: submission } = await submissionsAPI.enqueue({
         exam_id: parseInt(examId),
         answers: answersArray,
-      });
+        attempt_id: attemptIdRef.current ?? undefined,
+      }, submissionKey);
+      while (submission.status === 'pending' || submission.status === 'processing') {
+        await new Promise((resolve) => setTimeout(resolve, 1000));
+        ({ data: submission } = await submissionsAPI.getById(submission.id));
+      }
 
-      // Clear saved data after successful submission
-      localStorage.removeItem(getStorageKey('answers'));
-      localStorage.removeItem(getStorageKey('flagged'));
-      localStorage.removeItem(getStorageKey('timeRemaining'));
-      localStorage.removeItem(getStorageKey('timestamp'));
-      localStorage.removeItem(getStorageKey('currentQuestion'));
+      // The attempt is closed once the submission is queued, so clear saved data either way
+      clearSavedExam();
+      
+      if (submission.status !== 'done') {
+        // Resubmitting the closed attempt would be rejected; tell the student instead of retrying
+        setError(`Your exam was submitted but could not be graded (${submission.error || 'grading failed'}). Please contact your instructor.`);
+        setSubmitting(false);
+        return;
+      }
       
-      navigate(`/results/${response.data.id}`);
+      navigate(`/results/${submission.result_id}`);
     } catch (err) {
+      // Nothing was graded; the saved key makes a retry replay the same submission
       setError('Failed to submit exam');
       setSubmitting(false);
     }
@@ -47,21 +47,45 @@ export const authAPI = {
 
 // Exams API
 export const examsAPI = {
-  getAll: () => api.get('/exams/'),
+  getAll: (params) => api.get('/exams/', { params }),
   getById: (id) => api.get(`/exams/${id}`),
   getFullById: (id) => api.get(`/exams/${id}/full`),
+  getStats: (id) => api.get(`/exams/${id}/stats`),
   create: (data) => api.post('/exams/', data),
   update: (id, data) => api.put(`/exams/${id}`, data),
+  updateQuestion: (examId, questionId, data) => api.patch(`/exams/${examId}/questions/${questionId}`, data),
   delete: (id) => api.delete(`/exams/${id}`),
 };
 
+// Attempts API
+export const attemptsAPI = {
+  start: (examId) => api.post('/attempts/', { exam_id: examId }),
+  getById: (id) => api.get(`/attempts/${id}`),
+  getExam: (id) => api.get(`/attempts/${id}/exam`),
+  saveAnswers: (id, answers) => api.patch(`/attempts/${id}/answers`, { answers }),
+};
+
 // Results API
 export const resultsAPI = {
-  submit: (data) => api.post('/results/', data),
-  getMy: () => api.get('/results/my'),
+  submit: (data, idempotencyKey) => api.post('/results/', data, {
+    headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
+  }),
+  getMy: (params) => api.get('/results/my', { params }),
   getById: (id) => api.get(`/results/${id}`),
-  getAll: () => api.get('/results/'),
+  getAll: (params) => api.get('/results/', { params }),
   delete: (id) => api.delete(`/results/${id}`),
 };
 
+// Submissions API (queued grading; poll until status is done or failed)
+export const submissionsAPI = {
+  enqueue: (data, idempotencyKey) => api.post('/submissions/', data, {
+    headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : {},
+  }),
+  getById: (id) => api.get(`/submissions/${id}`),
+};
+
+// Cursor of the next page of a paginated listing (null on the last page).
+// Pass it back as `{ cursor }` to fetch the following page.
+export const getNextCursor = (response) => response.headers['x-next-cursor'] || null;
+
 export default api;